@@ -0,0 +1,42 @@
+"""Configuration of the imas_data_dictionary benchmark suite.
+
+The benchmarks require ``pytest-benchmark`` (``pip install .[benchmark]``) and only
+use the Data Dictionary bundled with the installed package, so they run offline.
+
+Record a baseline with::
+
+    pytest benchmarks --benchmark-autosave
+
+and compare a later run against the most recent baseline with::
+
+    pytest benchmarks --benchmark-compare
+
+When comparing, a benchmark fails if its mean time regresses by more than
+:data:`DEFAULT_COMPARE_FAIL`. Pass ``--benchmark-compare-fail`` to use another
+threshold.
+"""
+
+import pytest
+
+from imas_data_dictionary.idsinfo import IDSInfo
+
+# Default regression threshold when comparing against a stored baseline
+DEFAULT_COMPARE_FAIL = "mean:20%"
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_configure(config):
+    from pytest_benchmark.utils import parse_compare_fail
+
+    if config.getoption("benchmark_compare") and not config.getoption(
+        "benchmark_compare_fail"
+    ):
+        config.option.benchmark_compare_fail = [
+            parse_compare_fail(DEFAULT_COMPARE_FAIL)
+        ]
+
+
+@pytest.fixture(scope="session")
+def idsinfo():
+    # Uncached, so the benchmarks measure the actual work
+    return IDSInfo(cache_size=0)
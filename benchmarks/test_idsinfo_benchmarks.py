@@ -0,0 +1,89 @@
+"""Benchmarks for the IDSInfo API and the idsinfo command line interface."""
+
+import subprocess
+import sys
+
+import pytest
+
+from imas_data_dictionary.idsinfo import IDSInfo
+
+# IDSs with the largest number of fields
+LARGEST_IDSS = ["summary", "plasma_transport", "edge_transport"]
+# Some of the deepest nodes in the DD
+DEEP_PATHS = [
+    ("waves", "coherent_wave/full_wave/grid/space/objects_per_dimension/object"),
+    ("wall", "description_ggd/ggd/energy_fluxes/recombination/neutral/state/name"),
+    ("plasma_transport", "model/profiles_1d/neutral/state/momentum/v_radial/values"),
+]
+# (text, strict) arguments for find_in_ids
+SEARCH_PATTERNS = {
+    "plain": ("ggd", False),
+    "strict": ("temperature", True),
+    "regex": (r".*_error_(upper|lower)$", False),
+}
+CLI_COMMANDS = {
+    "help": ["-h"],
+    "metadata": ["metadata"],
+    "idspath": ["idspath"],
+    "idsnames": ["idsnames"],
+    "info": ["info", "equilibrium", "time_slice/profiles_1d/psi"],
+    "search": ["search", "ggd"],
+    "search-parallel": ["search", "ggd", "--jobs", "4"],
+    "idsfields": ["idsfields", "summary"],
+}
+
+
+def test_idsinfo_init(benchmark):
+    benchmark(IDSInfo)
+
+
+@pytest.mark.parametrize("ids, path", DEEP_PATHS, ids=[ids for ids, _ in DEEP_PATHS])
+def test_query(benchmark, idsinfo, ids, path):
+    result = benchmark(idsinfo.query, ids, path)
+    assert "path" in result
+
+
+@pytest.mark.parametrize("pattern", SEARCH_PATTERNS)
+def test_find_in_ids_cached(benchmark, pattern):
+    idsinfo = IDSInfo()
+    text, strict = SEARCH_PATTERNS[pattern]
+    result = benchmark(idsinfo.find_in_ids, text, strict=strict)
+    assert result
+    assert idsinfo.cache_info().misses == 1
+
+
+@pytest.mark.parametrize("pattern", SEARCH_PATTERNS)
+def test_find_in_ids(benchmark, idsinfo, pattern):
+    text, strict = SEARCH_PATTERNS[pattern]
+    result = benchmark(idsinfo.find_in_ids, text, strict=strict)
+    assert result
+
+
+@pytest.mark.parametrize("jobs", [2, 4])
+def test_find_in_ids_parallel(benchmark, idsinfo, jobs):
+    text, strict = SEARCH_PATTERNS["regex"]
+    result = benchmark(idsinfo.find_in_ids, text, strict=strict, jobs=jobs)
+    assert result
+
+
+@pytest.mark.parametrize("ids", LARGEST_IDSS)
+def test_list_ids_fields(benchmark, idsinfo, ids):
+    result = benchmark(idsinfo.list_ids_fields, ids)
+    assert result[ids]
+
+
+def test_get_ids_names(benchmark, idsinfo):
+    result = benchmark(idsinfo.get_ids_names)
+    assert result
+
+
+@pytest.mark.parametrize("command", CLI_COMMANDS)
+def test_cli(benchmark, command):
+    cmd = [sys.executable, "-m", "imas_data_dictionary.idsinfo"]
+    cmd += CLI_COMMANDS[command]
+    benchmark.pedantic(
+        subprocess.run,
+        args=(cmd,),
+        kwargs={"check": True, "stdout": subprocess.DEVNULL},
+        rounds=3,
+    )
@@ -0,0 +1,38 @@
+"""Benchmarks comparing the XML parser backends on the full DD."""
+
+import pytest
+
+from imas_data_dictionary import open_schema
+from imas_data_dictionary.idsinfo import IDSInfo
+from imas_data_dictionary.xml_backend import get_backend
+
+BACKENDS = ["etree", "lxml"]
+
+
+@pytest.fixture(params=BACKENDS)
+def backend(request):
+    if request.param == "lxml":
+        pytest.importorskip("lxml")
+    return get_backend(request.param)
+
+
+def test_parse(benchmark, backend):
+    def parse():
+        with open_schema("data_dictionary.xml") as schema_file:
+            return backend.parse(schema_file)
+
+    root = benchmark(parse)
+    assert root.tag is not None
+
+
+def test_query(benchmark, backend):
+    idsinfo = IDSInfo(backend=backend.name, cache_size=0)
+    path = "coherent_wave/full_wave/grid/space/objects_per_dimension/object"
+    result = benchmark(idsinfo.query, "waves", path)
+    assert "path" in result
+
+
+def test_find_in_ids(benchmark, backend):
+    idsinfo = IDSInfo(backend=backend.name, cache_size=0)
+    result = benchmark(idsinfo.find_in_ids, "ggd")
+    assert result
@@ -3,7 +3,7 @@ import glob
 import os
 import shutil
 
-CLEAN_FILES = "./build ./dist ./*.egg-info dd_data_dictionary.xml dd_data_dictionary_validation.txt IDSDef.xml IDSNames.txt ./html_documentation/*.html ./html_documentation/cocos/ids_cocos_transformations_symbolic_table.csv ./html_documentation/utilities/coordinate_identifier.xml ./install/*.*".split(
+CLEAN_FILES = "./build ./dist ./*.egg-info ./build_manifest.json ./build_report.json dd_data_dictionary.xml dd_data_dictionary_validation.txt dd_data_dictionary_validation.json dd_data_dictionary_validation.junit.xml IDSDef.xml IDSNames.txt ./html_documentation/*.html ./html_documentation/cocos/ids_cocos_transformations_symbolic_table.csv ./html_documentation/utilities/coordinate_identifier.xml ./docs/_static/dd ./imas_data_dictionary/resources ./install/*.*".split(
     " "
 )
 EXCEPTION_FILES = "./html_documentation/dd_versions.html".split(" ")
@@ -0,0 +1,799 @@
+"""
+Python implementation of dd_data_dictionary.xml.xsl.
+
+Compiles the collection of XSD files forming the Data Dictionary into the single
+dd_data_dictionary.xml file describing explicitly all nodes with their
+characteristics, byte for byte identical to the output of the stylesheet.
+
+The stylesheet walks the XSD documents again for every use of a complexType, so
+shared types of dd_support.xsd (e.g. ``signal_flt_1d`` or ``identifier``) are
+looked up and analysed thousands of times. Here every complexType is analysed
+only once into a template: a list of the nodes of the type, with everything that
+doesn't depend on where the type is used (names, documentation, data types,
+appinfo, ...). Instantiating a template at a use site only computes the paths,
+coordinates and units that depend on the parent nodes. The output is written
+while it is generated, without building a result tree.
+
+Usage:
+
+.. code-block:: python
+
+    import dd_compiler
+
+    dd_compiler.compile_dd(
+        "dd_data_dictionary.xml.xsd", "dd_data_dictionary.xml", "4.0.0"
+    )
+"""
+
+import os
+import re
+import xml.etree.ElementTree as ET
+
+XS = "{http://www.w3.org/2001/XMLSchema}"
+#: Schema with the types shared by all IDSs, relative to the root schema
+DD_SUPPORT_XSD = "schemas/utilities/dd_support.xsd"
+FN_NAMESPACE = "http://www.w3.org/2005/02/xpath-functions"
+
+INDENT = "   "
+_NO_COORDINATES = ("",) * 6
+_DIMENSIONS = tuple(
+    (f"{n}d", f"{n}D", "(" + ",".join(":" * n) + ")") for n in range(1, 7)
+)
+_ATTRIBUTE_ESCAPES = str.maketrans(
+    {
+        "&": "&amp;",
+        "<": "&lt;",
+        ">": "&gt;",
+        '"': "&#34;",
+        "\n": "&#xA;",
+        "\r": "&#xD;",
+        "\t": "&#x9;",
+    }
+)
+_TEXT_ESCAPES = str.maketrans({"&": "&amp;", "<": "&lt;", ">": "&gt;", "\r": "&#xD;"})
+# Characters which need escaping in attribute values
+_SPECIAL_CHARACTERS = re.compile('[&<>"\n\r\t]')
+
+# Kinds of template nodes, see _Node
+REF, LEAF, GROUP, STRUCTURE, ELEMENT = range(5)
+
+
+def compile_dd(xsd_file, output_file, dd_git_describe):
+    """Compile the XSD schemas into dd_data_dictionary.xml.
+
+    Args:
+        xsd_file: Path of the root schema, dd_data_dictionary.xml.xsd
+        output_file: Path of the generated file
+        dd_git_describe: Version of the Data Dictionary
+    """
+    compiler = DDCompiler(xsd_file, dd_git_describe)
+    with open(output_file, "w", encoding="utf-8", newline="") as output:
+        compiler.write(output)
+
+
+class _Schema:
+    """A parsed XSD file."""
+
+    def __init__(self, path):
+        self.path = path
+        self.root = ET.parse(path).getroot()
+        self.complex_types = {}
+        self.elements = {}
+        for child in self.root:
+            name = child.get("name")
+            if child.tag == XS + "complexType":
+                self.complex_types.setdefault(name, child)
+            elif child.tag == XS + "element":
+                self.elements.setdefault(name, child)
+        directory = os.path.dirname(path)
+        self.includes = [
+            os.path.normpath(os.path.join(directory, include.get("schemaLocation")))
+            for include in self.root.iterfind(XS + "include")
+        ]
+
+
+class _AppInfo:
+    """Child element of an xs:appinfo."""
+
+    __slots__ = ("name", "lname", "value", "is_coordinate", "dynamic", "aoscontext")
+
+    def __init__(self, element, appinfo):
+        self.name = element.tag
+        self.lname = element.tag.lower()
+        self.value = "".join(element.itertext())
+        self.is_coordinate = "coordinate" in self.lname
+        # Properties of the sibling elements
+        self.dynamic = any(
+            sibling.tag == "type" and "".join(sibling.itertext()) == "dynamic"
+            for sibling in appinfo
+        )
+        self.aoscontext = appinfo.find("utilities_aoscontext") is not None
+
+
+class _Node:
+    """Template of a xs:element: everything that doesn't depend on its use site."""
+
+    __slots__ = (
+        "kind",
+        "name",
+        "schema",
+        "documentation",
+        "appinfo",
+        "ref",
+        "type",
+        "data_type",
+        "dimensions",
+        "has_errors",
+        "max_occurs",
+        "is_array",
+        "dynamic",
+        "coordinate1",
+        "coordinates",
+        "units",
+        "children",
+    )
+
+    def __init__(self, element, schema):
+        self.schema = schema
+        self.name = element.get("name")
+        self.ref = element.get("ref")
+        self.type = element.get("type") or ""
+        self.documentation = " ".join(
+            "".join(documentation.itertext())
+            for documentation in element.iterfind(f"{XS}annotation/{XS}documentation")
+        )
+        self.appinfo = [
+            _AppInfo(child, appinfo)
+            for appinfo in element.iterfind(f"{XS}annotation/{XS}appinfo")
+            for child in appinfo
+        ]
+        self.max_occurs = element.get("maxOccurs")
+        self.is_array = self.max_occurs is not None and (
+            self.max_occurs == "unbounded" or float(self.max_occurs) > 1
+        )
+        values = {}
+        for info in self.appinfo:
+            values.setdefault(info.name, info.value)
+        self.dynamic = any(
+            info.name == "type" and info.value == "dynamic" for info in self.appinfo
+        )
+        self.coordinate1 = values.get("coordinate1")
+        self.coordinates = tuple(values.get(f"coordinate{i}", "") for i in range(1, 7))
+        self.units = values.get("units", "")
+        self.children = ()
+
+        group = element.find(f"{XS}complexType/{XS}group")
+        if self.ref is not None:
+            self.kind = REF
+        elif self.name is None:
+            self.kind = None
+        elif self.type.endswith("_type") and self.type[:3] in (
+            "int",
+            "flt",
+            "str",
+            "cpx",
+        ):
+            self.kind = LEAF
+            self.data_type = self.type.partition("_type")[0].upper()
+            if "d_type" not in self.type:
+                self.data_type += "_0D"
+            self.dimensions = _dimensions(self.type)
+        elif group is not None:
+            self.kind = GROUP
+            self.data_type = group.get("ref") or ""
+            self.dimensions = _dimensions(self.data_type)
+            self.has_errors = (
+                "FLT" in self.data_type or "CPX" in self.data_type
+            ) and "_limit_" not in self.name
+        elif self.type:
+            self.kind = STRUCTURE
+        else:
+            self.kind = ELEMENT
+            self.children = [
+                _Node(child, schema) for child in element.iterfind(f"*/*/{XS}element")
+            ]
+
+
+def _dimensions(data_type):
+    """Suffix of the path_doc of a node with the given data type, e.g. (:,:)."""
+    for lower, upper, suffix in _DIMENSIONS:
+        if lower in data_type or upper in data_type:
+            return suffix
+    return ""
+
+
+class DDCompiler:
+    """Compiler of the XSD schemas of the Data Dictionary.
+
+    Args:
+        xsd_file: Path of the root schema, dd_data_dictionary.xml.xsd
+        dd_git_describe: Version of the Data Dictionary
+    """
+
+    def __init__(self, xsd_file, dd_git_describe):
+        self.dd_git_describe = dd_git_describe
+        self._schemas = {}
+        self.root_schema = self._schema(os.path.normpath(xsd_file))
+        self.dd_support = self._schema(
+            os.path.normpath(os.path.join(os.path.dirname(xsd_file), DD_SUPPORT_XSD))
+        )
+        # Templates of the complexTypes and top-level elements, by schema and name
+        self._type_templates = {}
+        self._element_templates = {}
+        self._lines = []
+
+    def write(self, stream):
+        """Write dd_data_dictionary.xml to a text stream."""
+        self._lines = lines = [
+            '<?xml version="1.0" encoding="UTF-8"?>\n',
+            f'<IDSs xmlns:fn="{FN_NAMESPACE}">\n',
+            f"{INDENT}<version>{_escape_text(self.dd_git_describe)}</version>\n",
+        ]
+        cocos = " ".join(
+            "".join(cocos.itertext())
+            for cocos in self.root_schema.root.iterfind(
+                f"{XS}element/{XS}annotation/{XS}appinfo/cocos"
+            )
+        )
+        lines.append(
+            f"{INDENT}<cocos>{_escape_text(cocos)}</cocos>\n"
+            if cocos
+            else f"{INDENT}<cocos/>\n"
+        )
+
+        lines.append(f"{INDENT}<utilities>\n")
+        for complex_type in self.dd_support.root.iterfind(f"{XS}complexType"):
+            name = complex_type.get("name")
+            documentation = " ".join(
+                "".join(documentation.itertext())
+                for documentation in complex_type.iterfind(
+                    f"{XS}annotation/{XS}documentation"
+                )
+            )
+            attributes = {
+                "name": name,
+                "data_type": "structure",
+                "structure_reference": "self",
+                "documentation": documentation,
+            }
+            start = self._start(2, "field", attributes)
+            self._implement_type(name, self.dd_support, 3, "", "", 1, "self")
+            self._end(2, "field", start)
+        for name, element in self.dd_support.elements.items():
+            if element.find(f"{XS}complexType") is not None:
+                node = self._element_template(self.dd_support, name)
+                self._implement((node,), 2, "", "", 1, structure_reference="self")
+        lines.append(f"{INDENT}</utilities>\n")
+        self._flush(stream)
+
+        for element in self.root_schema.root.iterfind(f"*/*/*/{XS}element"):
+            self._declare(element, self.root_schema, "")
+            self._flush(stream)
+        self._lines.append("</IDSs>\n")
+        self._flush(stream)
+
+    def _flush(self, stream):
+        stream.write("".join(self._lines))
+        self._lines = []
+
+    def _schema(self, path):
+        """Return the parsed schema, parsing it on first use."""
+        schema = self._schemas.get(path)
+        if schema is None:
+            schema = self._schemas[path] = _Schema(path)
+        return schema
+
+    def _type_template(self, name, schema):
+        """Return the nodes of a complexType, and whether it is in dd_support.xsd.
+
+        The complexType is looked up in dd_support.xsd first, and in the given
+        schema otherwise. Returns (None, False) when it is not defined.
+        """
+        in_dd_support = name in self.dd_support.complex_types
+        if not in_dd_support:
+            if name not in schema.complex_types:
+                return None, False
+        else:
+            schema = self.dd_support
+        key = (schema.path, name)
+        template = self._type_templates.get(key)
+        if template is None:
+            template = self._type_templates[key] = [
+                _Node(element, schema)
+                for element in schema.complex_types[name].iterfind(f"*/{XS}element")
+            ]
+        return template, in_dd_support
+
+    def _element_template(self, schema, name):
+        """Return the node of a top-level element of a schema."""
+        key = (schema.path, name)
+        template = self._element_templates.get(key)
+        if template is None:
+            template = self._element_templates[key] = _Node(
+                schema.elements[name], schema
+            )
+        return template
+
+    def _declare(self, element, schema, max_occurs):
+        """Write the IDS declared by an element of the root schema."""
+        ref = element.get("ref")
+        if element.get("name") is not None:
+            sequence = f"*/*/{XS}element"
+            if not any(
+                child.get("ref") == "ids_properties"
+                for child in element.iterfind(sequence)
+            ):
+                return
+            node = _Node(element, schema)
+            attributes = {
+                "name": node.name,
+                "maxoccur": max_occurs if max_occurs else "1",
+                "documentation": node.documentation,
+            }
+            for info in node.appinfo:
+                attributes[info.name] = info.value
+            dynamic = any(
+                child.get("ref") == "time" for child in element.iterfind(sequence)
+            )
+            attributes["type"] = "dynamic" if dynamic else "constant"
+            start = self._start(1, "IDS", attributes)
+            for complex_type in element.iterfind(f"{XS}complexType"):
+                nodes = [
+                    _Node(child, schema)
+                    for child in complex_type.iterfind(f"*/{XS}element")
+                ]
+                self._implement(nodes, 2, "", "", 1)
+            if node.type:
+                self._implement_type(node.type, schema, 2, "", "", 1)
+            self._end(1, "IDS", start)
+
+        elif ref is not None:
+            max_occurs = element.get("maxOccurs")
+            for path in self.root_schema.includes:
+                included = self._schema(path)
+                if ref in included.elements:
+                    self._declare(included.elements[ref], included, max_occurs)
+            if ref in self.dd_support.elements:
+                self._declare(self.dd_support.elements[ref], self.dd_support, "")
+
+    def _implement_type(
+        self,
+        name,
+        schema,
+        depth,
+        path,
+        path_doc,
+        aos_level,
+        structure_reference="",
+        parent_coordinates=_NO_COORDINATES,
+        parent_units="",
+    ):
+        """Write the nodes of a complexType at a use site."""
+        template, in_dd_support = self._type_template(name, schema)
+        if template is None:
+            return
+        if not in_dd_support:
+            structure_reference = ""
+        self._implement(
+            template,
+            depth,
+            path,
+            path_doc,
+            aos_level,
+            structure_reference,
+            parent_coordinates,
+            parent_units,
+        )
+
+    def _implement(
+        self,
+        nodes,
+        depth,
+        path,
+        path_doc,
+        aos_level,
+        structure_reference="",
+        parent_coordinates=_NO_COORDINATES,
+        parent_units="",
+    ):
+        """Instantiate template nodes at a use site.
+
+        Args:
+            nodes: Template nodes
+            depth: Indentation level of the nodes
+            path: Path of the parent node
+            path_doc: Path of the parent node with array indices, e.g. a(i1)/b
+            aos_level: Level of the nearest static array of structures ancestor
+            structure_reference: Name of the referenced dd_support element, or
+                "self" in the utilities section
+            parent_coordinates: Coordinates of the parent node
+            parent_units: Units of the nodes with "as_parent" units
+        """
+        for node in nodes:
+            kind = node.kind
+            if kind == LEAF:
+                self._leaf(node, depth, path, path_doc, aos_level, structure_reference)
+            elif kind == GROUP:
+                arguments = (
+                    node,
+                    depth,
+                    path,
+                    path_doc,
+                    aos_level,
+                    structure_reference,
+                    parent_coordinates,
+                    parent_units,
+                )
+                self._group(*arguments, "")
+                if node.has_errors:
+                    self._group(*arguments, "_error_upper")
+                    self._group(*arguments, "_error_lower")
+            elif kind == STRUCTURE:
+                self._structure(
+                    node,
+                    depth,
+                    path,
+                    path_doc,
+                    aos_level,
+                    parent_coordinates,
+                    parent_units,
+                )
+            elif kind == ELEMENT:
+                self._element(
+                    node, depth, path, path_doc, aos_level, structure_reference
+                )
+            elif kind == REF:
+                self._ref(node, depth, path, path_doc, aos_level)
+
+    def _ref(self, node, depth, path, path_doc, aos_level):
+        """Write a reference to a top-level element."""
+        ref = node.ref
+        if ref in self.dd_support.complex_types:
+            raise ValueError(f"Unexpected reference to the complexType {ref}")
+        if ref in self.dd_support.elements:
+            target = self._element_template(self.dd_support, ref)
+            self._implement((target,), depth, path, path_doc, aos_level, ref)
+        else:
+            for include in node.schema.includes:
+                schema = self._schema(include)
+                if ref in schema.elements:
+                    target = self._element_template(schema, ref)
+                    self._implement((target,), depth, path, path_doc, aos_level)
+
+    def _leaf(self, node, depth, path, path_doc, aos_level, structure_reference):
+        """Write a leaf node defined by a simple type."""
+        name = node.name
+        if path == "":
+            attributes = {
+                "name": name,
+                "path": name,
+                "path_doc": name + node.dimensions,
+            }
+            context = name
+        else:
+            attributes = {
+                "name": name,
+                "path": f"{path}/{name}",
+                "path_doc": f"{path_doc}/{name}{node.dimensions}",
+            }
+            context = f"{path_doc}/{name}"
+        attributes["documentation"] = node.documentation
+        attributes["data_type"] = node.data_type
+        for info in node.appinfo:
+            attributes[info.name] = info.value
+            if info.is_coordinate and (info.value.endswith("time") or name == "time"):
+                attributes["timebasepath"] = _relative_aos_path(
+                    context, None, aos_level - 1, structure_reference
+                )
+        self._end(depth, "field", self._start(depth, "field", attributes))
+
+    def _group(
+        self,
+        node,
+        depth,
+        path,
+        path_doc,
+        aos_level,
+        structure_reference,
+        parent_coordinates,
+        parent_units,
+        suffix,
+    ):
+        """Write a leaf node defined by a group, or one of its error bar nodes."""
+        name = node.name
+        field_name = name + suffix
+        if path == "":
+            attributes = {
+                "name": field_name,
+                "path": field_name,
+                "path_doc": field_name + node.dimensions,
+            }
+            context = name
+        else:
+            attributes = {
+                "name": field_name,
+                "path": f"{path}/{field_name}",
+                "path_doc": f"{path_doc}/{field_name}{node.dimensions}",
+            }
+            context = f"{path_doc}/{name}"
+        if suffix == "_error_upper":
+            attributes["documentation"] = f'Upper error for "{name}"'
+        elif suffix == "_error_lower":
+            attributes["documentation"] = f'Lower error for "{name}"'
+        else:
+            attributes["documentation"] = node.documentation
+        attributes["data_type"] = node.data_type
+
+        for info in node.appinfo:
+            value = info.value
+            # alternative_coordinate is not propagated to the error bar nodes
+            if suffix and "alternative_coordinate" in info.name:
+                continue
+            if info.is_coordinate:
+                attributes[info.lname] = _absolute_path(
+                    info.lname, context, value, parent_coordinates
+                )
+            elif suffix and "change_nbc_previous_name" in info.name:
+                attributes[info.lname] = value + suffix
+            elif info.name == "units" and "as_parent" in value and parent_units:
+                attributes[info.lname] = parent_units
+            else:
+                attributes[info.lname] = value
+            if not info.is_coordinate:
+                continue
+
+            if value.endswith("time") or (suffix and name == "time"):
+                attributes["timebasepath"] = _relative_aos_path(
+                    context,
+                    value,
+                    aos_level - 1,
+                    structure_reference,
+                    path == "" and info.aoscontext,
+                )
+            if suffix and "..." in value:
+                # Allows checking that the size of the error bar is consistent
+                same_as = name if path_doc == "" else f"{path_doc}/{name}"
+                if suffix == "_error_lower":
+                    same_as += "_error_upper"
+                attributes[info.lname + "_same_as"] = same_as
+        self._end(depth, "field", self._start(depth, "field", attributes))
+
+    def _structure(
+        self, node, depth, path, path_doc, aos_level, parent_coordinates, parent_units
+    ):
+        """Write a structure or array of structures defined by a complexType."""
+        name = node.name
+        attributes = {
+            "name": name,
+            "structure_reference": node.type,
+            "path": name if path == "" else f"{path}/{name}",
+            "documentation": node.documentation,
+        }
+        field_path_doc = name if path_doc == "" else f"{path_doc}/{name}"
+        if node.is_array:
+            attributes["data_type"] = "struct_array"
+            attributes["maxoccur"] = node.max_occurs
+            if node.coordinate1 is not None and "time" in node.coordinate1:
+                attributes["timebasepath"] = "time"
+            attributes["path_doc"] = field_path_doc + (
+                "(itime)" if node.dynamic else f"(i{aos_level})"
+            )
+        else:
+            attributes["data_type"] = "structure"
+            attributes["path_doc"] = field_path_doc
+
+        for info in node.appinfo:
+            value = info.value
+            if info.is_coordinate:
+                # The stylesheet passes the parent coordinates only in some cases,
+                # and uses a literal ($aosLevel) in the path of static arrays
+                if not node.is_array:
+                    context = name if path == "" else f"{path_doc}/{name}"
+                    coordinates = _NO_COORDINATES
+                elif info.dynamic:
+                    if path == "":
+                        context = f"{name}(itime)"
+                        coordinates = parent_coordinates
+                    else:
+                        context = f"{path_doc}/{name}(itime)"
+                        coordinates = _NO_COORDINATES
+                elif path == "":
+                    context = f"{name}($aosLevel)"
+                    coordinates = _NO_COORDINATES
+                else:
+                    context = f"{path_doc}/{name}($aosLevel)"
+                    coordinates = parent_coordinates
+                value = _absolute_path(info.lname, context, value, coordinates)
+            elif info.name == "units" and "as_parent" in value and parent_units:
+                value = parent_units
+            attributes[info.lname] = value
+
+        start = self._start(depth, "field", attributes)
+        if "as_parent" in node.units or node.units == "":
+            units = parent_units
+        else:
+            units = node.units
+        child_path = name if path == "" else f"{path}/{name}"
+        child_path_doc = name if path == "" else f"{path_doc}/{name}"
+        child_aos_level = aos_level
+        if node.is_array:
+            if node.dynamic:
+                child_path_doc += "(itime)"
+            else:
+                child_path_doc += f"(i{aos_level})"
+                child_aos_level += 1
+        self._implement_type(
+            node.type,
+            node.schema,
+            depth + 1,
+            child_path,
+            child_path_doc,
+            child_aos_level,
+            "",
+            node.coordinates,
+            units,
+        )
+        self._end(depth, "field", start)
+
+    def _element(self, node, depth, path, path_doc, aos_level, structure_reference):
+        """Write a structure defined by an inline complexType, e.g. ids_properties."""
+        name = node.name
+        if path == "":
+            child_path = child_path_doc = name
+        else:
+            child_path = f"{path}/{name}"
+            child_path_doc = f"{path_doc}/{name}"
+        attributes = {
+            "name": name,
+            "structure_reference": structure_reference,
+            "path": child_path,
+            "path_doc": child_path_doc,
+            "documentation": node.documentation,
+        }
+        if node.is_array:
+            attributes["data_type"] = "struct_array"
+            attributes["maxoccur"] = node.max_occurs
+            if node.coordinate1 is not None:
+                if "time" in node.coordinate1:
+                    attributes["timebasepath"] = "time"
+                attributes["coordinate1"] = node.coordinate1
+        else:
+            attributes["data_type"] = "structure"
+        start = self._start(depth, "field", attributes)
+        self._implement(node.children, depth + 1, child_path, child_path_doc, aos_level)
+        self._end(depth, "field", start)
+
+    def _start(self, depth, tag, attributes):
+        """Write a start tag, which is completed by :meth:`_end`.
+
+        Returns:
+            Position of the start tag in the output lines
+        """
+        indent = INDENT * depth
+        separator = "\n" + " " * (len(indent) + len(tag) + 2)
+        if _SPECIAL_CHARACTERS.search("".join(attributes.values())) is not None:
+            attributes = {
+                name: value.translate(_ATTRIBUTE_ESCAPES)
+                for name, value in attributes.items()
+            }
+        self._lines.append(
+            f"{indent}<{tag} "
+            + separator.join(
+                [f'{name}="{value}"' for name, value in attributes.items()]
+            )
+        )
+        return len(self._lines)
+
+    def _end(self, depth, tag, start):
+        """Close an element opened by :meth:`_start`."""
+        lines = self._lines
+        if len(lines) == start:
+            lines[-1] += "/>\n"
+        else:
+            lines[start - 1] += ">\n"
+            lines.append(f"{INDENT * depth}</{tag}>\n")
+
+
+def _escape_text(value):
+    return value.translate(_TEXT_ESCAPES)
+
+
+def _absolute_path(coordinate, path, coordinate_path, parent_coordinates):
+    """Resolve the relative paths in a coordinate attribute.
+
+    Args:
+        coordinate: Name of the coordinate attribute, e.g. coordinate1
+        path: path_doc of the node
+        coordinate_path: Value of the coordinate attribute. Alternatives are
+            separated by " OR " or ";".
+        parent_coordinates: Coordinates of the parent node, used for "as_parent"
+    """
+    result = []
+    for alternative in re.split("( OR |;)", coordinate_path):
+        if alternative in (" OR ", ";"):
+            result.append(alternative)
+        elif not alternative:
+            continue
+        elif "as_parent" in alternative:
+            for index, digit in enumerate("123456"):
+                if digit in coordinate:
+                    result.append(
+                        _absolute_path(
+                            coordinate,
+                            path + "/..",
+                            parent_coordinates[index],
+                            _NO_COORDINATES,
+                        )
+                    )
+                    break
+        elif alternative.startswith("/"):
+            # Relative to the IDS root or to the nearest array of structures
+            result.append(alternative[1:])
+        elif "..." in alternative:
+            # Main coordinate, e.g. 1...N (the pattern matches any two characters)
+            result.append(re.sub("../", "", alternative))
+        elif "IDS" in alternative:
+            # Coordinate in another IDS
+            result.append(alternative)
+        elif "../" in alternative:
+            result.append(_normalize_path(f"{path}/{alternative}"))
+        else:
+            result.append(f"{path}/{alternative}")
+    return "".join(result)
+
+
+def _relative_aos_path(
+    path, coordinate_path, aos_level, structure_reference, aoscontext=False
+):
+    """Return the path of a time coordinate relative to the nearest static AoS.
+
+    Args:
+        path: path_doc of the node
+        coordinate_path: Value of the coordinate attribute, None for the timebase of
+            a node which is its own timebase
+        aos_level: Level of the nearest static array of structures ancestor
+        structure_reference: Name of the referenced dd_support element, or "self"
+            in the utilities section
+        aoscontext: Whether the coordinate is relative to the parent AoS of a
+            utilities type
+    """
+    coordinate = coordinate_path or ""
+    if coordinate.startswith("/"):
+        return coordinate
+    if "..." in coordinate:
+        return re.sub("../", "", coordinate)
+    if "IDS" in coordinate:
+        return coordinate
+    if "(i1)" in path:
+        index = f"(i{aos_level})/"
+        if "../" in coordinate:
+            return _normalize_path(f"{path}/{coordinate}").partition(index)[2]
+        if coordinate_path is not None:
+            return f"{path}/{coordinate}".partition(index)[2]
+        return path.partition(index)[2]
+    if "self" in structure_reference:
+        if coordinate_path is not None:
+            if aoscontext:
+                return _normalize_path(coordinate)
+            return "\\" + _normalize_path(coordinate)
+        return "\\" + path
+    if "../" in coordinate:
+        return _normalize_path(f"{path}/{coordinate}")
+    if coordinate_path is not None:
+        return f"{path}/{coordinate}"
+    return path
+
+
+def _normalize_path(path):
+    """Resolve the "." and ".." components of a path."""
+    result = []
+    for token in path.split("/") if path else ():
+        if token == "..":
+            if result:
+                result.pop()
+        elif token != ".":
+            result.append(token)
+    normalized = "/".join(result)
+    if path.startswith("/") and not normalized.startswith("/"):
+        normalized = "/" + normalized
+    return normalized
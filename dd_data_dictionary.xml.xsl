@@ -5,6 +5,8 @@
 	<!-- -->
 	<xsl:output method="xml" version="1.0" encoding="UTF-8" indent="yes"/>
 	<xsl:param name="DD_GIT_DESCRIBE" as="xs:string" required="yes"/>
+	<!-- Optional: only generate part of the document, used to compile the IDSs in parallel. "utilities" generates the utilities section only, the name of an IDS generates this IDS only (without the utilities section). -->
+	<xsl:param name="FRAGMENT" as="xs:string" select="''"/>
 	<!-- This script transforms the collection of XSD files forming the Data Dictionary into a single XML file describing explicitly all nodes with their characteristics-->
 	<!-- The resulting XML file makes further work on the data dictionary much easier, since it describes explicitely the whole schema (includes and references are solved) -->
 	<!-- Author:F. Imbeaux, CEA, adapted from xsd2CPODef7 of EU-ITM -->
@@ -73,6 +75,7 @@ DEBUG: 	  result="<xsl:value-of select="$result"/>"</xsl:message>
 			<cocos>
 				<xsl:value-of select="./xs:element/xs:annotation/xs:appinfo/cocos"/>
 			</cocos>
+			<xsl:if test="$FRAGMENT = ('', 'utilities')">
 			<utilities>
 				<!-- Declare complex types from Utilities -->
 				<xsl:for-each select="document('schemas/utilities/dd_support.xsd')/*/xs:complexType">
@@ -99,8 +102,9 @@ DEBUG: 	  result="<xsl:value-of select="$result"/>"</xsl:message>
 					<xsl:with-param name="aos3Parent" select="xs:annotation/xs:appinfo/aos3Parent"/>
 				</xsl:apply-templates>
 			</utilities>
+			</xsl:if>
 			<!-- Scan for top-level elements (IDSs) -->
-			<xsl:apply-templates select="*/*/*/xs:element" mode="DECLARE">
+			<xsl:apply-templates select="*/*/*/xs:element[$FRAGMENT = '' or @ref = $FRAGMENT]" mode="DECLARE">
 				<xsl:with-param name="currPath" select="''"/>
 				<xsl:with-param name="currPath_doc" select="''"/>
 				<xsl:with-param name="maxOcc" select="''"/>
@@ -3,7 +3,11 @@
 <?modxslt-stylesheet type="text/xsl" media="screen" alternate="no" title="Show raw source of the XML file" charset="ISO-8859-1" ?>
 <xsl:stylesheet xmlns:yaslt="http://www.mod-xslt2.com/ns/2.0" xmlns:xsl="http://www.w3.org/1999/XSL/Transform" xmlns:xs="http://www.w3.org/2001/XMLSchema" version="2.0" extension-element-prefixes="yaslt" xmlns:fn="http://www.w3.org/2005/02/xpath-functions" xmlns:local="http://www.example.com/functions/local" exclude-result-prefixes="local xs">
 <xsl:output method="html" encoding="UTF-8" indent="yes"/>
+<!-- Optional: only generate some of the pages, used to generate the pages in parallel. "index" generates the top level page, "utilities" the pages of the generic structures and the name of an IDS the pages of this IDS. The generic structures only have their own pages (linked from the top level page) when PAGE is set: the default output is unchanged. -->
+<xsl:param name="PAGE" as="xs:string" select="''"/>
   <xsl:template match="/*">
+<xsl:variable name="utilities" select="utilities/field[$PAGE != '']"/>
+<xsl:if test="$PAGE = ('', 'index')">
 <xsl:result-document href="html_documentation/html_documentation.html">
     <html>
       <head>
@@ -46,13 +50,13 @@
         <thead style="color:#ff0000"><td>Generic structure name</td><td>Description</td></thead>
 <xsl:for-each select="document('schemas/utilities/dd_support.xsd')/*/xs:complexType">
 <tr>
-	<td><xsl:value-of select="@name"/></td>
+	<td><xsl:call-template name="utility_link"><xsl:with-param name="utilities" select="$utilities"/></xsl:call-template></td>
 	<td><xsl:value-of select="xs:annotation/xs:documentation"/></td>
 </tr>
 </xsl:for-each>
 <xsl:for-each select="document('schemas/utilities/dd_support.xsd')/*/xs:element">
 <tr>
-	<td><xsl:value-of select="@name"/></td>
+	<td><xsl:call-template name="utility_link"><xsl:with-param name="utilities" select="$utilities"/></xsl:call-template></td>
 	<td><xsl:value-of select="./xs:annotation/xs:documentation"/></td>
 </tr>
 </xsl:for-each>
@@ -60,9 +64,10 @@
 </body>
 </html>
 </xsl:result-document>
+</xsl:if>
 
 <!--Third: write the detailed documentation of each IDS-->
-<xsl:for-each select="IDS">
+<xsl:for-each select="IDS[$PAGE = ('', @name)]">
 <xsl:result-document href="html_documentation/{@name}.html">
 <html>
       <head>
@@ -132,6 +137,52 @@
 </xsl:result-document>
 </xsl:for-each>
 
+<!--Fourth: write the detailed documentation of each generic structure-->
+<xsl:for-each select="$utilities[$PAGE = 'utilities']">
+<xsl:result-document href="html_documentation/utility_{@name}.html">
+<html>
+      <head>
+       <title>Data Dictionary HTML documentation</title>
+        <style type="text/css">
+			p {color:black;font-size:12pt;font-weight:normal;}
+			p.name {color:red;font-size:18pt;font-weight:bold;}
+			p.welcome {color:#3333aa; font-size:20pt; font-weight:bold; text-align:center;}
+			span.head {color:#3333aa; font-size:12pt; font-weight:bold; }
+       </style>
+       	<link href="css/jquery.treetable.css" rel="stylesheet" type="text/css"/>
+		<link href="css/maketree.css" rel="stylesheet"/>
+      </head>
+      <body>
+        <p class="welcome">ITER Physics Data Model Documentation for the generic structure <xsl:value-of select="@name"/></p>
+        <p><xsl:value-of select="@documentation"/></p> <!-- Write the structure description -->
+        <p>Paths are relative to the node using this generic structure. Notation of array of structure indices: i1, i2, i3, ... indicate indices with their depth in the structure.</p>
+        <p><a href="html_documentation.html">Back to top IDS list</a></p>
+		<button onclick="ToggleErrorDisplay('body>table')">Show/Hide errorbar nodes</button>
+        <br/>
+        <br/>
+        <table border="1">
+        <thead style="color:#ff0000"><td>Path name</td><td>Description</td><td>Data Type</td><td>Coordinates</td></thead>
+        <xsl:apply-templates select="field"/>
+        </table>
+        <p><a href="html_documentation.html">Back to top IDS list</a></p>
+        <script src="js/jquery-1.12.4.min.js"></script>
+        <script src="js/jquery.treetable.js"></script>
+        <script src="js/treeView2.js"></script>
+        <script>  makeTree('body>table');  </script>
+</body>
+</html>
+</xsl:result-document>
+</xsl:for-each>
+
+  </xsl:template>
+
+  <xsl:template name="utility_link">
+  <!-- Name of a generic structure, linking to its documentation when it is in the utilities section of the DD -->
+  <xsl:param name="utilities"/>
+  <xsl:choose>
+  <xsl:when test="$utilities[@name = current()/@name]"><a href="utility_{@name}.html"><xsl:value-of select="@name"/></a></xsl:when>
+  <xsl:otherwise><xsl:value-of select="@name"/></xsl:otherwise>
+  </xsl:choose>
   </xsl:template>
   
   <xsl:template match="int">
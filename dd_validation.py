@@ -0,0 +1,785 @@
+"""
+Validation of dd_data_dictionary.xml.
+
+Python implementation of the rules of dd_data_dictionary_validation.txt.xsl. The
+text report is identical to the output of the stylesheet, and the results are
+also available as JSON or JUnit XML, with the identifier of the violated rule and
+the IDS and path of the offending node.
+
+The fields of every IDS are checked in a single pass, using an index of the child
+fields of every node to resolve coordinate paths. The IDSs are independent, so they
+can be validated by parallel worker processes.
+
+Validation results can be cached per IDS, by content hash of the IDS in the DD. An
+IDS is validated again only when it changed, or when one of the IDSs referred to by
+its ``IDS:...`` coordinates changed.
+
+Usage::
+
+    python dd_validation.py [dd_data_dictionary.xml] [-f text|json|junit] [-j N]
+        [--cache FILE]
+"""
+
+import argparse
+import collections
+import concurrent.futures
+import hashlib
+import json
+import multiprocessing
+import os
+import re
+import sys
+import xml.etree.ElementTree as ET
+
+#: A violation of a validation rule. ``ids`` is None for the utilities section and
+#: for identifier files, ``path`` is the path_doc of the field or the name of the
+#: identifier file.
+Violation = collections.namedtuple("Violation", ["rule", "ids", "path", "message"])
+
+#: Result of the validation of an IDS: the violations in the order of the text
+#: report, the doc_identifier files used by the IDS, and the content hashes of the
+#: other IDSs referred to by its coordinates (None for unknown IDSs).
+IDSResult = collections.namedtuple(
+    "IDSResult", ["violations", "identifiers", "dependencies"]
+)
+
+#: Validation rules, in the order in which their violations are reported
+RULES = {
+    "R5.2-type": "This field must have a type attribute (constant/static/dynamic)",
+    **{
+        f"R5.4-coordinate{n}": f"This field must have a coordinate{n} attribute"
+        for n in range(1, 7)
+    },
+    **{
+        f"coordinate{n}-dimension": (
+            f"This field must not have a coordinate{n} attribute"
+        )
+        for n in range(1, 7)
+    },
+    "R5.3-units": "This field must have a units attribute",
+    "R5.3-units-format": "This field has an incorrect units definition: ",
+    "R5.3-no-units": "This field should NOT have a units attribute",
+    "aos3-nested": (
+        "Illegal construct: this field is an AoS type 3 nested under another AoS "
+        "type 3"
+    ),
+    "aos2-not-nested": (
+        "Illegal construct: this field is an AoS type 2 and should be nested under "
+        "an AoS type 3 (AoS 2 without nesting benow an AoS 3 are not implemented in "
+        "the AL yet). If this construct is needed, set the field as an AoS type 1 "
+        "by setting a finite maxOccurs attribute"
+    ),
+    "dynamic-scalar": (
+        'Illegal metadata: this scalar field is marked as "dynamic". Scalars '
+        "cannot be dynamic unless placed under an AoS type 3"
+    ),
+    "structure-type": (
+        'Illegal metadata: this structure field should NOT have a "type" attribute '
+        "(constant/static/dynamic)"
+    ),
+    "aos3-static-leaf": "Illegal metadata: all leaves below an AoS3 must be dynamic",
+    "timebasepath": (
+        "Problem in the timebasepath computation or in the specification of the "
+        "time coordinate : this field has an empty timebasepath attribute"
+    ),
+    "reserved-name": (
+        "Illegal name: name is found in the list of reserved names (see "
+        "`reserved_names.txt`)"
+    ),
+    "doc-identifier": (
+        "Illegal metadata: identifier documentation should be stored in a file "
+        "ending in `_identifier.xml`."
+    ),
+    "coordinate-path": "Coordinates must refer to existing nodes of a valid type",
+    "identifier-values": "values of identifiers are not unique.",
+    "identifier-names": "name and/or alias is not unique.",
+}
+# Rules of the identifier files, reported after all IDSs
+IDENTIFIER_RULES = ("identifier-values", "identifier-names")
+
+_FIELD_RULES = [rule for rule in RULES if rule not in IDENTIFIER_RULES]
+_ARRAY_TYPE = re.compile(r"(FLT|INT|CPX|STR)_([0-6])D")
+# Maximum rank of the data types which require coordinates
+_MAX_RANK = {"FLT": 6, "CPX": 6, "INT": 4, "STR": 1}
+_QUANTITY_TYPES = {f"{kind}_{rank}D" for kind in ("FLT", "CPX") for rank in range(7)}
+_SCALAR_TYPES = {"FLT_0D", "INT_0D", "CPX_0D", "STR_0D"}
+_EXTRA_COORDINATE = [
+    re.compile(pattern)
+    for pattern in (
+        "[1-6][dD]|structure|struct_array",
+        "[2-6][dD]|structure",
+        "[3-6][dD]|structure",
+        "[4-6][dD]|structure",
+        "[5-6][dD]|structure",
+        "6[dD]|structure",
+    )
+]
+_UNITS = re.compile(
+    r"1|mixed|[a-zA-Z]+(\^-?[1-9][0-9]*)?([.][a-zA-Z]+(\^-?[1-9][0-9]*)?)*"
+)
+_UNNORMALIZED_UNITS = ("(m.s^-1)^-3.m^-3", "(m.s^-1)^-3.m^-3.s^-1")
+_DOC_IDENTIFIER = re.compile(r"[^/]+/[^/]+_identifier\.xml")
+_NO_COORDINATE_CHECKS = re.compile(
+    "((INT|STR|FLT|CPX)_0D|structure|int_type|flt_type|str_type)"
+)
+_COORDINATE_ATTRIBUTE = re.compile("coordinate[1-6]")
+_PATH_CHUNK = re.compile(r"^[0-9a-z_]+(\(([^()]*|\([^()]*\))*\))?/?")
+_NAME_ATTRIBUTE = re.compile(rb'\sname="([^"]*)"')
+
+
+class DDIndex:
+    """dd_data_dictionary.xml, with an index of the fields of every node.
+
+    The IDSs and the utilities section are located in the text of the DD and only
+    parsed when they are validated, or referred to by a coordinate.
+
+    Args:
+        dd_file: Path of dd_data_dictionary.xml
+        reserved_names_file: Path of the list of reserved names
+
+    Attributes:
+        hashes: Content hash of every IDS, by IDS name, in the order of the DD
+        utilities_hash: Content hash of the utilities section
+    """
+
+    def __init__(self, dd_file, reserved_names_file="reserved_names.txt"):
+        with open(dd_file, "rb") as xml_file:
+            text = xml_file.read()
+        self._sections = {}
+        for section in _sections(text, b"IDS"):
+            name = _NAME_ATTRIBUTE.search(section).group(1).decode()
+            self._sections.setdefault(name, []).append(section)
+        self.hashes = {
+            name: _hash(*sections) for name, sections in self._sections.items()
+        }
+        self._utilities = next(_sections(text, b"utilities"), b"<utilities/>")
+        self.utilities_hash = _hash(self._utilities)
+        with open(reserved_names_file, encoding="utf-8", newline="") as names_file:
+            self.reserved_names = re.sub("[\n\r]", "|", names_file.read())
+        self._ids = {}
+        self._fields = {}
+
+    def ids(self, name):
+        """Return the IDS elements with the given name, parsing them on first use."""
+        elements = self._ids.get(name)
+        if elements is None:
+            elements = self._ids[name] = [
+                ET.fromstring(section) for section in self._sections.get(name, ())
+            ]
+        return elements
+
+    def fields(self, element, name):
+        """Return the child fields of an element with the given name."""
+        fields = self._fields.get(element)
+        if fields is None:
+            fields = self._fields[element] = {}
+            for field in element.iterfind("field"):
+                fields.setdefault(field.get("name"), []).append(field)
+        return fields.get(name, ())
+
+    def validate_utilities(self):
+        """Return the violations of the utilities section."""
+        return [
+            _violation("timebasepath", None, field)
+            for field in ET.fromstring(self._utilities).iterfind(".//field")
+            if field.get("timebasepath") == ""
+        ]
+
+    def validate_ids(self, name):
+        """Validate an IDS.
+
+        Returns:
+            The :class:`IDSResult` of the IDS
+        """
+        violations = {rule: [] for rule in _FIELD_RULES}
+        identifiers = {}
+        dependencies = set()
+        for ids in self.ids(name):
+            self._validate_fields(
+                ids, ids, False, violations, identifiers, dependencies
+            )
+        dependencies.discard(name)
+        return IDSResult(
+            [item for rule in _FIELD_RULES for item in violations[rule]],
+            list(identifiers),
+            {dependency: self.hashes.get(dependency) for dependency in dependencies},
+        )
+
+    def _validate_fields(
+        self, ids, element, in_aos3, violations, identifiers, dependencies
+    ):
+        ids_name = ids.get("name")
+        for field in element.iterfind("field"):
+            attributes = field.attrib
+            data_type = attributes.get("data_type", "")
+            field_type = attributes.get("type")
+            units = attributes.get("units")
+            is_aos3 = (
+                attributes.get("maxoccur") == "unbounded" and field_type == "dynamic"
+            )
+
+            def add(rule, suffix=""):
+                violations[rule].append(_violation(rule, ids_name, field, suffix))
+
+            if (
+                field_type is None
+                and data_type != "structure"
+                and data_type != "struct_array"
+            ):
+                add("R5.2-type")
+            match = _ARRAY_TYPE.fullmatch(data_type)
+            rank = 0
+            if match and int(match.group(2)) <= _MAX_RANK[match.group(1)]:
+                rank = int(match.group(2))
+            elif data_type == "struct_array":
+                rank = 1
+            for n in range(1, 7):
+                if f"coordinate{n}" not in attributes and n <= rank:
+                    if match and match.group(1) == "STR" and n > 1:
+                        continue
+                    add(f"R5.4-coordinate{n}")
+            for n, pattern in enumerate(_EXTRA_COORDINATE, 1):
+                if f"coordinate{n}" in attributes and not pattern.search(data_type):
+                    add(f"coordinate{n}-dimension")
+            if units is None and data_type in _QUANTITY_TYPES:
+                add("R5.3-units")
+            if (
+                units is not None
+                and not _UNITS.fullmatch(units)
+                and not (attributes.get("name") == "measure" and units == "m^dimension")
+                and not (ids_name == "amns_data" and units.startswith("units given by"))
+                and units not in _UNNORMALIZED_UNITS
+            ):
+                add("R5.3-units-format", units)
+            if (
+                units is not None
+                and units not in ("UTC", "u", "e")
+                and any(kind in data_type for kind in ("STR_", "INT_", "str_", "int_"))
+            ):
+                add("R5.3-no-units")
+            if attributes.get("maxoccur") == "unbounded":
+                if field_type == "dynamic" and in_aos3:
+                    add("aos3-nested")
+                if field_type != "dynamic" and not in_aos3:
+                    add("aos2-not-nested")
+            if data_type in _SCALAR_TYPES and field_type == "dynamic" and not in_aos3:
+                add("dynamic-scalar")
+            if data_type == "structure" and field_type is not None:
+                add("structure-type")
+            if (
+                data_type != "structure"
+                and data_type != "struct_array"
+                and field_type != "dynamic"
+                and in_aos3
+            ):
+                add("aos3-static-leaf")
+            if attributes.get("timebasepath") == "":
+                add("timebasepath")
+            if f"|{attributes.get('name', '')}|" in self.reserved_names:
+                add("reserved-name")
+            doc_identifier = attributes.get("doc_identifier")
+            if doc_identifier is not None:
+                identifiers[doc_identifier] = None
+                if not _DOC_IDENTIFIER.fullmatch(doc_identifier):
+                    add("doc-identifier")
+            if not _NO_COORDINATE_CHECKS.fullmatch(data_type):
+                _CoordinateChecker(
+                    self, ids, field, violations["coordinate-path"], dependencies
+                ).run()
+
+            self._validate_fields(
+                ids, field, in_aos3 or is_aos3, violations, identifiers, dependencies
+            )
+
+
+class _CoordinateChecker:
+    """Check that the coordinates of a field refer to existing nodes."""
+
+    def __init__(self, index, ids, field, violations, dependencies):
+        self.index = index
+        self.ids = ids
+        self.field = field
+        self.violations = violations
+        self.dependencies = dependencies
+
+    def run(self):
+        attributes = self.field.attrib
+        for name, coordinate in attributes.items():
+            if not _COORDINATE_ATTRIBUTE.fullmatch(name):
+                continue
+            same_as = attributes.get(f"{name}_same_as", "")
+            if same_as:
+                self.validate_coordinate(same_as, same_as, f"{name}_same_as")
+            self.validate_coordinate(coordinate, coordinate, name)
+
+        alternatives = attributes.get("alternative_coordinate1")
+        if alternatives is not None:
+            if re.search("^;|;;|;$|^$", alternatives):
+                self.error(
+                    f"Invalid alternative_coordinate1: `{alternatives}` has an empty "
+                    "alternative coordinate."
+                )
+            for alternative in alternatives.split(";"):
+                if alternative:
+                    self.validate_path(
+                        alternative,
+                        alternative,
+                        "alternative_coordinate1",
+                        [self.ids],
+                    )
+
+    def error(self, message):
+        self.violations.append(
+            Violation(
+                "coordinate-path",
+                self.ids.get("name"),
+                self.field.get("path_doc", ""),
+                message,
+            )
+        )
+
+    def validate_coordinate(self, path, fullpath, attribute):
+        if " OR " in path:
+            for alternative in path.split(" OR "):
+                self.validate_coordinate(alternative, fullpath, attribute)
+        elif path.startswith("1..."):
+            size = path[4:]
+            if size != "N" and not re.fullmatch("[1-9][0-9]*", size):
+                self.error(f"Invalid {attribute}: `{fullpath}`")
+        elif path.startswith("IDS:"):
+            ids_name = path[4:].partition("/")[0] if "/" in path[4:] else ""
+            self.dependencies.add(ids_name)
+            ids = self.index.ids(ids_name)
+            if not ids:
+                self.error(
+                    f"Invalid {attribute}: `{fullpath}`. Unknown IDS `{ids_name}`"
+                )
+            else:
+                self.validate_path(path.partition("/")[2], fullpath, attribute, ids)
+        else:
+            self.validate_path(path, fullpath, attribute, [self.ids])
+
+    def validate_path(self, path, fullpath, attribute, parents, is_index=False):
+        """Validate a path relative to the given IDS or fields.
+
+        Every call resolves the first part of the path, e.g. coherent_wave(i1) in
+        coherent_wave(i1)/profiles_2d(itime)/time, and recurses for the remainder.
+        """
+        next_path = _PATH_CHUNK.sub("", path, count=1)
+        chunk = path[: len(path) - len(next_path)]
+        if chunk.endswith("/"):
+            chunk = chunk[:-1]
+        name = chunk.partition("(")[0]
+        index = chunk[len(name) :]
+
+        nodes = [node for parent in parents for node in self.index.fields(parent, name)]
+        if len(nodes) != 1:
+            self.error(f"Invalid {attribute}: `{fullpath}`. Unknown element `{name}`")
+            return
+        node = nodes[0]
+        field = self.field
+        node_path = node.get("path", "")
+        node_type = node.get("data_type", "")
+        field_path = field.get("path", "")
+        if re.fullmatch(r"\(i[1-9]\)", index):
+            # Can only be resolved when the struct_array is a parent of the field
+            if not field_path.startswith(node_path):
+                self.error(
+                    f"Invalid {attribute}: `{fullpath}`. Array of structures "
+                    f"`{name}` is not an ancestor node."
+                )
+        elif index == "(itime)" or re.fullmatch(r"\([1-9][0-9]*\)", index):
+            pass
+        elif index:
+            # The index refers to another node, e.g. a(b(i1)/index)
+            self.validate_path(index[1:-1], fullpath, attribute, [self.ids], True)
+        elif node_type == "struct_array" and next_path:
+            self.error(
+                f"Invalid {attribute}: `{fullpath}`. No index provided for array of "
+                f"structures `{name}`."
+            )
+
+        if next_path:
+            self.validate_path(next_path, fullpath, attribute, [node], is_index)
+        elif is_index:
+            if not re.search("(INT_0D|int_type)", node_type):
+                self.error(
+                    f"Invalid {attribute}: `{fullpath}`. Referred index element "
+                    f"`{node_path}` has incorrect data type `{node_type}`"
+                )
+        elif not self._valid_coordinate_type(attribute, node_path, node_type, index):
+            self.error(
+                f"Invalid {attribute}: `{fullpath}`. Referred element has incorrect "
+                f"data type `{node_type}`"
+            )
+
+    def _valid_coordinate_type(self, attribute, node_path, node_type, index):
+        """Whether the coordinate node has the right type for the field.
+
+        - same_as coordinates must have at least the dimension of the coordinate
+        - coordinates of a struct_array must be 0D when they are inside the
+          struct_array, otherwise 1D
+        - other coordinates must be 1D, or a struct_array without index
+        """
+        field_type = self.field.get("data_type", "")
+        field_path = self.field.get("path", "")
+        if "same_as" in attribute:
+            dimension = attribute[10:11]
+            if dimension == "1" and node_type == "struct_array":
+                return True
+            if re.search(f"_[{dimension}-6]D", node_type):
+                return True
+        if field_type == "struct_array":
+            if node_path.startswith(field_path):
+                return bool(re.search("(_0D|int_type|flt_type|str_type)", node_type))
+            return bool(re.search("(_1D|_1d_type|struct_array)", node_type))
+        if "data_type" in self.field.attrib:
+            return bool(re.search("(_1D|_1d_type)", node_type)) or (
+                node_type == "struct_array" and not index
+            )
+        return False
+
+
+def _sections(text, tag):
+    """Yield the text of the top-level elements of the DD with the given tag."""
+    start_tag = re.compile(rb"<%s[\s>]" % tag)
+    end_tag = b"</%s>" % tag
+    match = start_tag.search(text)
+    while match:
+        end = text.index(end_tag, match.start()) + len(end_tag)
+        yield text[match.start() : end]
+        match = start_tag.search(text, end)
+
+
+def _hash(*sections):
+    digest = hashlib.sha256()
+    for section in sections:
+        digest.update(section)
+    return digest.hexdigest()
+
+
+def _violation(rule, ids_name, field, suffix=""):
+    return Violation(rule, ids_name, field.get("path_doc", ""), RULES[rule] + suffix)
+
+
+def validate_identifiers(identifiers, schemas_dir="schemas"):
+    """Check that the values, names and aliases of identifiers are unique.
+
+    Args:
+        identifiers: Names of the identifier files, relative to ``schemas_dir``
+        schemas_dir: Directory containing the schemas
+    """
+    violations = []
+    for identifier in identifiers:
+        root = ET.parse(os.path.join(schemas_dir, identifier)).getroot()
+        values = []
+        names = []
+        for element in root.iter("int"):
+            texts = [element.text] + [child.tail for child in element]
+            values.extend(int(text) for text in texts if text)
+            if "name" in element.attrib:
+                names.append(element.get("name"))
+            if element.get("alias"):
+                names.extend(element.get("alias").split(","))
+        if len(set(values)) != len(values):
+            violations.append(_identifier_violation("identifier-values", identifier))
+        if len(set(names)) != len(names):
+            violations.append(_identifier_violation("identifier-names", identifier))
+    return violations
+
+
+def _identifier_violation(rule, identifier):
+    return Violation(rule, None, identifier, RULES[rule])
+
+
+class ValidationCache:
+    """Validation results of the previous runs, by content hash of the IDSs.
+
+    Results are reused when the IDS, and every IDS it refers to, have the same
+    content hash as when they were validated. All results are discarded when the
+    validation rules or the reserved names change.
+
+    Args:
+        path: Path of the JSON cache file
+        key: Hash of the validation rules and reserved names
+    """
+
+    def __init__(self, path, key):
+        self.path = path
+        self.key = key
+        self.utilities = None
+        self.ids = {}
+        try:
+            with open(path) as cache_file:
+                data = json.load(cache_file)
+        except (OSError, ValueError):
+            return
+        if data.get("key") == key:
+            self.utilities = data.get("utilities")
+            self.ids = data.get("ids", {})
+
+    def get_utilities(self, index):
+        """Return the cached violations of the utilities section, or None."""
+        if self.utilities is None or self.utilities["hash"] != index.utilities_hash:
+            return None
+        return [Violation(*item) for item in self.utilities["violations"]]
+
+    def put_utilities(self, index, violations):
+        self.utilities = {"hash": index.utilities_hash, "violations": violations}
+
+    def get(self, index, name):
+        """Return the cached :class:`IDSResult` of an IDS, or None."""
+        entry = self.ids.get(name)
+        if entry is None or entry["hash"] != index.hashes[name]:
+            return None
+        dependencies = entry["dependencies"]
+        if any(index.hashes.get(dep) != hash for dep, hash in dependencies.items()):
+            return None
+        return IDSResult(
+            [Violation(*item) for item in entry["violations"]],
+            entry["identifiers"],
+            dependencies,
+        )
+
+    def put(self, index, name, result):
+        self.ids[name] = {"hash": index.hashes[name], **result._asdict()}
+
+    def save(self, index):
+        """Save the results, dropping those of IDSs which are not in the DD."""
+        self.ids = {name: self.ids[name] for name in index.hashes if name in self.ids}
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as cache_file:
+            json.dump(
+                {"key": self.key, "utilities": self.utilities, "ids": self.ids},
+                cache_file,
+            )
+        os.replace(tmp_path, self.path)
+
+
+def _cache_key(reserved_names_file):
+    """Return a hash of the validation rules and of the reserved names."""
+    with open(__file__, "rb") as source, open(reserved_names_file, "rb") as names:
+        return _hash(source.read(), names.read())
+
+
+class ValidationReport:
+    """Violations found in the DD.
+
+    Attributes:
+        utilities: Violations in the utilities section
+        ids: Violations of every IDS, by IDS name, in the order of the DD
+        identifiers: Violations in the identifier files
+        validated: Names of the IDSs which were validated, the results of the
+            other IDSs come from the cache
+    """
+
+    def __init__(self, utilities, ids, identifiers, validated=None):
+        self.utilities = utilities
+        self.ids = ids
+        self.identifiers = identifiers
+        self.validated = list(ids) if validated is None else validated
+
+    @property
+    def violations(self):
+        """All violations, in the order of the text report."""
+        return [
+            *self.utilities,
+            *(item for violations in self.ids.values() for item in violations),
+            *self.identifiers,
+        ]
+
+    @property
+    def valid(self):
+        return not self.violations
+
+    def to_text(self):
+        """Return the report of dd_data_dictionary_validation.txt.xsl."""
+        if self.utilities:
+            parts = ["\nThe utilities section has errors:"]
+            parts.extend(map(_text_line, self.utilities))
+        else:
+            parts = ["\nThe utilities section is valid\n"]
+        for name, violations in self.ids.items():
+            if violations:
+                parts.append(f"IDS {name} has errors:\n")
+                parts.extend(map(_text_line, violations))
+            else:
+                parts.append(f"IDS {name} is valid.\n")
+        parts.extend(
+            f"\n    Error in identifier {item.path}: {item.message}\n"
+            for item in self.identifiers
+        )
+        return "".join(parts)
+
+    def to_json(self):
+        """Return the violations as a JSON document."""
+        return (
+            json.dumps(
+                {
+                    "valid": self.valid,
+                    "ids": list(self.ids),
+                    "violations": [item._asdict() for item in self.violations],
+                },
+                indent=1,
+            )
+            + "\n"
+        )
+
+    def to_junit(self):
+        """Return the results as JUnit XML, with one test case per rule and IDS."""
+        suites = ET.Element("testsuites", name="dd_validation")
+        self._junit_suite(suites, "utilities", ["timebasepath"], self.utilities)
+        for name, violations in self.ids.items():
+            self._junit_suite(suites, name, _FIELD_RULES, violations)
+        self._junit_suite(suites, "identifiers", IDENTIFIER_RULES, self.identifiers)
+        suites.set("tests", str(sum(int(suite.get("tests")) for suite in suites)))
+        suites.set("failures", str(len(self.violations)))
+        if hasattr(ET, "indent"):  # Python 3.9+
+            ET.indent(suites)
+        return ET.tostring(suites, encoding="unicode", xml_declaration=True) + "\n"
+
+    @staticmethod
+    def _junit_suite(suites, name, rules, violations):
+        by_rule = collections.defaultdict(list)
+        for item in violations:
+            by_rule[item.rule].append(item)
+        suite = ET.SubElement(
+            suites,
+            "testsuite",
+            name=name,
+            tests=str(len(rules)),
+            failures=str(len(by_rule)),
+        )
+        for rule in rules:
+            case = ET.SubElement(suite, "testcase", classname=name, name=rule)
+            if by_rule[rule]:
+                failure = ET.SubElement(
+                    case,
+                    "failure",
+                    message=f"{len(by_rule[rule])} violation(s) of {rule}",
+                )
+                failure.text = "\n".join(
+                    f"{item.path}: {item.message}" for item in by_rule[rule]
+                )
+
+
+def _text_line(violation):
+    return f"    Error in {violation.path}: {violation.message}\n"
+
+
+def validate(
+    dd_file,
+    jobs=1,
+    schemas_dir="schemas",
+    reserved_names_file="reserved_names.txt",
+    cache_file=None,
+):
+    """Validate dd_data_dictionary.xml.
+
+    Args:
+        dd_file: Path of dd_data_dictionary.xml
+        jobs: Number of worker processes validating the IDSs. With one job, all
+            IDSs are validated in this process.
+        schemas_dir: Directory containing the identifier files
+        reserved_names_file: Path of the list of reserved names
+        cache_file: Path of the :class:`ValidationCache`. When given, only the
+            IDSs which changed since the previous run (or which refer to an IDS
+            which changed) are validated.
+
+    Returns:
+        The :class:`ValidationReport`
+    """
+    index = DDIndex(dd_file, reserved_names_file)
+    cache = None
+    if cache_file is not None:
+        cache = ValidationCache(cache_file, _cache_key(reserved_names_file))
+
+    results = {}
+    for name in index.hashes:
+        result = cache and cache.get(index, name)
+        if result:
+            results[name] = result
+    names = [name for name in index.hashes if name not in results]
+    jobs = min(jobs, len(names))
+    if jobs > 1:
+        context = multiprocessing.get_context("spawn")
+        with concurrent.futures.ProcessPoolExecutor(
+            jobs,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(dd_file, reserved_names_file),
+        ) as pool:
+            results.update(zip(names, pool.map(_validate_ids, names)))
+    else:
+        results.update((name, index.validate_ids(name)) for name in names)
+
+    utilities = cache and cache.get_utilities(index)
+    if utilities is None:
+        utilities = index.validate_utilities()
+    if cache:
+        cache.put_utilities(index, utilities)
+        for name in names:
+            cache.put(index, name, results[name])
+        cache.save(index)
+
+    identifiers = {}
+    for name in index.hashes:
+        identifiers.update(dict.fromkeys(results[name].identifiers))
+    return ValidationReport(
+        utilities,
+        {name: results[name].violations for name in index.hashes},
+        validate_identifiers(identifiers, schemas_dir),
+        names,
+    )
+
+
+# DD index of a worker process
+_worker_index = None
+
+
+def _init_worker(dd_file, reserved_names_file):
+    global _worker_index
+    _worker_index = DDIndex(dd_file, reserved_names_file)
+
+
+def _validate_ids(name):
+    return _worker_index.validate_ids(name)
+
+
+#: Output formats of the command line interface
+FORMATS = {
+    "text": ValidationReport.to_text,
+    "json": ValidationReport.to_json,
+    "junit": ValidationReport.to_junit,
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Validate dd_data_dictionary.xml")
+    parser.add_argument(
+        "dd_file", nargs="?", default="dd_data_dictionary.xml", help="DD to validate"
+    )
+    parser.add_argument("-f", "--format", choices=FORMATS, default="text")
+    parser.add_argument("-o", "--output", help="Output file (default: stdout)")
+    parser.add_argument(
+        "-j", "--jobs", type=int, default=1, help="Number of worker processes"
+    )
+    parser.add_argument(
+        "--cache", help="Cache file, to only validate the IDSs which changed"
+    )
+    args = parser.parse_args(argv)
+    report = validate(args.dd_file, jobs=args.jobs, cache_file=args.cache)
+    output = FORMATS[args.format](report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8", newline="") as output_file:
+            output_file.write(output)
+    else:
+        sys.stdout.write(output)
+    return 0 if report.valid else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
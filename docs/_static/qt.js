@@ -11,24 +11,65 @@ let ignore_keywords = ["the", "to", "of", "for", "by", "and", "on", "or",
     "be", "been", , "encountered", "meaning", "shall", "not", "can", "each", "various", "given", "are", "used", "is", "put", "in",
     "at", "either", "taken", "from", "over", "such", "into", "takes", "some"];
 
-const occurring_data_types = new Set();
-const data_types_result = xmlDoc.evaluate('//field/@data_type', xmlDoc, null, XPathResult.ANY_TYPE, null);
+// The DD is split in one JSON shard per IDS (generated by the idsdef_shards Sphinx
+// extension). Only the manifest and the index of node names are loaded with
+// the page. The index of the words of the documentation is loaded by the first
+// search with keywords, and shards are fetched when a search needs them. All are
+// cached.
+const DD_URL = "dd/";
+let manifest = null;
+let names_index = null;
+let words_index = null;
+const shards = new Map();
+
+function fetchJSON(url) {
+    return fetch(DD_URL + url).then(response => {
+        if (!response.ok) throw new Error(`Could not load ${url}: ${response.status} ${response.statusText}`);
+        return response.json();
+    });
+}
 
-let node = null;
-while ((node = data_types_result.iterateNext())) {
-    occurring_data_types.add(node.textContent);
+function loadShard(entry) {
+    if (!shards.has(entry.name)) {
+        // The hash makes sure that the browser cache is not used for an outdated shard
+        const shard = fetchJSON(`${entry.shard}?${entry.hash}`).then(readShard);
+        shard.catch(() => shards.delete(entry.name));
+        shards.set(entry.name, shard);
+    }
+    return shards.get(entry.name);
 }
 
-//console.log(occurring_data_types);
+// Return the nodes of a shard (the IDS and its fields) in document order, every
+// node referring to its parent
+function readShard(shard) {
+    const ids = { name: shard.name, documentation: shard.documentation, page: shard.name, parent: null, depth: 1 };
+    const nodes = [ids];
+    shard.fields.forEach(field => {
+        const parent = field.parent < 0 ? ids : nodes[field.parent + 1];
+        nodes.push({ ...field, page: shard.name, parent: parent, depth: parent.depth + 1 });
+    });
+    return nodes;
+}
 
+Promise.all([fetchJSON("manifest.json"), fetchJSON("names.json")]).then(([manifest_data, names_data]) => {
+    manifest = manifest_data;
+    manifest.ids.forEach((entry, index) => entry.index = index);
+    names_index = names_data;
 
-occurring_data_types.forEach(type => {
+    manifest.data_types.forEach(type => {
 
-    let option = document.createElement("option");
-    option.setAttribute("value", type);
-    document.getElementById("occuring_data_types").appendChild(option);
+        let option = document.createElement("option");
+        option.setAttribute("value", type);
+        document.getElementById("occuring_data_types").appendChild(option);
 
-})
+    })
+    document.body.classList.add('ready');
+}).catch(error => {
+    document.body.classList.add('ready');
+    document.getElementById("search_results").innerHTML = "";
+    document.getElementById("search_results").appendChild(message(error.message));
+    document.getElementById("search_results_dropdown").style.display = "block";
+});
 
 
 function onSearchChanged(e) {
@@ -44,6 +85,8 @@ function onCoordsChanged(e) {
 }
 
 let onFiltersChangedTimer;
+// Incremented for every search, to ignore the results of outdated searches
+let searchGeneration = 0;
 
 function onFiltersChanged() {
 
@@ -63,195 +106,224 @@ function onFiltersChanged() {
 
         let keywords = searchString.match(/\b(\w+)'?(\w+)?\b/g)?.sort((a, b) => b.length - a.length).map(k => k.toLocaleLowerCase()) || [];
 
-        if (keywords.length || data_type || coords.length) {
-
-            const count_path_matches = "(" + keywords.map(
-                keyword => "number(boolean(ancestor-or-self::*[starts-with(@name, '" + keyword + "')" + (keyword.length >= 2 ? " or contains(@name, '_" + keyword + "')" : "") + "]))"
-            ).join(" + ") + ")";
+        if (manifest && (keywords.length || data_type || coords.length)) {
 
-            //const path_predicate = keywords.length ? count_path_matches + " >= " + keywords.length : "";
+            const generation = ++searchGeneration;
+            searchDD(keywords, data_type, coords).then(results => {
+                if (generation === searchGeneration)
+                    showResults(results, keywords, coords);
+            }).catch(error => {
+                if (generation === searchGeneration)
+                    showResults(message(error.message), [], []);
+            });
 
-            const count_desc_matches = "(" + keywords.map(keyword =>
-                "number(not(ancestor-or-self::*[starts-with(@name, '" + keyword + "')" + (keyword.length >= 2 ? " or contains(@name, '_" + keyword + "')" : "") + "]) and contains(concat(' ', translate(@documentation, 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz')), ' " + keyword + "'))"
-            ).join(" + ") + ")";
+        } else {
+            searchGeneration++;
+            document.getElementById("search_results_dropdown").style.display = "none";
+        }
 
-            //const desc_predicate = keywords.length ? "((" + count_desc_matches + " div (" + keywords.length + " - " + count_path_matches + ")) >= 0.8)" : "";
 
-            const keywords_predicate = keywords.length ? "((" + count_path_matches + " + " + count_desc_matches + ") >= " + keywords.length + ")" : "";
+    }, 500);
+}
 
-            const data_type_predicate = data_type ? "contains(@data_type, '" + data_type + "')" : "";
+function showResults(results, keywords, coords) {
 
-            //TODO: Stopped here, not done at all, replacing maxoccur by coords...
-            const coords_predicate = coords.length ? "(" + coords.map(coord => {
-                return `(@*[starts-with(name(), 'coordinate${coord.axis || ''}') and (('${coord.value}' = substring(., string-length(.) - string-length('${coord.value}') + 1)) or (string-length(substring-after(., '${coord.value}')) and not(contains(substring-after(., '${coord.value}'), '/'))))])`
-            }).join(' and ') + ")" : "";
+    const search_results_element = document.getElementById("search_results");
+    search_results_element.innerHTML = "";
 
-            const predicates = [];
-            if (data_type_predicate) predicates.push(data_type_predicate);
-            if (coords_predicate) predicates.push(coords_predicate);
-            if (keywords_predicate) predicates.push(keywords_predicate);
+    if (results.hasChildNodes())
+        search_results_element.appendChild(results);
+    else search_results_element.innerHTML = '<div id="no_results_message">No results</div>';
 
-            const selectStatement = `//*${predicates.length ? "[" + predicates.join(' and ') + "]" : ""}`;
+    if (keywords.length) {
+        const pattern = new RegExp(`([^<>]*?)(${keywords.join('|')})(?![^<>]*?>)`, 'gi');
+        // Replace each occurrence of a keyword with the encapsulated version
+        search_results_element.querySelectorAll(".path a, .description").forEach(u =>
+            u.innerHTML = u.innerHTML.replaceAll(pattern, function (match, p1, p2) {
+                return p1 + '<span class="highlight">' + p2 + '</span>';
+            })
+        )
+    }
 
-            //console.log(selectStatement)
+    if (coords.length) {
+        search_results_element.querySelectorAll(".coord .axis").forEach(u => {
+            let coord = coords.find(coord => coord.axis == u.innerHTML);
+            if (coord)
+                u.innerHTML = '<span class="highlight">' + coord.axis + '</span>';
+        })
+
+        const pattern = new RegExp(`([^<>]*?)(${coords.map(coord => coord.value).join('|')})(?![^<>]*?>)`, 'gi');
+        // Replace each occurrence of a keyword with the encapsulated version
+
+        search_results_element.querySelectorAll(".coord .value").forEach(u =>
+            u.innerHTML = u.innerHTML.replace(pattern, function (match, p1, p2) {
+                return p1 + '<span class="highlight">' + p2 + '</span>';
+            })
+        )
+    }
 
-            const sortStatement = keywords.length ? `(${count_path_matches} * 100) - (count(ancestor-or-self::*[@name]) + (string-length(concat(@name, ancestor::node()[1]/@name, ancestor::node()[2]/@name, ancestor::node()[3]/@name, ancestor::node()[4]/@name)) * 0.2)) + number(boolean(ancestor-or-self::IDS[${keywords.map(
-                keyword => "starts-with(@name, '" + keyword + "')"
-            ).join(" or ")}])) + (number(${keywords.map(
-                keyword => "not(ancestor-or-self::*[starts-with(@name, '" + keyword + "')" + (keyword.length >= 2 ? " or contains(@name, '_" + keyword + "')" : "") + "]) and starts-with(translate(@documentation, 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), '" + keyword + "')"
-            ).join(" or ")}) * 20)` : "1";
+    document.getElementById("search_results_dropdown").style.display = "block";
+    document.getElementById("search_results_dropdown").scrollTop = 0;
+}
 
-            //console.log(sortStatement)
+function message(text) {
+    const fragment = document.createDocumentFragment();
+    const node = element("div", null, text);
+    node.id = "no_results_message";
+    fragment.appendChild(node);
+    return fragment;
+}
 
 
-            let resultDocument = searchXMLDoc(selectStatement, sortStatement);
-            const search_results_element = document.getElementById("search_results");
-            search_results_element.innerHTML = "";
+// A keyword matches the start of a node name, or (for keywords of at least 2
+// characters) a part of the name after an underscore
+function nameMatches(name, keyword) {
+    return name.startsWith(keyword) || (keyword.length >= 2 && name.includes("_" + keyword));
+}
 
-            if (resultDocument.hasChildNodes())
-                search_results_element.appendChild(resultDocument);
-            else search_results_element.innerHTML = '<div id="no_results_message">No results</div>';
+function pathMatches(node, keyword) {
+    for (let ancestor = node; ancestor; ancestor = ancestor.parent)
+        if (nameMatches(ancestor.name, keyword)) return true;
+    return false;
+}
 
-            if (keywords.length) {
-                const pattern = new RegExp(`([^<>]*?)(${keywords.join('|')})(?![^<>]*?>)`, 'gi');
-                // Replace each occurrence of a keyword with the encapsulated version
-                search_results_element.querySelectorAll(".path a, .description").forEach(u =>
-                    u.innerHTML = u.innerHTML.replaceAll(pattern, function (match, p1, p2) {
-                        return p1 + '<span class="highlight">' + p2 + '</span>';
-                    })
-                )
-            }
+function lowerDocumentation(node) {
+    if (node.lower_documentation === undefined)
+        node.lower_documentation = node.documentation.replace(/[A-Z]/g, c => c.toLowerCase());
+    return node.lower_documentation;
+}
 
-            if (coords.length) {
-                search_results_element.querySelectorAll(".coord .axis").forEach(u => {
-                    let coord = coords.find(coord => coord.axis == u.innerHTML);
-                    if (coord)
-                        u.innerHTML = '<span class="highlight">' + coord.axis + '</span>';
-                })
-
-                const pattern = new RegExp(`([^<>]*?)(${coords.map(coord => coord.value).join('|')})(?![^<>]*?>)`, 'gi');
-                // Replace each occurrence of a keyword with the encapsulated version
-
-                search_results_element.querySelectorAll(".coord .value").forEach(u =>
-                    u.innerHTML = u.innerHTML.replace(pattern, function (match, p1, p2) {
-                        return p1 + '<span class="highlight">' + p2 + '</span>';
-                    })
-                )
-            }
+function coordinateMatches(node, coord) {
+    return Object.entries(node.coordinates || {}).some(([name, value]) => {
+        if (!name.startsWith("coordinate" + (coord.axis || ""))) return false;
+        if (value.endsWith(coord.value)) return true;
+        // Or the value is followed by the last part of the coordinate path
+        const index = value.indexOf(coord.value);
+        const after = index < 0 ? "" : value.slice(index + coord.value.length);
+        return after.length > 0 && !after.includes("/");
+    });
+}
 
-            document.getElementById("search_results_dropdown").style.display = "block";
-            document.getElementById("search_results_dropdown").scrollTop = 0;
+// Return the IDSs which can contain results: those containing the data type, and
+// for every keyword a node name or a word of the documentation matching it
+async function candidateIDSs(keywords, data_type) {
+    let candidates = manifest.ids;
+    if (data_type)
+        candidates = candidates.filter(entry => entry.data_types.some(type => type.includes(data_type)));
+    if (keywords.length) {
+        if (!words_index)
+            words_index = fetchJSON("words.json").catch(error => { words_index = null; throw error; });
+        const words = await words_index;
+        keywords.forEach(keyword => {
+            const matching = new Set();
+            Object.entries(names_index).forEach(([name, indices]) => {
+                if (nameMatches(name, keyword)) indices.forEach(index => matching.add(index));
+            });
+            Object.entries(words).forEach(([word, indices]) => {
+                if (word.startsWith(keyword)) indices.forEach(index => matching.add(index));
+            });
+            candidates = candidates.filter(entry => matching.has(entry.index));
+        });
+    }
+    return candidates;
+}
 
-        } else {
-            document.getElementById("search_results_dropdown").style.display = "none";
+async function searchDD(keywords, data_type, coords) {
+
+    const candidates = await candidateIDSs(keywords, data_type);
+    const nodes = (await Promise.all(candidates.map(loadShard))).flat();
+    const results = [];
+
+    nodes.forEach(node => {
+
+        if (data_type && !(node.data_type || "").includes(data_type)) return;
+        if (coords.length && !coords.every(coord => coordinateMatches(node, coord))) return;
+
+        let score = 1;
+        if (keywords.length) {
+            // Keywords match the path of the node, or its documentation
+            const path_matches = keywords.filter(keyword => pathMatches(node, keyword));
+            const other_keywords = keywords.filter(keyword => !path_matches.includes(keyword));
+            const documentation = " " + lowerDocumentation(node);
+            const desc_matches = other_keywords.filter(keyword => documentation.includes(" " + keyword));
+            if (path_matches.length + desc_matches.length < keywords.length) return;
+
+            // Rank short paths matching many keywords first
+            let names = "";
+            for (let ancestor = node, i = 0; ancestor && i < 5; ancestor = ancestor.parent, i++)
+                names += ancestor.name;
+            score = path_matches.length * 100 - (node.depth + names.length * 0.2)
+                + Number(keywords.some(keyword => node.page.startsWith(keyword)))
+                + Number(other_keywords.some(keyword => documentation.startsWith(" " + keyword))) * 20;
         }
-
-
-    }, 500);
+        results.push({ node: node, score: score });
+    });
+
+    // Array.sort is stable: results with the same score stay in document order
+    results.sort((a, b) => b.score - a.score);
+    const fragment = document.createDocumentFragment();
+    results.forEach(result => fragment.appendChild(resultItem(result.node)));
+    return fragment;
 }
 
+function element(tag, className, text) {
+    const node = document.createElement(tag);
+    if (className) node.className = className;
+    if (text !== undefined) node.textContent = text;
+    return node;
+}
 
-function searchXMLDoc(selectStatement, sortStatement) {
-
-    const xsltString = `<?xml version="1.0"?>
-    <xsl:stylesheet version="1.0" 
-    xmlns:xsl="http://www.w3.org/1999/XSL/Transform" 
-    xmlns:fn="http://www.w3.org/2005/02/xpath-functions">
-
-        <xsl:output method="html"/>
-
-        <xsl:template match="/*">
-            <xsl:for-each select="${selectStatement}">
-
-                <xsl:sort select="${sortStatement}" order="descending" data-type="number"/>
-
-                <div class="item">
-
-                    <xsl:variable name="page">
-                        <xsl:value-of select="ancestor-or-self::IDS/@name" />
-                    </xsl:variable>
-
-                    <div class="head" >
-                        <xsl:attribute name="onclick">onResultHeadClicked(event, '#<xsl:value-of select="$page"/><xsl:if test="@path">-<xsl:value-of select="translate(@path, '/', '-')"/></xsl:if>')</xsl:attribute>
-
-                        <span class="path">
-                            <xsl:for-each select="ancestor::*[@name]">
-                                <a>
-                                    <xsl:attribute name="href">../generated/ids/<xsl:value-of select="$page"/>.html#<xsl:value-of select="$page"/><xsl:if test="@path">-<xsl:value-of select="translate(@path, '/', '-')"/></xsl:if></xsl:attribute>
-                                    <xsl:value-of select="@name"/>
-                                </a>
-                                <span>/</span>
-                            </xsl:for-each>
-                            <a>
-                            <xsl:attribute name="href">../generated/ids/<xsl:value-of select="$page"/>.html#<xsl:value-of select="$page"/><xsl:if test="@path">-<xsl:value-of select="translate(@path, '/', '-')"/></xsl:if></xsl:attribute>
-                                <xsl:value-of select="@name"/>
-                            </a>
-                        </span>
-                    </div>
-
-                    <div class="details">
-                        <div class="flex">
-                        
-                            <span class="data_type">
-                                <xsl:choose>
-                                    <xsl:when test="name() = 'field'">
-                                        <xsl:value-of select="@data_type"/>
-                                    </xsl:when>
-                                    <xsl:otherwise>
-                                        <xsl:text>IDS</xsl:text>
-                                    </xsl:otherwise>
-                                </xsl:choose>
-                            </span>
-
-                            <xsl:if test="name() = 'field'">
-                                <span class="coords">
-                                        <div class="coords_dropdown">
-                                                <xsl:for-each select="@*[starts-with(name(), 'coordinate')]">
-                                                        <xsl:variable name="coord_index">
-                                                                <xsl:value-of select="translate(name(), 'coordinatesm_', '')"/>
-                                                        </xsl:variable>
-                                                        <div>
-                                                                <xsl:choose>
-                                                                        <xsl:when test="contains(name(), 'same_as')">
-                                                                                <xsl:attribute name='class'>coord same_as</xsl:attribute>
-                                                                        </xsl:when>
-                                                                        <xsl:when test="ancestor::*[@*[name() = concat('coordinate', $coord_index, '_same_as')]]">
-                                                                                <xsl:attribute name='class'>coord has_same_as</xsl:attribute>
-                                                                        </xsl:when>
-                                                                        <xsl:otherwise>
-                                                                                <xsl:attribute name='class'>coord</xsl:attribute>
-                                                                        </xsl:otherwise>
-                                                                </xsl:choose>
-                                                                <span class="axis"><xsl:value-of select="$coord_index"/></span>
-                                                                :
-                                                                <span class="value"><xsl:value-of select="."/></span>
-                                                        </div>
-                                                </xsl:for-each>
-                                        </div>
-                                </span>
-                            </xsl:if>
-                        
-                        </div>
-
-                        <div class="description">
-                            <xsl:value-of select="@documentation"/>
-                        </div>
-                    </div>
-
-                </div>
-
-            </xsl:for-each>
-        </xsl:template>
-
-    </xsl:stylesheet>
-    `;
-
-    const xsltProcessor = new XSLTProcessor();
-    const xsltDoc = parser.parseFromString(xsltString, "application/xml");
-    xsltProcessor.importStylesheet(xsltDoc);
-
-    return xsltProcessor.transformToFragment(xmlDoc, document);
+function resultItem(node) {
+
+    const item = element("div", "item");
+    const anchor = (node) => `${node.page}${node.path ? "-" + node.path.replaceAll("/", "-") : ""}`;
+
+    const head = element("div", "head");
+    head.addEventListener("click", event => onResultHeadClicked(event, "#" + anchor(node)));
+    const path = element("span", "path");
+    const ancestors = [];
+    for (let ancestor = node; ancestor; ancestor = ancestor.parent)
+        ancestors.unshift(ancestor);
+    ancestors.forEach((ancestor, index) => {
+        const link = element("a", null, ancestor.name);
+        link.href = `../generated/ids/${node.page}.html#${anchor(ancestor)}`;
+        path.appendChild(link);
+        if (index < ancestors.length - 1) path.appendChild(element("span", null, "/"));
+    });
+    head.appendChild(path);
+    item.appendChild(head);
+
+    const details = element("div", "details");
+    const flex = element("div", "flex");
+    flex.appendChild(element("span", "data_type", node.parent ? node.data_type : "IDS"));
+
+    if (node.parent) {
+        const coords = element("span", "coords");
+        const dropdown = element("div", "coords_dropdown");
+        Object.entries(node.coordinates).forEach(([name, value]) => {
+            const coord_index = name.replace(/[coordinatesm_]/g, "");
+            let className = "coord";
+            if (name.includes("same_as"))
+                className = "coord same_as";
+            else {
+                for (let ancestor = node.parent; ancestor; ancestor = ancestor.parent)
+                    if (ancestor.coordinates && `coordinate${coord_index}_same_as` in ancestor.coordinates)
+                        className = "coord has_same_as";
+            }
+            const coord = element("div", className);
+            coord.appendChild(element("span", "axis", coord_index));
+            coord.appendChild(document.createTextNode(" : "));
+            coord.appendChild(element("span", "value", value));
+            dropdown.appendChild(coord);
+        });
+        coords.appendChild(dropdown);
+        flex.appendChild(coords);
+    }
 
+    details.appendChild(flex);
+    details.appendChild(element("div", "description", node.documentation));
+    item.appendChild(details);
+    return item;
 }
 
 window.addEventListener('click', function (e) {
@@ -282,5 +354,3 @@ function onResultHeadClicked(event, hash) {
         window.location = hash;
 
 }
-
-document.body.classList.add('ready');
\ No newline at end of file
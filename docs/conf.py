@@ -44,6 +44,10 @@ language = "en"
 #   For example: SPHINXOPTS="-D dd_changelog_generate=1 -D dd_autodoc_generate=1"
 dd_changelog_generate = True
 dd_autodoc_generate = True
+dd_shards_generate = True
+# Number of processes generating the IDS reference, 0 to follow sphinx-build -j
+#   For example: SPHINXOPTS="-j auto" or SPHINXOPTS="-D dd_autodoc_jobs=4"
+dd_autodoc_jobs = 0
 
 
 # -- General configuration ---------------------------------------------------
@@ -58,6 +62,7 @@ extensions = [
     "sphinx_dd_extension.dd_domain",
     "sphinx_dd_extension.autodoc",
     "sphinx_dd_extension.dd_changelog",
+    "sphinx_dd_extension.idsdef_shards",
 ]
 
 templates_path = ["_templates"]
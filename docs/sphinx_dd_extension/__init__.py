@@ -0,0 +1,24 @@
+"""Sphinx extensions for documenting the Data Dictionary."""
+
+import functools
+import importlib.util
+from pathlib import Path
+import sys
+
+
+@functools.lru_cache(maxsize=None)
+def get_xml_backend():
+    """Return the XML parser backend of the ``imas_data_dictionary`` package.
+
+    See :mod:`imas_data_dictionary.xml_backend`. When the package is not installed,
+    the backend module is loaded from this repository.
+    """
+    try:
+        from imas_data_dictionary import xml_backend
+    except ImportError:
+        path = Path(__file__).parents[2] / "imas_data_dictionary" / "xml_backend.py"
+        spec = importlib.util.spec_from_file_location("dd_xml_backend", path)
+        xml_backend = importlib.util.module_from_spec(spec)
+        sys.modules[spec.name] = xml_backend
+        spec.loader.exec_module(xml_backend)
+    return xml_backend.get_backend()
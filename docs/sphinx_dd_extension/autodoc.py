@@ -1,15 +1,49 @@
 """An autodoc-like plugin for documenting the Data Dictionary
 """
 
+from __future__ import annotations
+
+import concurrent.futures
+import contextlib
+import filecmp
+import hashlib
+import io
+import json
+import logging as _logging
+import multiprocessing
+import os
 from pathlib import Path
 import re
+import sys
+import tempfile
 from textwrap import indent
-from typing import Any, Dict, List, Set
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    Iterator,
+    List,
+    NamedTuple,
+    Set,
+    TextIO,
+    Tuple,
+    Union,
+)
 from xml.etree import ElementTree
 
-from sphinx.application import Sphinx
 from sphinx.util import logging
 
+if TYPE_CHECKING:  # Not imported by the worker processes
+    from sphinx.application import Sphinx
+
+from sphinx_dd_extension import get_xml_backend
+from sphinx_dd_extension.dd_index import (
+    Section,
+    get_dd_etree,
+    get_dd_index,
+    section_data,
+)
+
 logger = logging.getLogger(__name__)
 
 
@@ -17,34 +51,183 @@ logger = logging.getLogger(__name__)
 DOCUMENTED_UTILITIES = ["ids_properties","code"]
 # Indentation character
 INDENT = " "
-# Cached DD XML element tree
-_etree = None
+# Content hashes of the sources of the generated files, see AutodocManifest
+MANIFEST_FILE = Path("generated/autodoc_manifest.json")
+# File mode creation mask, applied to the files written by updated_file
+_UMASK = os.umask(0)
+os.umask(_UMASK)
 
 
 def update_file(path: Path, text: str):
-    if path.exists():
-        if path.read_text() == text:
+    with updated_file(path) as file:
+        file.write(text)
+
+
+@contextlib.contextmanager
+def updated_file(path: Path) -> Iterator[TextIO]:
+    """Open a file for writing, which only replaces ``path`` if the content changed.
+
+    The content is written to a unique temporary file, which is compared with
+    ``path`` when it is closed. Concurrent Sphinx builds of the same tree therefore
+    never replace ``path`` with each other's partially written files.
+    """
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    tmp_path = Path(tmp_name)
+    try:
+        # mkstemp creates the file only readable by the owner
+        os.chmod(tmp_path, 0o666 & ~_UMASK)
+        with open(fd, "w") as file:
+            yield file
+        if path.exists() and filecmp.cmp(tmp_path, path, shallow=False):
             return  # Nothing to be done!
-    path.write_text(text)
+        os.replace(tmp_path, path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+
+class RstWriter:
+    """Writes rst to a file, collapsing three or more newlines into two.
+
+    This gives the same result as ``re.sub(r"[\\n]{3,}", "\\n\\n", text)`` on the
+    complete text, while only the trailing newlines of the text written so far are
+    kept in memory.
+    """
+
+    def __init__(self, file: TextIO):
+        self.file = file
+        self._newlines = 0
+
+    def write(self, text: str):
+        body = text.lstrip("\n")
+        self._newlines += len(text) - len(body)
+        if not body:
+            return
+        self.file.write("\n" * min(self._newlines, 2))
+        end = body.rstrip("\n")
+        self.file.write(_NEWLINES.sub("\n\n", end))
+        self._newlines = len(body) - len(end)
+
+    def close(self):
+        self.file.write("\n" * min(self._newlines, 2))
+        self._newlines = 0
+
+
+_NEWLINES = re.compile(r"[\n]{3,}")
 
 
 def get_xml_etree():
-    global _etree
-    if _etree is None:
-        _etree = ElementTree.parse("../IDSDef.xml")
-    return _etree
+    return get_dd_etree()
 
 
 def get_cocos_version():
-    etree = get_xml_etree()
-    cocos = etree.find("cocos")
-    return cocos.text
+    return get_dd_index().cocos
+
+
+class DocTask(NamedTuple):
+    """Generation of rst files, which can run in a worker process.
+
+    Args:
+        kind: ``ids``, ``util`` or ``identifier``
+        names: Names of the IDS, of the utilities, or of the identifier file
+        source: XML element, serialized XML (bytes), section of IDSDef.xml (see
+            :func:`_task_source`) or path of the identifier file
+    """
+
+    kind: str
+    names: Tuple[str, ...]
+    source: Union[ElementTree.Element, bytes, Section, Path]
+
+
+class AutodocManifest:
+    """Content hashes of the sources of the generated rst files.
+
+    Every task is recorded with the hash of its source (the XML of the IDS, of the
+    utilities section, or of the identifier file) and the size and modification
+    time of the files it generated. A task is up to date when these didn't change,
+    and the manifest was written by the same version of the generator (see
+    :func:`_generator_version`). When the version changed, all tasks are outdated,
+    but their files are still known, so files of removed tasks are deleted.
+    """
+
+    def __init__(self, path: Path, version: str):
+        self.path = path
+        self.version = version
+        try:
+            data = json.loads(path.read_text())
+        except (OSError, ValueError):
+            data = {}
+        self.tasks = data.get("tasks", {})
+        if data.get("version") != version:
+            self.tasks = {
+                name: {"key": None, "files": record["files"]}
+                for name, record in self.tasks.items()
+            }
+
+    def is_up_to_date(self, name: str, key: str, docfiles: List[str]) -> bool:
+        record = self.tasks.get(name)
+        return (
+            record is not None
+            and record["key"] == key
+            and record["files"] == _stat_files(docfiles)
+        )
+
+    def record(self, name: str, key: str, docfiles: List[str]):
+        self.tasks[name] = {"key": key, "files": _stat_files(docfiles)}
+
+    def remove_stale(self, names: Set[str]):
+        """Remove the tasks which no longer exist, and the files they generated."""
+        for name in set(self.tasks) - names:
+            for docfile in self.tasks.pop(name)["files"]:
+                Path(docfile).unlink(missing_ok=True)
+
+    def save(self):
+        data = {"version": self.version, "tasks": self.tasks}
+        self.path.write_text(json.dumps(data, indent=1, sort_keys=True))
+
+
+def _stat_files(paths: List[str]) -> Dict[str, Any]:
+    """Return the size and modification time of the files, None when missing."""
+    result = {}
+    for path in paths:
+        try:
+            stat = Path(path).stat()
+            result[path] = [stat.st_size, stat.st_mtime_ns]
+        except OSError:
+            result[path] = None
+    return result
+
+
+def _generator_version() -> str:
+    """Return a hash of everything the rst files depend on besides their source."""
+    digest = hashlib.sha256()
+    # This module and the modules of this package and the XML backend it uses
+    backend_module = sys.modules[type(get_xml_backend()).__module__]
+    package_dir = Path(__file__).parent
+    for path in [
+        Path(__file__),
+        package_dir / "__init__.py",
+        package_dir / "dd_index.py",
+        Path(backend_module.__file__),
+    ]:
+        digest.update(hashlib.sha256(path.read_bytes()).digest())
+    # link_to_url checks which documents exist
+    for path in sorted(Path("../html_documentation").rglob("*")):
+        digest.update(f"{path}\n".encode())
+    return digest.hexdigest()
 
 
 def generate_dd_docs(app: Sphinx):
     """Read IDSDef.xml and generate rst reference files.
 
     Generate rst files for: all IDSs, common utilities and identifiers.
+
+    Only the files whose source changed since the last run are generated again,
+    see :class:`AutodocManifest`. Files are only written when their content
+    changed, so Sphinx only reads the changed files again.
+
+    With ``dd_autodoc_jobs`` (or, when it is 0, the ``-j`` option of Sphinx) larger
+    than one, the files are generated in parallel worker processes. The workers get
+    the XML of their IDS sliced from IDSDef.xml, instead of parsing the whole file.
     """
     if not app.config.dd_autodoc_generate:
         logger.warning(
@@ -53,35 +236,145 @@ def generate_dd_docs(app: Sphinx):
         return
 
     logger.info("Generating DD documentation sources.")
-    etree = get_xml_etree()
+    jobs = app.config.dd_autodoc_jobs or getattr(app, "parallel", 1) or 1
+    dd_index = get_dd_index()
     # Ensure output folders exist
     for folder in ("ids", "util", "identifier"):
         (Path("generated") / folder).mkdir(parents=True, exist_ok=True)
 
-    for ids in etree.iterfind("IDS"):
-        idsname = ids.get("name")
-        if not idsname:
-            raise RuntimeError("Empty IDS name!")
-        docfile = Path(f"generated/ids/{idsname}.rst")
-        update_file(docfile, ids2rst(ids))
+    # Tasks are identified by the hash of their source, see dd_index. The workers
+    # parse only the part of IDSDef.xml they need.
+    tasks = []
+    keys = []
+    for section in dd_index.ids:
+        tasks.append(DocTask("ids", (section.name,), section))
+        keys.append(section.key)
 
     for util in DOCUMENTED_UTILITIES:
-        node = etree.find(f"utilities/field[@name='{util}']")
-        if not node:
+        if util not in dd_index.utility_names:
             raise RuntimeError(f"Utility {util} does not exist in DD XML")
-        docfile = Path(f"generated/util/{util}.rst")
-        update_file(docfile, util2rst(node))
+    tasks.append(DocTask("util", tuple(DOCUMENTED_UTILITIES), dd_index.utilities))
+    keys.append(dd_index.utilities.key)
 
     # Find all ../*/*_identifier.xml files
     for identifier in Path.cwd().parent.glob("schemas/*/*_identifier.xml"):
-        iden_tree = ElementTree.parse(identifier)
-        element = iden_tree.getroot()
-        docfile = Path(f"generated/identifier/{identifier.stem}.rst")
-        fname = identifier.relative_to(identifier.parents[1])  # folder/file.xml
-        update_file(docfile, identifier2rst(element, fname))
+        tasks.append(DocTask("identifier", (identifier.stem,), identifier))
+        keys.append(hashlib.sha256(identifier.read_bytes()).hexdigest())
+
+    manifest = AutodocManifest(MANIFEST_FILE, _generator_version())
+    names = [f"{task.kind}/{','.join(task.names)}" for task in tasks]
+    manifest.remove_stale(set(names))
+    todo = [
+        index
+        for index, task in enumerate(tasks)
+        if not manifest.is_up_to_date(names[index], keys[index], doc_files(task))
+    ]
+    logger.info("%d of %d DD documentation sources changed.", len(todo), len(tasks))
+    todo_tasks = [_task_source(tasks[i], jobs) for i in todo]
+
+    try:
+        for index, docfiles in zip(todo, _run_doc_tasks(todo_tasks, jobs)):
+            manifest.record(names[index], keys[index], docfiles)
+    finally:
+        manifest.save()
     logger.info("Finished generating DD documentation sources.")
 
 
+def _task_source(task: DocTask, jobs: int) -> DocTask:
+    """Replace the section of IDSDef.xml in a task by what doc_task2rst needs.
+
+    Worker processes get the serialized element. Otherwise, the element of the
+    parsed IDSDef.xml is used, which is parsed at most once.
+    """
+    if task.kind == "identifier":
+        return task
+    if jobs > 1:
+        return task._replace(source=section_data(task.source))
+    etree = get_dd_etree()
+    if task.kind == "ids":
+        element = get_xml_backend().find_ids(etree, task.names[0])
+    else:
+        element = etree.find("utilities")
+    return task._replace(source=element)
+
+
+def _run_doc_tasks(tasks: List[DocTask], jobs: int) -> Iterator[List[str]]:
+    """Run the tasks, in parallel worker processes when jobs > 1.
+
+    Yields:
+        Result of :func:`doc_task2rst` for every task, in the order of the tasks
+    """
+    if jobs <= 1 or len(tasks) <= 1:
+        for task in tasks:
+            yield doc_task2rst(task)
+        return
+
+    # Larger tasks first, so that the workers finish at about the same time
+    sizes = [len(t.source) if isinstance(t.source, bytes) else 0 for t in tasks]
+    order = sorted(range(len(tasks)), key=sizes.__getitem__, reverse=True)
+    context = multiprocessing.get_context("spawn")
+    with concurrent.futures.ProcessPoolExecutor(
+        min(jobs, len(tasks)), mp_context=context, initializer=_init_worker
+    ) as pool:
+        futures = {index: pool.submit(_worker_task, tasks[index]) for index in order}
+        for index in range(len(tasks)):
+            docfiles, records = futures[index].result()
+            # Warnings of the workers are logged by Sphinx in this process
+            for level, message in records:
+                logger.log(level, message)
+            yield docfiles
+
+
+# Log messages of the current task of a worker process
+_worker_records = []
+
+
+class _RecordHandler(_logging.Handler):
+    def emit(self, record: _logging.LogRecord):
+        _worker_records.append((record.levelno, record.getMessage()))
+
+
+def _init_worker():
+    logger.logger.addHandler(_RecordHandler())
+    logger.logger.propagate = False
+
+
+def _worker_task(task: DocTask):
+    try:
+        return doc_task2rst(task), list(_worker_records)
+    finally:
+        _worker_records.clear()
+
+
+def doc_files(task: DocTask) -> List[str]:
+    """Return the paths of the rst files generated by a task."""
+    return [f"generated/{task.kind}/{name}.rst" for name in task.names]
+
+
+def doc_task2rst(task: DocTask) -> List[str]:
+    """Write the rst files of a task, when their content changed.
+
+    Returns:
+        List of the paths of the rst files
+    """
+    backend = get_xml_backend()
+    source = task.source
+    if isinstance(source, bytes):
+        source = backend.parse(io.BytesIO(source))
+    docfiles = doc_files(task)
+    if task.kind == "ids":
+        with updated_file(Path(docfiles[0])) as file:
+            write_ids_rst(file, source)
+    elif task.kind == "util":
+        for docfile, util in zip(docfiles, task.names):
+            with updated_file(Path(docfile)) as file:
+                write_util_rst(file, backend.find_field(source, util))
+    else:
+        fname = source.relative_to(source.parents[1])  # folder/file.xml
+        update_file(Path(docfiles[0]), identifier2rst(backend.parse(source), fname))
+    return docfiles
+
+
 def parse_documentation(text: str) -> str:
     """Parse documentation string from a DD node.
 
@@ -156,6 +449,13 @@ def parse_lifecycle_status(field: ElementTree.Element) -> List[str]:
 
 def util2rst(node: ElementTree.Element) -> str:
     """Convert a utilities/field node to rst documentation."""
+    file = io.StringIO()
+    write_util_rst(file, node)
+    return file.getvalue()
+
+
+def write_util_rst(file: TextIO, node: ElementTree.Element):
+    """Write the rst documentation of a utilities/field node to a file."""
     result = []
     name = node.get("name")
     title = f"``{name}`` structure"
@@ -168,14 +468,26 @@ def util2rst(node: ElementTree.Element) -> str:
     result.append(indent(parse_documentation(node.get("documentation")), INDENT))
     result.append("")
     result.append(indent("\n".join(parse_lifecycle_status(node)), INDENT))
-    result.append(children2rst(node, 1, set()))
-    result.append("")
-    # Collapse triple or more newlines
-    return re.sub(r"[\n]{3,}", "\n\n", "\n".join(result))
+    writer = RstWriter(file)
+    writer.write("\n".join(result) + "\n")
+    write_children(writer, node, 1, set())
+    writer.write("\n")
+    writer.close()
 
 
 def ids2rst(ids: ElementTree.Element) -> str:
     """Convert an IDS Element to rst documentation."""
+    file = io.StringIO()
+    write_ids_rst(file, ids)
+    return file.getvalue()
+
+
+def write_ids_rst(file: TextIO, ids: ElementTree.Element):
+    """Write the rst documentation of an IDS Element to a file.
+
+    The documentation of the fields is written while they are converted, instead
+    of being collected first.
+    """
     # Cache all elements with alternative coordinates
     coordinates_with_alternatives = {
         # Strip leading (:) / (:,:) / etc.
@@ -210,21 +522,24 @@ def ids2rst(ids: ElementTree.Element) -> str:
     # Lifecycle status
     result.append(indent("\n".join(parse_lifecycle_status(ids)), INDENT))
 
-    result.append(children2rst(ids, 1, coordinates_with_alternatives))
-    result.append("")
-    # Collapse triple or more newlines
-    return re.sub(r"[\n]{3,}", "\n\n", "\n".join(result))
+    writer = RstWriter(file)
+    writer.write("\n".join(result) + "\n")
+    write_children(writer, ids, 1, coordinates_with_alternatives)
+    writer.write("\n")
+    writer.close()
 
 
-def field2rst(
+def write_field(
+    writer: RstWriter,
     field: ElementTree.Element,
     has_error: bool,
     level: int,
     coordinates_with_alternatives: Set[str],
-) -> str:
-    """Convert an IDS Field element to rst documentation.
+):
+    """Write the rst documentation of an IDS Field element and its children.
 
     Args:
+        writer: Writer of the rst file
         field: XML element of this field
         has_error: True iff this field has corresponding error nodes
         level: indentation level
@@ -235,7 +550,8 @@ def field2rst(
         util = field.get("structure_reference")
         assert len(util.split()) == 1, "structure_reference may not contain whitespace"
         path = field.get("path_doc")
-        return indent(f".. dd:util-ref:: {path} {util}\n", INDENT * level)
+        writer.write(indent(f".. dd:util-ref:: {path} {util}\n", INDENT * level))
+        return
 
     result = []
     result.append(f".. dd:node:: {field.get('path_doc')}")
@@ -359,19 +675,21 @@ def field2rst(
     level += 1
     result = indent("\n".join(result), INDENT * level)
     result = result[len(INDENT) :]  # Indent first line one level lower
+    writer.write(result + "\n")
     # Add documentation for children
-    result += "\n" + children2rst(field, level, coordinates_with_alternatives)
-    return result
+    write_children(writer, field, level, coordinates_with_alternatives)
 
 
-def children2rst(
+def write_children(
+    writer: RstWriter,
     element: ElementTree.Element,
     level: int,
     coordinates_with_alternatives: Set[str],
-) -> str:
-    """Convert all children of an IDS element to rst documentation.
+):
+    """Write the rst documentation of all children of an IDS element.
 
     Args:
+        writer: Writer of the rst file
         element: XML element of this field
         level: indentation level
     """
@@ -389,11 +707,18 @@ def children2rst(
                 has_error.add(fieldname)
                 skip.add(error_name)
 
-    return "\n".join(
-        field2rst(field, fieldname in has_error, level, coordinates_with_alternatives)
-        for fieldname, field in children.items()
-        if fieldname not in skip
-    )
+    separator = ""
+    for fieldname, field in children.items():
+        if fieldname not in skip:
+            writer.write(separator)
+            separator = "\n"
+            write_field(
+                writer,
+                field,
+                fieldname in has_error,
+                level,
+                coordinates_with_alternatives,
+            )
 
 
 def identifier2rst(element: ElementTree.Element, fname: Path) -> str:
@@ -430,6 +755,8 @@ def identifier2rst(element: ElementTree.Element, fname: Path) -> str:
 
 def setup(app: Sphinx) -> Dict[str, Any]:
     app.add_config_value("dd_autodoc_generate", True, "env", [bool])
+    # Number of worker processes generating the rst files, 0 to use the -j option
+    app.add_config_value("dd_autodoc_jobs", 0, "env", [int])
     app.setup_extension("sphinx_dd_extension.dd_domain")
     app.connect("builder-inited", generate_dd_docs)
     return {
@@ -6,6 +6,7 @@ Logic is partly based on code in the :external:py:mod:`sphinx.domains` module.
 
 from __future__ import annotations
 
+import hashlib
 from pathlib import Path
 from typing import Any, Dict, List
 from git import Repo, Tag
@@ -18,7 +19,7 @@ import os
 from sphinx.application import Sphinx
 from sphinx.util import logging
 
-from xml.etree import ElementTree
+from sphinx_dd_extension.dd_index import get_dd_index
 
 logger = logging.getLogger(__name__)
 try:
@@ -29,6 +30,7 @@ except Exception as _:
     is_gitrepo = False
     
 try:
+    import imas
     from imas import IDSFactory
     from imas.dd_zip import dd_xml_versions
     from imas.ids_convert import DDVersionMap
@@ -39,9 +41,12 @@ except ImportError:
     has_imaspy = False
 
 
+# Inputs of the IDS migration guide when it was last generated
+MIGRATION_GUIDE_KEY_FILE = Path("generated/changelog/ids_changes.key")
+
+
 def get_current_ids_names():
-    etree = ElementTree.parse("../IDSDef.xml")
-    return [x.get("name") for x in etree.iterfind("IDS")]
+    return [section.name for section in get_dd_index().ids]
 
 
 def heading(s: str, style="-"):
@@ -381,13 +386,39 @@ def generate_dd_changelog(app: Sphinx):
         return
 
     docfile = Path("generated/changelog/ids.rst")
-    docfile.unlink(True)
 
     if not has_imaspy:
+        MIGRATION_GUIDE_KEY_FILE.unlink(True)
+        docfile.parent.mkdir(parents=True, exist_ok=True)
         docfile.write_text(
             heading("IDS migration guide <MISSING>", "=")
             + "ImportError: Could not import ``imaspy``."
         )
+        return
+
+    dd_index = get_dd_index()
+    versions = [
+        x.name
+        for x in reversed(get_tags())
+        if x.name != dd_index.version and x.name in dd_xml_versions()
+    ]
+    # IDSFactory parses IDSDef.xml and all old DD versions, only do this when the
+    # guide is outdated
+    key = hashlib.sha256(Path(__file__).read_bytes())
+    key.update(f"{dd_index.key} {imas.__version__} {versions}".encode())
+    key = key.hexdigest()
+    version_docfiles = [
+        Path(f"generated/changelog/ids_changes/{version}.rst") for version in versions
+    ]
+    if (
+        MIGRATION_GUIDE_KEY_FILE.exists()
+        and MIGRATION_GUIDE_KEY_FILE.read_text() == key
+        and all(path.exists() for path in [docfile] + version_docfiles)
+    ):
+        logger.info("DD ids migration guide sources are up to date.")
+        return
+    MIGRATION_GUIDE_KEY_FILE.unlink(True)
+    docfile.unlink(True)
 
     logger.info("Generating DD ids migration guide sources.")
 
@@ -398,12 +429,6 @@ def generate_dd_changelog(app: Sphinx):
 
     factory = IDSFactory(xml_path=my_ids_xml)
 
-    versions = [
-        x.name
-        for x in reversed(get_tags())
-        if x.name != factory.version and x.name in dd_xml_versions()
-    ]
-
     output = heading("IDS migration guide", "#")
     output += heading(f"IDS migration guide to: {factory.version}", "=")
     output += f"Below you can find all changes the current ({factory.version})"
@@ -411,9 +436,7 @@ def generate_dd_changelog(app: Sphinx):
 
     output += ".. toctree::\n   :maxdepth: 1\n   :caption: DD versions\n\n"
 
-    for version in versions:
-        version_docfile = Path(f"generated/changelog/ids_changes/{version}.rst")
-
+    for version, version_docfile in zip(versions, version_docfiles):
         version_docfile.unlink(True)
 
         text = ""
@@ -466,6 +489,7 @@ def generate_dd_changelog(app: Sphinx):
 
     with open(docfile, "w") as f:
         f.write(output)
+    MIGRATION_GUIDE_KEY_FILE.write_text(key)
 
 
 def setup(app: Sphinx) -> Dict[str, Any]:
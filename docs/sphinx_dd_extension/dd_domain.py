@@ -8,7 +8,7 @@ from functools import partial
 import logging
 from pathlib import Path
 import re
-from typing import cast, Iterable, Optional, Dict, List, Tuple, Any
+from typing import cast, Iterable, Optional, Dict, List, Set, Tuple, Any
 
 from docutils import nodes
 from docutils.statemachine import StringList
@@ -324,7 +324,9 @@ class DDDomain(Domain):
     }
     initial_data = {
         "objects": {},  # fullname -> docname, node_id, objtype
+        "docobjects": {},  # docname -> set of fullnames
     }
+    data_version = 1
 
     @property
     def objects(self) -> Dict[str, Tuple[str, str, str]]:
@@ -335,6 +337,19 @@ class DDDomain(Domain):
         """
         return self.data.setdefault("objects", {})
 
+    @property
+    def docobjects(self) -> Dict[str, Set[str]]:
+        """Get the fullnames of the objects in every document.
+
+        This allows clearing and merging documents without iterating over all
+        objects. An object may also be listed for documents which no longer own it,
+        when it was registered again by another document.
+
+        Returns:
+            Dictionary mapping document_name -> set of fullnames
+        """
+        return self.data.setdefault("docobjects", {})
+
     def note_object(
         self, fullname: str, objtype: str, node_id: str, location: Any = None
     ) -> None:
@@ -348,24 +363,35 @@ class DDDomain(Domain):
                 fullname,
                 docname,
             )
+        docobjects = self.docobjects.setdefault(self.env.docname, set())
         self.objects[fullname] = (self.env.docname, node_id, objtype)
+        docobjects.add(fullname)
         if objtype == "identifier":
             # Allow to refer to the short name as well for identifiers
             shortname = Path(fullname).stem
             if shortname not in self.objects:
                 self.objects[shortname] = (self.env.docname, node_id, objtype)
+                docobjects.add(shortname)
 
     # Implement methods that should be overwritten
 
     def clear_doc(self, docname: str) -> None:
-        for fullname, (obj_docname, _node_id, _l) in list(self.objects.items()):
-            if obj_docname == docname:
+        for fullname in self.docobjects.pop(docname, ()):
+            obj = self.objects.get(fullname)
+            if obj is not None and obj[0] == docname:
                 del self.objects[fullname]
 
     def merge_domaindata(self, docnames: List[str], otherdata: dict) -> None:
-        for fullname, (fn, node_id, objtype) in otherdata["objects"].items():
-            if fn in docnames:
-                self.objects[fullname] = (fn, node_id, objtype)
+        objects = otherdata["objects"]
+        for docname in docnames:
+            owned = {
+                fullname: objects[fullname]
+                for fullname in otherdata["docobjects"].get(docname, ())
+                if objects.get(fullname, ("",))[0] == docname
+            }
+            if owned:
+                self.objects.update(owned)
+                self.docobjects.setdefault(docname, set()).update(owned)
 
     def find_obj(
         self, ids_name: Optional[str], name: str, typ: Optional[str]
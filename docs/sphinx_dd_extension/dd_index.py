@@ -0,0 +1,156 @@
+"""Shared access to IDSDef.xml for the DD Sphinx extensions.
+
+All extensions (and ``conf.py``) get the information they need about IDSDef.xml
+from :func:`get_dd_index`. The index is stored in ``generated/dd_index.pickle``
+together with the hash of IDSDef.xml, so the XML is only parsed when it changed,
+and then only once per build.
+
+The content, parsed tree and index of IDSDef.xml are kept in memory as long as the
+file is not modified, also across the builds of e.g. ``sphinx-autobuild``.
+"""
+
+from __future__ import annotations
+
+import functools
+import hashlib
+import io
+import os
+import pickle
+from pathlib import Path
+import re
+from typing import List, NamedTuple, Tuple
+
+from sphinx.util import logging
+
+from sphinx_dd_extension import get_xml_backend
+
+logger = logging.getLogger(__name__)
+
+DD_XML = Path("../IDSDef.xml")
+INDEX_FILE = Path("generated/dd_index.pickle")
+# Increase when the content of DDIndex changes, to invalidate stored indices
+INDEX_VERSION = 1
+
+
+class Section(NamedTuple):
+    """Location of an element in the bytes of IDSDef.xml."""
+
+    name: str
+    start: int
+    end: int
+    key: str
+    """sha256 of the serialized element"""
+
+
+class DDIndex(NamedTuple):
+    """Information about IDSDef.xml needed by the DD Sphinx extensions."""
+
+    key: str
+    """sha256 of IDSDef.xml"""
+    version: str
+    cocos: str
+    ids: Tuple[Section, ...]
+    utilities: Section
+    utility_names: Tuple[str, ...]
+
+
+def _file_state() -> Tuple[str, int, int]:
+    """Return the path, modification time and size of IDSDef.xml."""
+    stat = DD_XML.stat()
+    return str(DD_XML.resolve()), stat.st_mtime_ns, stat.st_size
+
+
+def read_dd() -> bytes:
+    """Return the content of IDSDef.xml."""
+    return _read_dd(_file_state())
+
+
+def get_dd_etree():
+    """Return the parsed IDSDef.xml.
+
+    IDSDef.xml is parsed at most once, until it is modified. Prefer
+    :func:`get_dd_index` where possible, which does not need to parse IDSDef.xml at
+    all when it didn't change.
+    """
+    return _parse_dd(_file_state())
+
+
+def get_dd_index() -> DDIndex:
+    """Return the index of IDSDef.xml, building it when IDSDef.xml changed."""
+    return _load_index(_file_state())
+
+
+@functools.lru_cache(maxsize=1)
+def _read_dd(state) -> bytes:
+    return DD_XML.read_bytes()
+
+
+@functools.lru_cache(maxsize=1)
+def _parse_dd(state):
+    logger.info("Parsing %s", DD_XML)
+    return get_xml_backend().parse(io.BytesIO(_read_dd(state)))
+
+
+@functools.lru_cache(maxsize=1)
+def _load_index(state) -> DDIndex:
+    data = _read_dd(state)
+    key = hashlib.sha256(data).hexdigest()
+    try:
+        with open(INDEX_FILE, "rb") as file:
+            version, index = pickle.load(file)
+        if version == INDEX_VERSION and index.key == key:
+            return index
+    except Exception:  # Missing, outdated or corrupt, build it again
+        pass
+
+    index = build_index(data, _parse_dd(state), key)
+    INDEX_FILE.parent.mkdir(parents=True, exist_ok=True)
+    tmp_file = INDEX_FILE.with_name(f"{INDEX_FILE.name}.tmp")
+    with open(tmp_file, "wb") as file:
+        pickle.dump((INDEX_VERSION, index), file, pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_file, INDEX_FILE)
+    return index
+
+
+def build_index(data: bytes, etree, key: str) -> DDIndex:
+    """Create the index of IDSDef.xml.
+
+    Args:
+        data: Content of IDSDef.xml
+        etree: Parsed IDSDef.xml
+        key: Hash of IDSDef.xml
+    """
+    ids_names = [ids.get("name") for ids in etree.iterfind("IDS")]
+    ids_sections = sections(data, "IDS")
+    if len(ids_sections) != len(ids_names):
+        raise RuntimeError("Could not split IDSDef.xml into IDSs")
+    if not all(ids_names):
+        raise RuntimeError("Empty IDS name!")
+    utilities = etree.find("utilities")
+    return DDIndex(
+        key=key,
+        version=etree.find("version").text,
+        cocos=etree.find("cocos").text,
+        ids=tuple(
+            section._replace(name=name)
+            for name, section in zip(ids_names, ids_sections)
+        ),
+        utilities=sections(data, "utilities")[0],
+        utility_names=tuple(field.get("name") for field in utilities.iterfind("field")),
+    )
+
+
+def sections(data: bytes, tag: str) -> List[Section]:
+    """Return the serialized elements with this tag, which may not be nested."""
+    result = []
+    end_tag = f"</{tag}>".encode()
+    for match in re.finditer(f"<{tag}[\\s>]".encode(), data):
+        end = data.index(end_tag, match.start()) + len(end_tag)
+        digest = hashlib.sha256(data[match.start() : end]).hexdigest()
+        result.append(Section(tag, match.start(), end, digest))
+    return result
+
+
+def section_data(section: Section) -> bytes:
+    """Return the serialized element of a section of IDSDef.xml."""
+    return read_dd()[section.start : section.end]
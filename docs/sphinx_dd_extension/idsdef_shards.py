@@ -0,0 +1,174 @@
+"""Generate the DD for the query tool of the documentation (_static/qt.js).
+
+Every IDS is written to its own JSON shard ``ids/<name>.json``, which the query tool
+only downloads when it needs it. ``manifest.json`` lists the IDSs, with the content
+hash of their shard and the data types they contain. ``names.json`` maps the name of
+every node to the (manifest indices of the) IDSs containing it, and ``words.json``
+does the same for the words of the documentation, so that searches only download the
+shards which can match.
+"""
+
+from __future__ import annotations
+
+import collections
+import hashlib
+import json
+import os
+from pathlib import Path
+import re
+from typing import TYPE_CHECKING, Any, Dict
+
+from sphinx.util import logging
+
+if TYPE_CHECKING:
+    from sphinx.application import Sphinx
+
+from sphinx_dd_extension.dd_index import get_dd_etree, get_dd_index
+
+logger = logging.getLogger(__name__)
+
+SHARDS_DIR = Path("_static/dd")
+
+_ASCII_UPPERCASE = re.compile("[A-Z]")
+
+
+def generate_idsdef_shards(app: Sphinx):
+    """Write the shards of IDSDef.xml, when it or this module changed."""
+    if not app.config.dd_shards_generate:
+        logger.warning("Not generating DD query tool data (dd_shards_generate=False)")
+        return
+
+    digest = hashlib.sha256(get_dd_index().key.encode())
+    digest.update(Path(__file__).read_bytes())
+    key = digest.hexdigest()
+    try:
+        manifest = json.loads((SHARDS_DIR / "manifest.json").read_text())
+        if manifest.get("key") == key:
+            return
+    except (OSError, ValueError):
+        pass
+
+    logger.info("Generating DD query tool data in %s", SHARDS_DIR)
+    write_shards(get_dd_etree(), get_dd_index().version, SHARDS_DIR, key)
+
+
+def write_shards(etree, version: str, shards_dir: Path, key: str = ""):
+    """Write the shards, the manifest and the indices of a parsed DD.
+
+    Shards are only written when their content changed, and shards of IDSs which no
+    longer exist are removed.
+
+    Args:
+        etree: Parsed IDSDef.xml
+        version: Version of the DD
+        shards_dir: Folder of the output files
+        key: Identifies the DD and the code the shards were generated from
+    """
+    ids_dir = shards_dir / "ids"
+    ids_dir.mkdir(parents=True, exist_ok=True)
+    manifest = {"version": version, "key": key, "ids": []}
+    names = collections.defaultdict(list)
+    words = collections.defaultdict(list)
+    data_types = set()
+    for index, ids in enumerate(etree.iterfind("IDS")):
+        name = ids.get("name")
+        shard = _idsdef_shard(ids)
+        text = json.dumps(shard, separators=(",", ":"))
+        _write_if_changed(ids_dir / f"{name}.json", text)
+        ids_types = sorted({field["data_type"] for field in shard["fields"]})
+        data_types.update(ids_types)
+        manifest["ids"].append(
+            {
+                "name": name,
+                "shard": f"ids/{name}.json",
+                "hash": hashlib.sha256(text.encode()).hexdigest()[:16],
+                "size": len(text),
+                "data_types": ids_types,
+            }
+        )
+        for node_name in {name, *(field["name"] for field in shard["fields"])}:
+            names[node_name].append(index)
+        documentation = " ".join(
+            [
+                shard["documentation"],
+                *(field["documentation"] for field in shard["fields"]),
+            ]
+        )
+        # The query tool matches keywords with the start of the words of the
+        # documentation, ignoring the case of ASCII letters
+        for word in set(_ASCII_UPPERCASE.sub(_lower, documentation).split(" ")):
+            if word:
+                words[word].append(index)
+    manifest["data_types"] = sorted(data_types)
+
+    shards = {entry["shard"] for entry in manifest["ids"]}
+    for path in ids_dir.glob("*.json"):
+        if f"ids/{path.name}" not in shards:
+            path.unlink()
+    for path, index in (("names.json", names), ("words.json", words)):
+        _write_if_changed(
+            shards_dir / path,
+            json.dumps(dict(sorted(index.items())), separators=(",", ":")),
+        )
+    # Written last: it tells that the other files are up to date
+    _write_if_changed(shards_dir / "manifest.json", json.dumps(manifest, indent=1))
+
+
+def _lower(match):
+    return match.group(0).lower()
+
+
+def _idsdef_shard(ids) -> Dict[str, Any]:
+    """Return an IDS as a JSON object, with its fields as a list in document order.
+
+    Every field refers to the index of its parent field (-1 for the IDS itself), and
+    only has the attributes used by the query tool.
+    """
+    fields = []
+
+    def add_fields(element, parent):
+        for field in element.iterfind("field"):
+            fields.append(
+                {
+                    "parent": parent,
+                    "name": field.get("name"),
+                    "path": field.get("path"),
+                    "data_type": field.get("data_type", ""),
+                    "documentation": field.get("documentation", ""),
+                    "coordinates": {
+                        key: value
+                        for key, value in field.attrib.items()
+                        if key.startswith("coordinate")
+                    },
+                }
+            )
+            add_fields(field, len(fields) - 1)
+
+    add_fields(ids, -1)
+    return {
+        "name": ids.get("name"),
+        "documentation": ids.get("documentation", ""),
+        "fields": fields,
+    }
+
+
+def _write_if_changed(path: Path, text: str):
+    """Write a text file, unless it already has this content."""
+    try:
+        if path.read_text(encoding="utf-8") == text:
+            return
+    except OSError:
+        pass
+    tmp_path = path.with_name(f"{path.name}.tmp")
+    tmp_path.write_text(text, encoding="utf-8")
+    os.replace(tmp_path, path)
+
+
+def setup(app: Sphinx) -> Dict[str, Any]:
+    app.add_config_value("dd_shards_generate", True, "env", [bool])
+    app.connect("builder-inited", generate_idsdef_shards)
+    return {
+        "version": "0.1",
+        "parallel_read_safe": True,
+        "parallel_write_safe": True,
+    }
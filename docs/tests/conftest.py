@@ -0,0 +1,53 @@
+"""Fixtures of the tests of the Sphinx extensions of the documentation."""
+
+import shutil
+import sys
+from pathlib import Path
+
+import pytest
+
+DOCS = Path(__file__).resolve().parents[1]
+ROOT = DOCS.parent
+# IDSs of the reduced DD used by the tests
+IDS_NAMES = ("amns_data", "barometry")
+# Identifier files of the test project, relative to the schemas folder
+IDENTIFIERS = ("utilities/coordinate_identifier.xml", "utilities/ggd_identifier.xml")
+
+# The extensions are imported from the documentation folder, also by the worker
+# processes which inherit sys.path
+sys.path.insert(0, str(DOCS))
+
+
+@pytest.fixture(scope="session")
+def reduced_dd(tmp_path_factory):
+    """IDSDef.xml with the utilities and a few IDSs of dd_data_dictionary.xml."""
+    import xml.etree.ElementTree as ET
+
+    dd_file = ROOT / "dd_data_dictionary.xml"
+    if not dd_file.is_file():
+        pytest.skip("requires a generated dd_data_dictionary.xml")
+    tree = ET.parse(dd_file)
+    root = tree.getroot()
+    for ids in root.findall("IDS"):
+        if ids.get("name") not in IDS_NAMES:
+            root.remove(ids)
+    path = tmp_path_factory.mktemp("dd") / "IDSDef.xml"
+    tree.write(path, encoding="UTF-8", xml_declaration=True)
+    return path
+
+
+@pytest.fixture
+def dd_project(reduced_dd, tmp_path, monkeypatch):
+    """A documentation project, with the reduced DD, in which the tests run.
+
+    The current directory is the ``docs`` folder of the project.
+    """
+    pytest.importorskip("sphinx")
+    shutil.copy(reduced_dd, tmp_path / "IDSDef.xml")
+    for identifier in IDENTIFIERS:
+        (tmp_path / "schemas" / identifier).parent.mkdir(parents=True, exist_ok=True)
+        shutil.copy(ROOT / "schemas" / identifier, tmp_path / "schemas" / identifier)
+    (tmp_path / "html_documentation").mkdir()
+    (tmp_path / "docs").mkdir()
+    monkeypatch.chdir(tmp_path / "docs")
+    return tmp_path
@@ -0,0 +1,175 @@
+"""Tests of the generation of the rst files of the DD reference."""
+
+import io
+import os
+from pathlib import Path
+import re
+import shutil
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("sphinx")
+from sphinx_dd_extension import autodoc  # noqa: E402
+
+
+def _collapse(text):
+    """Collapse newlines like the rst generation did before it was streamed."""
+    return re.sub(r"[\n]{3,}", "\n\n", text)
+
+
+@pytest.mark.parametrize(
+    "chunks",
+    [
+        [],
+        [""],
+        ["\n\n\n"],
+        ["text"],
+        ["text\n"],
+        ["text\n\n\n\n"],
+        ["\n\n\n\ntext"],
+        ["a\n\n\nb\n\n\n\n\nc\nd\n\ne"],
+        ["a\n", "\n", "", "\n", "b"],
+        ["a", "\n\n", "\n\n", "b\n\n", "\n"],
+        ["a\n\n\n", "\n\nb", "\n", "c\n\n\n\n"],
+    ],
+)
+def test_rst_writer(chunks):
+    file = io.StringIO()
+    writer = autodoc.RstWriter(file)
+    for chunk in chunks:
+        writer.write(chunk)
+    writer.close()
+    assert file.getvalue() == _collapse("".join(chunks))
+
+
+def test_rst_writer_all_splits():
+    text = "\n\ntitle\n=====\n\n\n\n.. dd:node:: a\n\n\n   doc\n\n\nend\n\n\n\n"
+    for split in range(len(text) + 1):
+        file = io.StringIO()
+        writer = autodoc.RstWriter(file)
+        writer.write(text[:split])
+        writer.write(text[split:])
+        writer.close()
+        assert file.getvalue() == _collapse(text), split
+
+
+def test_updated_file(tmp_path):
+    path = tmp_path / "page.rst"
+    autodoc.update_file(path, "content\n")
+    assert path.read_text() == "content\n"
+    stat = path.stat()
+
+    # Unchanged files are not touched, so Sphinx does not read them again
+    autodoc.update_file(path, "content\n")
+    assert path.stat().st_mtime_ns == stat.st_mtime_ns
+    assert path.stat().st_ino == stat.st_ino
+
+    autodoc.update_file(path, "")
+    assert path.read_text() == ""
+
+    # The file is kept when writing fails
+    with pytest.raises(RuntimeError):
+        with autodoc.updated_file(path) as file:
+            file.write("partial")
+            raise RuntimeError
+    assert path.read_text() == ""
+    assert [p.name for p in tmp_path.iterdir()] == ["page.rst"]
+
+
+def _generate_docs(jobs):
+    """Run the autodoc extension, return the content of the generated rst files."""
+    config = SimpleNamespace(dd_autodoc_generate=True, dd_autodoc_jobs=jobs)
+    autodoc.generate_dd_docs(SimpleNamespace(config=config, parallel=1))
+    return {
+        str(path): path.read_bytes()
+        for path in sorted(Path("generated").glob("*/*.rst"))
+    }
+
+
+@pytest.fixture
+def serial_docs(dd_project, tmp_path_factory, monkeypatch):
+    """The rst files generated in this process, in another project."""
+    other = tmp_path_factory.mktemp("serial")
+    shutil.copytree(dd_project, other, dirs_exist_ok=True)
+    with monkeypatch.context() as context:
+        context.chdir(other / "docs")
+        return _generate_docs(jobs=1)
+
+
+def test_generate_dd_docs_parallel(dd_project, serial_docs):
+    assert sorted(serial_docs) == [
+        "generated/identifier/coordinate_identifier.rst",
+        "generated/identifier/ggd_identifier.rst",
+        "generated/ids/amns_data.rst",
+        "generated/ids/barometry.rst",
+        "generated/util/code.rst",
+        "generated/util/ids_properties.rst",
+    ]
+    assert _generate_docs(jobs=2) == serial_docs
+
+
+def _modify_dd(dd_project, old, new, count=1):
+    """Modify IDSDef.xml, with a new modification time."""
+    dd_xml = dd_project / "IDSDef.xml"
+    text, n = re.subn(old, new, dd_xml.read_text(encoding="utf-8"), flags=re.S)
+    assert n == count
+    dd_xml.write_text(text, encoding="utf-8")
+    stat = dd_xml.stat()
+    os.utime(dd_xml, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+
+def _mtimes():
+    return {
+        str(path): path.stat().st_mtime_ns for path in Path("generated").rglob("*.rst")
+    }
+
+
+def test_generate_dd_docs_incremental(dd_project, serial_docs, caplog):
+    caplog.set_level("INFO")
+    assert _generate_docs(jobs=1) == serial_docs
+    mtimes = _mtimes()
+
+    # Nothing changed: no task runs, no file is written
+    assert _generate_docs(jobs=1) == serial_docs
+    assert _mtimes() == mtimes
+    assert "0 of 5 DD documentation sources changed." in caplog.text
+
+    # Only the rst file of the modified IDS is generated again
+    _modify_dd(dd_project, "Pressure measurements", "Changed pressure measurements")
+    docs = _generate_docs(jobs=2)
+    assert b"Changed pressure measurements" in docs["generated/ids/barometry.rst"]
+    assert {name for name in docs if docs[name] != serial_docs[name]} == {
+        "generated/ids/barometry.rst"
+    }
+    changed = {name for name, mtime in _mtimes().items() if mtime != mtimes[name]}
+    assert changed == {"generated/ids/barometry.rst"}
+    assert "1 of 5 DD documentation sources changed." in caplog.text
+
+    # Files of removed IDSs are deleted
+    _modify_dd(dd_project, r'<IDS name="amns_data".*?</IDS>\s*', "")
+    assert "generated/ids/amns_data.rst" not in _generate_docs(jobs=1)
+
+
+def test_generate_dd_docs_new_version(dd_project, serial_docs, monkeypatch):
+    assert _generate_docs(jobs=1) == serial_docs
+    mtimes = _mtimes()
+
+    # A new version of the generator generates all files again (which are only
+    # written when they changed), and still deletes the files of removed IDSs
+    monkeypatch.setattr(autodoc, "_generator_version", lambda: "new version")
+    _modify_dd(dd_project, r'<IDS name="amns_data".*?</IDS>\s*', "")
+    docs = _generate_docs(jobs=1)
+    assert "generated/ids/amns_data.rst" not in docs
+    assert docs == {
+        name: text for name, text in serial_docs.items() if "amns_data" not in name
+    }
+    assert all(mtimes[name] == mtime for name, mtime in _mtimes().items())
+
+
+def test_generator_version(dd_project):
+    version = autodoc._generator_version()
+    assert autodoc._generator_version() == version
+    # Documents which exist in html_documentation are linked
+    (dd_project / "html_documentation" / "page.html").write_text("")
+    assert autodoc._generator_version() != version
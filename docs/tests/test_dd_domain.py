@@ -0,0 +1,79 @@
+"""Tests of the bookkeeping of the objects of the DD domain."""
+
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("sphinx")
+from sphinx_dd_extension.dd_domain import DDDomain  # noqa: E402
+
+
+def _domain(objects):
+    """Create a domain with objects, given as (docname, fullname, objtype)."""
+    env = SimpleNamespace(domaindata={}, docname=None)
+    domain = DDDomain(env)
+    for docname, fullname, objtype in objects:
+        env.docname = docname
+        domain.note_object(fullname, objtype, f"id-{fullname}")
+    return domain
+
+
+OBJECTS = [
+    ("ids/a", "a", "ids"),
+    ("ids/a", "a/time", "node"),
+    ("ids/b", "b", "ids"),
+    ("ids/b", "b/time", "node"),
+    ("identifier/c", "utilities/c_identifier.xml", "identifier"),
+]
+
+
+def test_note_object():
+    domain = _domain(OBJECTS)
+    assert domain.objects["a/time"] == ("ids/a", "id-a/time", "node")
+    assert domain.docobjects == {
+        "ids/a": {"a", "a/time"},
+        "ids/b": {"b", "b/time"},
+        # Identifiers can also be referred to by their short name
+        "identifier/c": {"utilities/c_identifier.xml", "c_identifier"},
+    }
+
+
+def test_clear_doc():
+    # a/time is described again in ids/b
+    domain = _domain([*OBJECTS, ("ids/b", "a/time", "node")])
+    domain.clear_doc("ids/a")
+    assert sorted(domain.objects) == [
+        "a/time",
+        "b",
+        "b/time",
+        "c_identifier",
+        "utilities/c_identifier.xml",
+    ]
+    assert domain.objects["a/time"][0] == "ids/b"
+    assert "ids/a" not in domain.docobjects
+
+    domain.clear_doc("ids/b")
+    domain.clear_doc("identifier/c")
+    domain.clear_doc("unknown")
+    assert domain.objects == {}
+    assert domain.docobjects == {}
+
+
+def test_merge_domaindata():
+    # Documents read by a parallel worker, in addition to the document ids/b
+    # which the worker got from the main process and described again
+    worker = _domain([*OBJECTS, ("ids/a", "b/time", "node")])
+    domain = _domain([OBJECTS[0]])
+    domain.clear_doc("ids/a")
+    domain.merge_domaindata(["ids/a", "identifier/c"], worker.data)
+
+    merged = ("a", "a/time", "b/time", "utilities/c_identifier.xml", "c_identifier")
+    assert domain.objects == {name: worker.objects[name] for name in merged}
+    assert domain.docobjects == {
+        "ids/a": {"a", "a/time", "b/time"},
+        "identifier/c": {"utilities/c_identifier.xml", "c_identifier"},
+    }
+
+    # Documents without objects
+    domain.merge_domaindata(["index"], worker.data)
+    assert "index" not in domain.docobjects
@@ -0,0 +1,64 @@
+"""Tests of the index of IDSDef.xml shared by the Sphinx extensions."""
+
+import os
+import re
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from conftest import IDS_NAMES
+
+pytest.importorskip("sphinx")
+from sphinx_dd_extension import dd_index  # noqa: E402
+
+
+def test_dd_index(dd_project, monkeypatch):
+    index = dd_index.get_dd_index()
+    etree = dd_index.get_dd_etree()
+    assert tuple(section.name for section in index.ids) == IDS_NAMES
+    assert index.version == etree.find("version").text
+    assert index.cocos == etree.find("cocos").text
+    assert "ids_properties" in index.utility_names
+    data = dd_index.section_data(index.ids[1])
+    assert data.startswith(b'<IDS name="barometry"') and data.endswith(b"</IDS>")
+    assert dd_index.section_data(index.utilities).startswith(b"<utilities>")
+
+    # The stored index is used without parsing IDSDef.xml
+    assert dd_index.INDEX_FILE.is_file()
+    dd_index._load_index.cache_clear()
+    dd_index._parse_dd.cache_clear()
+
+    def build_index(*args):
+        raise AssertionError("IDSDef.xml should not be parsed")
+
+    monkeypatch.setattr(dd_index, "build_index", build_index)
+    assert dd_index.get_dd_index() == index
+    assert dd_index._parse_dd.cache_info().currsize == 0
+
+
+def test_dd_index_modified(dd_project):
+    index = dd_index.get_dd_index()
+    dd_xml = dd_project / "IDSDef.xml"
+    text = dd_xml.read_text(encoding="utf-8")
+    dd_xml.write_text(
+        re.sub("<cocos>[0-9]+</cocos>", "<cocos>99</cocos>", text), encoding="utf-8"
+    )
+    stat = dd_xml.stat()
+    os.utime(dd_xml, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    # A regenerated IDSDef.xml is used in the same process, e.g. by sphinx-autobuild
+    assert dd_index.get_dd_index().cocos == "99"
+    assert dd_index.get_dd_index().key != index.key
+    assert dd_index.get_dd_etree().find("cocos").text == "99"
+
+
+def test_migration_guide_without_imas(dd_project, monkeypatch):
+    pytest.importorskip("git")
+    from sphinx_dd_extension import dd_changelog
+
+    monkeypatch.setattr(dd_changelog, "has_imaspy", False)
+    app = SimpleNamespace(config=SimpleNamespace(dd_changelog_generate=True))
+    dd_changelog.generate_dd_changelog(app)
+    text = Path("generated/changelog/ids.rst").read_text()
+    assert text.startswith("IDS migration guide <MISSING>")
@@ -0,0 +1,71 @@
+"""Tests of the data of the query tool of the documentation."""
+
+import json
+from pathlib import Path
+import re
+from types import SimpleNamespace
+
+import pytest
+
+from conftest import IDS_NAMES
+
+pytest.importorskip("sphinx")
+from sphinx_dd_extension import dd_index, idsdef_shards  # noqa: E402
+
+
+def _generate_shards():
+    config = SimpleNamespace(dd_shards_generate=True)
+    idsdef_shards.generate_idsdef_shards(SimpleNamespace(config=config))
+
+
+def test_idsdef_shards(dd_project):
+    shards_dir = Path("_static/dd")
+    (shards_dir / "ids").mkdir(parents=True)
+    (shards_dir / "ids" / "removed.json").write_text("{}")
+
+    _generate_shards()
+    manifest = json.loads((shards_dir / "manifest.json").read_text())
+    assert manifest["version"] == dd_index.get_dd_index().version
+    assert tuple(entry["name"] for entry in manifest["ids"]) == IDS_NAMES
+    assert sorted(path.name for path in (shards_dir / "ids").iterdir()) == [
+        "amns_data.json",
+        "barometry.json",
+    ]
+    barometry = dd_index.get_dd_etree().find("IDS[@name='barometry']")
+    shard = json.loads((shards_dir / manifest["ids"][1]["shard"]).read_text())
+    assert len(shard["fields"]) == len(barometry.findall(".//field"))
+    for field in shard["fields"]:
+        parent = shard["fields"][field["parent"]] if field["parent"] >= 0 else None
+        expected_path = f"{parent['path']}/{field['name']}" if parent else field["name"]
+        assert field["path"] == expected_path
+    gauge = next(field for field in shard["fields"] if field["path"] == "gauge")
+    assert gauge["coordinates"] == {"coordinate1": "1...N"}
+    assert "FLT_1D" in manifest["ids"][1]["data_types"]
+
+    names = json.loads((shards_dir / "names.json").read_text())
+    assert names["barometry"] == [1] and names["gauge"] == [1]
+    words = json.loads((shards_dir / "words.json").read_text())
+    assert words["pressure"] == [1]
+
+    # Nothing is written when IDSDef.xml didn't change
+    mtimes = {path: path.stat().st_mtime_ns for path in shards_dir.rglob("*.json")}
+    _generate_shards()
+    assert {path: path.stat().st_mtime_ns for path in mtimes} == mtimes
+
+    # Only the shards which changed are written again
+    dd_xml = dd_project / "IDSDef.xml"
+    text = dd_xml.read_text(encoding="utf-8")
+    text, count = re.subn("Pressure measurements", "Changed measurements", text)
+    assert count == 1
+    dd_xml.write_text(text, encoding="utf-8")
+    _generate_shards()
+    changed = {path.name for path in mtimes if path.stat().st_mtime_ns != mtimes[path]}
+    assert changed == {"barometry.json", "manifest.json", "words.json"}
+    words = json.loads((shards_dir / "words.json").read_text())
+    assert words["changed"] == [1]
+
+
+def test_idsdef_shards_disabled(dd_project):
+    config = SimpleNamespace(dd_shards_generate=False)
+    idsdef_shards.generate_idsdef_shards(SimpleNamespace(config=config))
+    assert not Path("_static/dd").exists()
@@ -1,9 +1,32 @@
+import argparse
+import collections
+import concurrent.futures
+import contextlib
+import glob
+import hashlib
+import io
+import json
+import multiprocessing
 import os
+import pathlib
+import re
 import shutil
+import sys
+import tempfile
+import time
+import traceback
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
 
 import saxonche  # type: ignore[import-not-found]
 from setuptools_scm import get_version
 
+import dd_compiler
+import dd_validation
+
 PWD = os.path.realpath(os.path.dirname(__file__))
 UAL = os.path.dirname(PWD)
 
@@ -26,20 +49,153 @@ names_xsl = "IDSNames.txt.xsl"
 names_txt = "IDSNames.txt"
 valid_xsl = "dd_data_dictionary_validation.txt.xsl"
 valid_txt = "dd_data_dictionary_validation.txt"
-js_xsl = "docs/generate_js_IDSDef.xsl"
-js_def = "docs/_static/IDSDefxml.js"
-
-
-def generate_dd_data_dictionary(extra_opts=""):
-    print("generating dd_data_dictionary.xml")
-    with saxonche.PySaxonProcessor(license=False) as proc:
-        xsltproc = proc.new_xslt30_processor()
-        xdm_ddgit = proc.make_string_value(DD_GIT_DESCRIBE)
-        xsltproc.set_parameter("DD_GIT_DESCRIBE", xdm_ddgit)
-        xsltproc.transform_to_file(
-            source_file=dd_xsd, stylesheet_file=dd_xsl, output_file=dd_xml
+valid_json = "dd_data_dictionary_validation.json"
+valid_junit = "dd_data_dictionary_validation.junit.xml"
+
+
+class SaxonSession:
+    """Saxon processor shared by the transformations of a build.
+
+    Every stylesheet is compiled only once, and every source document is parsed
+    only once into an in-memory XDM node which is reused by all transformations
+    applied to it.
+    """
+
+    def __init__(self):
+        self.proc = saxonche.PySaxonProcessor(license=False)
+        self.xsltproc = self.proc.new_xslt30_processor()
+        self._executables = {}
+        self._documents = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+        return False
+
+    def close(self):
+        self._executables.clear()
+        self._documents.clear()
+        self.proc.__exit__(None, None, None)
+
+    def executable(self, stylesheet_file):
+        """Return the compiled stylesheet, compiling it on first use."""
+        if stylesheet_file not in self._executables:
+            self._executables[stylesheet_file] = self.xsltproc.compile_stylesheet(
+                stylesheet_file=join_path(os.getcwd(), stylesheet_file)
+            )
+        return self._executables[stylesheet_file]
+
+    def document(self, source_file):
+        """Return the parsed source document, parsing it on first use."""
+        if source_file not in self._documents:
+            self._documents[source_file] = self.proc.parse_xml(
+                xml_file_name=join_path(os.getcwd(), source_file)
+            )
+        return self._documents[source_file]
+
+    def forget(self, source_file):
+        """Discard the parsed source document, e.g. after it was regenerated."""
+        self._documents.pop(source_file, None)
+
+    def parse_text(self, text, base_file):
+        """Parse an XML document from a string.
+
+        Relative references in the document are resolved as if it was located at
+        ``base_file``.
+        """
+        builder = self.proc.new_document_builder()
+        builder.set_base_uri(pathlib.Path(os.getcwd(), base_file).as_uri())
+        return builder.parse_xml(xml_text=text)
+
+    def transform(self, source_file, stylesheet_file, output_file, **parameters):
+        """Apply a stylesheet to a source document and write the result to a file.
+
+        Args:
+            source_file: Path of the source document
+            stylesheet_file: Path of the XSLT stylesheet
+            output_file: Path of the principal output file
+            parameters: String values of the stylesheet parameters
+        """
+        executable = self._prepare(stylesheet_file, parameters)
+        executable.transform_to_file(
+            xdm_node=self.document(source_file),
+            output_file=join_path(os.getcwd(), output_file),
         )
 
+    def transform_to_string(self, source, stylesheet_file, **parameters):
+        """Apply a stylesheet to a parsed document and return the serialized result.
+
+        Args:
+            source: Source document, as returned by :meth:`parse_text`
+            stylesheet_file: Path of the XSLT stylesheet
+            parameters: String values of the stylesheet parameters
+        """
+        executable = self._prepare(stylesheet_file, parameters)
+        return executable.transform_to_string(xdm_node=source)
+
+    def _prepare(self, stylesheet_file, parameters):
+        executable = self.executable(stylesheet_file)
+        executable.clear_parameters()
+        for name, value in parameters.items():
+            executable.set_parameter(name, self.proc.make_string_value(value))
+        return executable
+
+
+# Saxon session of a build worker process, reused by all tasks it runs
+_worker_session = None
+
+
+@contextlib.contextmanager
+def _session(session):
+    """Use the given Saxon session, or a temporary one when it is None."""
+    if session is not None:
+        yield session
+    else:
+        with SaxonSession() as session:
+            yield session
+
+
+#: Ways to compile the XSD schemas into dd_data_dictionary.xml, see
+#: :func:`generate_dd_data_dictionary`
+DD_COMPILERS = ("xslt", "xslt-per-ids", "python")
+
+
+def generate_dd_data_dictionary(extra_opts="", session=None, compiler=None, jobs=None):
+    """Compile the XSD schemas into dd_data_dictionary.xml.
+
+    Args:
+        session: Saxon session to use
+        compiler: One of :data:`DD_COMPILERS`. ``xslt`` compiles all schemas in a
+            single Saxon run. ``xslt-per-ids`` compiles every IDS separately, in
+            parallel, and reuses the IDSs whose schemas didn't change (see
+            :func:`compile_dd_per_ids`). ``python`` uses the Python implementation
+            of the stylesheet in dd_compiler.py, which is faster and uses less
+            memory. All give identical results. Defaults to the
+            ``IMAS_DD_COMPILER`` environment variable, or ``xslt``.
+        jobs: Number of worker processes of the ``xslt-per-ids`` compiler, see
+            :func:`compile_dd_per_ids`
+    """
+    if compiler is None:
+        compiler = os.environ.get("IMAS_DD_COMPILER", "").strip() or "xslt"
+    if compiler not in DD_COMPILERS:
+        raise ValueError(
+            f"Unknown compiler {compiler!r}, expected one of {', '.join(DD_COMPILERS)}"
+        )
+    print(f"generating dd_data_dictionary.xml ({compiler})")
+    if compiler == "python":
+        dd_compiler.compile_dd(dd_xsd, dd_xml, DD_GIT_DESCRIBE)
+    else:
+        with _session(session) as saxon:
+            if compiler == "xslt-per-ids":
+                compile_dd_per_ids(dd_xml, jobs=jobs, session=saxon)
+            else:
+                saxon.transform(dd_xsd, dd_xsl, dd_xml, DD_GIT_DESCRIBE=DD_GIT_DESCRIBE)
+    if session is not None:
+        # Downstream transformations must parse the newly generated file
+        session.forget(dd_xml)
+
     try:
         if not os.path.islink(join_path(PWD, "IDSDef.xml")):
             os.symlink(
@@ -50,15 +206,194 @@ def generate_dd_data_dictionary(extra_opts=""):
         shutil.copy("dd_data_dictionary.xml", "IDSDef.xml")
 
 
-def generate_html_documentation(extra_opts=""):
-    print("generating html_documentation.html")
-    with saxonche.PySaxonProcessor(license=False) as proc:
-        xsltproc = proc.new_xslt30_processor()
-        xdm_ddgit = proc.make_string_value(DD_GIT_DESCRIBE)
-        xsltproc.set_parameter("DD_GIT_DESCRIBE", xdm_ddgit)
-        xsltproc.transform_to_file(
-            source_file=dd_xml, stylesheet_file=doc_xsl, output_file=doc_html
+#: Cache of the compiled fragments of dd_data_dictionary.xml
+DD_FRAGMENTS_DIR = "build/dd_fragments"
+#: Validation results of the IDSs of dd_data_dictionary.xml, by content hash
+VALIDATION_CACHE = "build/dd_validation_cache.json"
+# Name of the fragment containing the utilities section
+UTILITIES_FRAGMENT = "utilities"
+_DD_SUPPORT_XSD = "schemas/utilities/dd_support.xsd"
+_XS_INCLUDE = re.compile(r'[ \t]*<xs:include schemaLocation="([^"]+)"/>\r?\n')
+# Start (with indentation) of the IDS element in a compiled fragment
+_IDS_START = re.compile(r"^\s*<IDS\s", re.M)
+# File mode creation mask, applied to the files written by _write_atomic
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+def compile_dd_per_ids(output_file=dd_xml, jobs=None, session=None, cache_dir=None):
+    """Compile the XSD schemas into dd_data_dictionary.xml, one IDS at a time.
+
+    The utilities section and every IDS are compiled by separate runs of
+    dd_data_dictionary.xml.xsl (see its ``FRAGMENT`` parameter), in parallel worker
+    processes. Each run uses a reduced copy of dd_data_dictionary.xml.xsd which
+    only includes the schema of the IDS and the shared dd_support.xsd. The
+    fragments are then merged in the order of the IDSs in
+    dd_data_dictionary.xml.xsd, giving the same output as a single run.
+
+    Compiled fragments are cached, and reused as long as the DD version, the
+    stylesheet, the reduced dd_data_dictionary.xml.xsd and the files in the folders
+    of the schemas it includes don't change. Cached fragments of IDSs which no
+    longer exist are removed.
+
+    Args:
+        output_file: Path of the merged output file
+        jobs: Number of worker processes, defaults to :func:`default_jobs`. With
+            one job, all fragments are compiled in this process.
+        session: Saxon session used when compiling in this process
+        cache_dir: Directory of the fragment cache, defaults to
+            :data:`DD_FRAGMENTS_DIR`
+    """
+    cache_dir = pathlib.Path(cache_dir or DD_FRAGMENTS_DIR)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    with open(dd_xsd, encoding="utf-8") as xsd_file:
+        root_xsd = xsd_file.read()
+    ids_names = re.findall(r'<xs:element ref="([^"]+)"', root_xsd)
+    names = [UTILITIES_FRAGMENT, *ids_names]
+
+    drivers = {name: _dd_fragment_driver(name, root_xsd) for name in names}
+    keys = {name: _dd_fragment_key(drivers[name]) for name in names}
+    for path in [*cache_dir.glob("*.xml"), *cache_dir.glob("*.key")]:
+        if path.stem not in keys:
+            path.unlink()
+    fragments = {}
+    for name in names:
+        path = cache_dir / f"{name}.xml"
+        key_path = cache_dir / f"{name}.key"
+        if key_path.is_file() and key_path.read_text() == keys[name] and path.is_file():
+            with open(path, encoding="utf-8", newline="") as fragment_file:
+                fragments[name] = fragment_file.read()
+    missing = [name for name in names if name not in fragments]
+    if missing:
+        print(f"compiling {len(missing)} of {len(names)} fragments")
+    tasks = [(name, drivers[name]) for name in missing]
+
+    jobs = min(jobs or default_jobs(), len(tasks))
+    if jobs > 1:
+        context = multiprocessing.get_context("spawn")
+        with concurrent.futures.ProcessPoolExecutor(jobs, mp_context=context) as pool:
+            compiled = list(pool.map(_compile_dd_fragment, tasks))
+    else:
+        with _session(session) as saxon:
+            compiled = [_compile_dd_fragment(task, saxon) for task in tasks]
+
+    for name, fragment in zip(missing, compiled):
+        fragments[name] = fragment
+        _write_atomic(cache_dir / f"{name}.xml", fragment)
+        _write_atomic(cache_dir / f"{name}.key", keys[name])
+
+    # Fragments are complete documents: keep the header and utilities of the first
+    # and the IDS element of the others
+    header = fragments[UTILITIES_FRAGMENT]
+    parts = [header[: header.rindex("</IDSs>")]]
+    for name in ids_names:
+        fragment = fragments[name]
+        match = _IDS_START.search(fragment)
+        if match is None:
+            raise ValueError(f"No IDS element in the compiled fragment of {name}")
+        parts.append(fragment[match.start() : fragment.rindex("</IDSs>")])
+    parts.append("</IDSs>\n")
+    _write_atomic(pathlib.Path(output_file), "".join(parts))
+
+
+def default_jobs():
+    """Number of parallel build processes: IMAS_BUILD_JOBS or the number of CPUs."""
+    build_jobs = os.environ.get("IMAS_BUILD_JOBS", "").strip()
+    return int(build_jobs) if build_jobs else os.cpu_count() or 1
+
+
+def _dd_fragment_driver(name, root_xsd):
+    """Return dd_data_dictionary.xml.xsd with only the includes needed by a fragment."""
+    keep = {_DD_SUPPORT_XSD, f"schemas/{name}/dd_{name}.xsd"}
+    return _XS_INCLUDE.sub(
+        lambda match: match.group(0) if match.group(1) in keep else "", root_xsd
+    )
+
+
+def _dd_fragment_key(driver):
+    """Return a hash of everything the fragment compiled from a driver depends on.
+
+    Besides the driver and the stylesheet, these are the files in the folders of
+    the included schemas: the schemas they include and their identifier files.
+    """
+    digest = hashlib.sha256()
+    digest.update(DD_GIT_DESCRIBE.encode())
+    digest.update(driver.encode())
+    paths = [dd_xsl]
+    for location in sorted(set(_XS_INCLUDE.findall(driver))):
+        paths += sorted(glob.glob(os.path.join(os.path.dirname(location), "*")))
+    for path in paths:
+        digest.update(f"{path}:{_hash_file(path)}\n".encode())
+    return digest.hexdigest()
+
+
+def _compile_dd_fragment(task, session=None):
+    """Compile a fragment of dd_data_dictionary.xml, in a worker process or not."""
+    global _worker_session
+
+    name, driver = task
+    if session is None:
+        if _worker_session is None:
+            _worker_session = SaxonSession()
+        session = _worker_session
+    return session.transform_to_string(
+        session.parse_text(driver, dd_xsd),
+        dd_xsl,
+        DD_GIT_DESCRIBE=DD_GIT_DESCRIBE,
+        FRAGMENT=name,
+    )
+
+
+def _write_atomic(path, text):
+    # Unique temporary file: steps of parallel builds may write concurrently
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    try:
+        # mkstemp creates the file only readable by the owner
+        os.chmod(tmp_path, 0o666 & ~_UMASK)
+        with open(fd, "w", encoding="utf-8", newline="") as file:
+            file.write(text)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+#: Ways to generate the HTML documentation, see :func:`generate_html_documentation`
+HTML_DOC_MODES = ("single", "per-page")
+
+
+def generate_html_documentation(extra_opts="", session=None, mode=None, jobs=None):
+    """Generate the HTML documentation from dd_data_dictionary.xml.
+
+    The documentation has a top level page and two pages (tree and flat display)
+    for every IDS.
+
+    Args:
+        session: Saxon session to use
+        mode: One of :data:`HTML_DOC_MODES`. ``single`` generates all pages in a
+            single Saxon run. ``per-page`` runs a separate transformation for the
+            top level page, the generic structures and every IDS, in parallel
+            worker processes. It also generates a page for every generic structure
+            of the utilities section, linked from the top level page. The pages of
+            the IDSs are the same in both modes. Defaults to the
+            ``IMAS_HTML_DOC_MODE`` environment variable, or ``single``.
+        jobs: Number of worker processes of the ``per-page`` mode, defaults to
+            :func:`default_jobs`. With one job, all pages are generated in this
+            process.
+    """
+    if mode is None:
+        mode = os.environ.get("IMAS_HTML_DOC_MODE", "").strip() or "single"
+    if mode not in HTML_DOC_MODES:
+        raise ValueError(
+            f"Unknown mode {mode!r}, expected one of {', '.join(HTML_DOC_MODES)}"
         )
+    print(f"generating html_documentation.html ({mode})")
+    if mode == "per-page":
+        _generate_html_pages(jobs, session)
+    else:
+        with _session(session) as saxon:
+            saxon.transform(dd_xml, doc_xsl, doc_html, DD_GIT_DESCRIBE=DD_GIT_DESCRIBE)
 
     shutil.copy(
         "schemas/utilities/coordinate_identifier.xml",
@@ -66,51 +401,709 @@ def generate_html_documentation(extra_opts=""):
     )
 
 
-def generate_ids_cocos_transformations_symbolic_table(extra_opts=""):
+def _generate_html_pages(jobs=None, session=None):
+    """Generate the pages of the HTML documentation with one transformation each.
+
+    See the ``PAGE`` parameter of dd_data_dictionary_html_documentation.xsl. The
+    largest IDSs are generated first, so that the worker processes finish at about
+    the same time.
+    """
+    with open(dd_xml, "rb") as dd_file:
+        text = dd_file.read()
+    starts = [
+        (match.start(), match.group(1).decode())
+        for match in re.finditer(rb'<IDS name="([^"]+)"', text)
+    ]
+    ends = [start for start, _ in starts[1:]] + [len(text)]
+    sizes = {name: end - start for (start, name), end in zip(starts, ends)}
+    pages = ["index", "utilities", *sorted(sizes, key=sizes.get, reverse=True)]
+
+    jobs = min(jobs or default_jobs(), len(pages))
+    if jobs > 1:
+        context = multiprocessing.get_context("spawn")
+        with concurrent.futures.ProcessPoolExecutor(jobs, mp_context=context) as pool:
+            list(pool.map(_generate_html_page, pages))
+    else:
+        with _session(session) as saxon:
+            for page in pages:
+                _generate_html_page(page, saxon)
+
+
+def _generate_html_page(page, session=None):
+    """Generate a page of the HTML documentation, in a worker process or not."""
+    global _worker_session
+
+    if session is None:
+        if _worker_session is None:
+            _worker_session = SaxonSession()
+        session = _worker_session
+    # All pages are result documents, the principal output is empty. Only the
+    # index writes it: the other pages write theirs to a temporary file in the same
+    # directory (which the locations of the result documents are relative to),
+    # so that the workers don't write the same file.
+    output = doc_html if page == "index" else f"{doc_html}.{page}.tmp"
+    session.transform(
+        dd_xml, doc_xsl, output, DD_GIT_DESCRIBE=DD_GIT_DESCRIBE, PAGE=page
+    )
+    if output != doc_html:
+        os.remove(output)
+
+
+def generate_ids_cocos_transformations_symbolic_table(extra_opts="", session=None):
     print(
         "generating html_documentation/cocos/ids_cocos_transformations_symbolic_table.csv"
     )
-    with saxonche.PySaxonProcessor(license=False) as proc:
-        xsltproc = proc.new_xslt30_processor()
-        xdm_ddgit = proc.make_string_value(DD_GIT_DESCRIBE)
-        xsltproc.set_parameter("DD_GIT_DESCRIBE", xdm_ddgit)
-        xsltproc.transform_to_file(
-            source_file=dd_xml, stylesheet_file=cocos_xsl, output_file=cocos_csv
-        )
+    with _session(session) as saxon:
+        saxon.transform(dd_xml, cocos_xsl, cocos_csv, DD_GIT_DESCRIBE=DD_GIT_DESCRIBE)
 
 
-def generate_idsnames():
+def generate_idsnames(session=None):
     print("generating IDSNames.txt")
-    with saxonche.PySaxonProcessor(license=False) as proc:
-        xsltproc = proc.new_xslt30_processor()
-        xsltproc.transform_to_file(
-            source_file=dd_xml, stylesheet_file=names_xsl, output_file=names_txt
-        )
+    with _session(session) as saxon:
+        saxon.transform(dd_xml, names_xsl, names_txt)
+
 
+def generate_dd_data_dictionary_validation(session=None, jobs=1):
+    """Validate dd_data_dictionary.xml with :func:`dd_validation.validate`.
 
-def generate_dd_data_dictionary_validation(extra_opts=""):
+    Writes the report as text, JSON and JUnit XML. Validation results are cached
+    per IDS in :data:`VALIDATION_CACHE`.
+
+    Args:
+        session: Not used, the validation doesn't use Saxon. Accepted like by the
+            other build steps.
+        jobs: Number of worker processes validating the IDSs
+    """
     print("dd_data_dictionary_validation.txt")
-    with saxonche.PySaxonProcessor(license=False) as proc:
-        xsltproc = proc.new_xslt30_processor()
-        xsltproc.transform_to_file(
-            source_file=dd_xml, stylesheet_file=valid_xsl, output_file=valid_txt
+    report = dd_validation.validate(dd_xml, jobs=jobs, cache_file=VALIDATION_CACHE)
+    print(f"validated {len(report.validated)} of {len(report.ids)} IDSs")
+    for path, output in (
+        (valid_txt, report.to_text()),
+        (valid_json, report.to_json()),
+        (valid_junit, report.to_junit()),
+    ):
+        _write_atomic(pathlib.Path(path), output)
+
+
+BuildStep = collections.namedtuple(
+    "BuildStep",
+    ["name", "function", "inputs", "outputs", "options", "parallel"],
+    defaults=((), False),
+)
+BuildStep.__doc__ = """Step of the build.
+
+Args:
+    name: Name of the step
+    function: Generation function, called with a ``session`` keyword argument, and
+        a ``jobs`` keyword argument for parallel steps
+    inputs: Files (or glob patterns) read by the step, besides generate.py
+    outputs: Files (or glob patterns) written by the step. A step depends on all
+        steps producing one of its inputs.
+    options: Environment variables with settings of the step
+    parallel: Whether the step runs worker processes itself
+"""
+
+#: All build steps, in a valid (sequential) execution order
+BUILD_STEPS = [
+    BuildStep(
+        "dd_data_dictionary",
+        generate_dd_data_dictionary,
+        (dd_xsd, dd_xsl, "dd_compiler.py", "schemas/*/*.xsd", "schemas/*/*.xml"),
+        (dd_xml, "IDSDef.xml"),
+        ("IMAS_DD_COMPILER",),
+        parallel=True,
+    ),
+    BuildStep(
+        "html_documentation",
+        generate_html_documentation,
+        (dd_xml, doc_xsl, "schemas/*/*.xsd", "schemas/*/*.xml"),
+        (
+            doc_html,
+            "html_documentation/html_documentation/*.html",
+            "html_documentation/utilities/coordinate_identifier.xml",
+        ),
+        ("IMAS_HTML_DOC_MODE",),
+        parallel=True,
+    ),
+    BuildStep(
+        "cocos_table",
+        generate_ids_cocos_transformations_symbolic_table,
+        (dd_xml, cocos_xsl),
+        (cocos_csv,),
+    ),
+    BuildStep("idsnames", generate_idsnames, (dd_xml, names_xsl), (names_txt,)),
+    BuildStep(
+        "validation",
+        generate_dd_data_dictionary_validation,
+        (dd_xml, "dd_validation.py", "reserved_names.txt", "schemas/*/*.xml"),
+        (valid_txt, valid_json, valid_junit),
+        parallel=True,
+    ),
+]
+#: Steps generating the documentation
+DOC_STEPS = ["html_documentation", "cocos_table"]
+
+StepResult = collections.namedtuple(
+    "StepResult",
+    [
+        "name",
+        "status",
+        "duration",
+        "log",
+        "error",
+        "cpu_time",
+        "peak_rss",
+        "output_size",
+    ],
+    defaults=(None, None, None),
+)
+StepResult.__doc__ = """Result of a build step.
+
+Args:
+    name: Name of the step
+    status: ``ok``, ``unchanged``, ``failed`` or ``skipped``
+    duration: Wall time in seconds
+    log: Output of the step
+    error: Traceback when the step failed
+    cpu_time: CPU time in seconds, including the worker processes of the step
+    peak_rss: Peak resident set size in bytes, see :class:`StepMeter`
+    output_size: Total size of the outputs of the step in bytes
+"""
+
+
+class BuildError(RuntimeError):
+    """Raised when one or more build steps failed."""
+
+    def __init__(self, results):
+        self.results = results
+        failed = [result.name for result in results if result.status == "failed"]
+        super().__init__(f"Build step(s) failed: {', '.join(failed)}")
+
+
+#: Content hashes of the inputs and outputs of the steps of the last build
+MANIFEST_FILE = "build_manifest.json"
+#: Source of the build steps, an input of all steps
+GENERATOR = "generate.py"
+
+
+class BuildManifest:
+    """Record of the inputs and outputs of the last successful run of each step.
+
+    A step is up to date when the content hashes of its inputs (including
+    generate.py) and of its outputs, the DD version and the settings of the step
+    are the same as when it last ran successfully. Outputs which were deleted, or
+    added to the glob patterns of the outputs, make a step outdated as well.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or MANIFEST_FILE
+        try:
+            with open(self.path) as manifest_file:
+                self.steps = json.load(manifest_file)["steps"]
+        except (OSError, ValueError, KeyError):
+            self.steps = {}
+
+    def is_up_to_date(self, step, inputs):
+        """Return whether the step ran successfully with these inputs before."""
+        record = self.steps.get(step.name)
+        return (
+            record is not None
+            and record["inputs"] == inputs
+            and None not in record["outputs"].values()
+            and record["outputs"] == _hash_files(_expand_paths(step.outputs))
         )
 
+    def record(self, step, inputs):
+        """Record a successful run of the step and save the manifest."""
+        self.steps[step.name] = {
+            "inputs": inputs,
+            "outputs": _hash_files(_expand_paths(step.outputs)),
+        }
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as manifest_file:
+            json.dump({"steps": self.steps}, manifest_file, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+
+def _hash_inputs(step):
+    """Return the DD version, the settings and the input file hashes of a step."""
+    options = {name: os.environ.get(name, "").strip() for name in step.options}
+    return {
+        "DD_GIT_DESCRIBE": DD_GIT_DESCRIBE,
+        "options": options,
+        "files": _hash_files(_expand_paths((GENERATOR, *step.inputs))),
+    }
+
+
+def _expand_paths(patterns):
+    """Return the sorted paths matching the file names and glob patterns."""
+    paths = set()
+    for pattern in patterns:
+        paths.update(glob.glob(pattern) if glob.has_magic(pattern) else [pattern])
+    return sorted(paths)
+
+
+def _hash_files(paths):
+    """Return the SHA-256 of the content of each file, None when it doesn't exist."""
+    return {path: _hash_file(path) for path in paths}
+
+
+def _hash_file(path):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    # Files are hashed once per build, unless they are modified
+    key = (path, stat.st_mtime_ns, stat.st_size)
+    if key not in _file_hashes:
+        digest = hashlib.sha256()
+        with open(path, "rb") as file:
+            for chunk in iter(lambda: file.read(1 << 20), b""):
+                digest.update(chunk)
+        _file_hashes[key] = digest.hexdigest()
+    return _file_hashes[key]
+
+
+_file_hashes = {}
+
+
+class StepMeter:
+    """Context manager measuring the wall time, CPU time and peak memory of a step.
+
+    CPU time includes the worker processes started and finished by the step. The
+    peak resident set size is the peak of this process during the step (on Linux,
+    where the peak can be reset, otherwise since the start of the process), or of
+    a worker process of the step when that is higher.
+
+    Attributes:
+        wall_time: Wall time in seconds
+        cpu_time: CPU time in seconds
+        peak_rss: Peak resident set size in bytes, None when not available
+    """
+
+    def __enter__(self):
+        _reset_peak_rss()
+        self._children_rss = _peak_rss(children=True)
+        self._cpu_start = _cpu_time()
+        self._wall_start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.wall_time = time.perf_counter() - self._wall_start
+        self.cpu_time = _cpu_time() - self._cpu_start
+        self.peak_rss = _peak_rss()
+        children_rss = _peak_rss(children=True)
+        if children_rss is not None and children_rss > self._children_rss:
+            self.peak_rss = max(self.peak_rss, children_rss)
+        return False
+
+
+def _cpu_time():
+    """Return the CPU time of this process and of its terminated child processes."""
+    times = os.times()
+    return times.user + times.system + times.children_user + times.children_system
+
+
+def _peak_rss(children=False):
+    """Return the peak resident set size of this process or its children, in bytes."""
+    if resource is None:
+        return None
+    who = resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF
+    peak_rss = resource.getrusage(who).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes on other platforms
+    return peak_rss if sys.platform == "darwin" else peak_rss * 1024
+
+
+def _reset_peak_rss():
+    """Reset the peak resident set size of this process, when supported (Linux)."""
+    try:
+        with open("/proc/self/clear_refs", "w") as clear_refs:
+            clear_refs.write("5")
+    except OSError:
+        pass
+
+
+def _output_size(patterns):
+    """Return the total size of the files, directories and glob patterns."""
+    size = 0
+    for path in _expand_paths(patterns):
+        if os.path.isdir(path):
+            for directory, _, filenames in os.walk(path):
+                size += sum(
+                    os.path.getsize(os.path.join(directory, filename))
+                    for filename in filenames
+                )
+        elif os.path.isfile(path):
+            size += os.path.getsize(path)
+    return size
+
+
+#: Telemetry of the last build
+BUILD_REPORT_FILE = "build_report.json"
+#: Metrics of the build report, with the smallest increase considered a regression
+#: (smaller differences are measurement noise)
+REPORT_METRICS = {
+    "wall_time": 0.5,
+    "cpu_time": 0.5,
+    "peak_rss": 16 * 1024 * 1024,
+    "output_size": 0,
+}
+
+
+class BuildReport:
+    """Wall time, CPU time, peak memory and output size of the steps of a build.
+
+    Results of :func:`run_build` are added with :meth:`add`, and other steps (e.g.
+    the installation steps of setup.py) can be measured with :meth:`measure`.
+    """
+
+    def __init__(self):
+        self.steps = {}
+        self._start = time.perf_counter()
+
+    def add(self, result):
+        """Add the :data:`StepResult` of a build step."""
+        self.steps[result.name] = {
+            "status": result.status,
+            "wall_time": result.duration if result.cpu_time is not None else None,
+            "cpu_time": result.cpu_time,
+            "peak_rss": result.peak_rss,
+            "output_size": result.output_size,
+        }
+
+    @contextlib.contextmanager
+    def measure(self, name, outputs=()):
+        """Measure the enclosed block of code as a step of the build.
 
-def generate_idsdef_js():
-    print("Generating docs/_static/IDSDefxml.js")
-    with saxonche.PySaxonProcessor(license=False) as proc:
-        xsltproc = proc.new_xslt30_processor()
-        xsltproc.transform_to_file(
-            source_file=dd_xml, stylesheet_file=js_xsl, output_file=js_def
+        Args:
+            name: Name of the step
+            outputs: Files, directories or glob patterns written by the step
+        """
+        status = "failed"
+        try:
+            with StepMeter() as meter:
+                yield
+            status = "ok"
+        finally:
+            self.steps[name] = {
+                "status": status,
+                "wall_time": meter.wall_time,
+                "cpu_time": meter.cpu_time,
+                "peak_rss": meter.peak_rss,
+                "output_size": _output_size(outputs),
+            }
+
+    def compare(self, baseline, threshold=0.2):
+        """Compare the steps with those of a baseline report.
+
+        Only steps which ran successfully in both builds are compared.
+
+        Args:
+            baseline: Baseline report, as returned by :meth:`to_dict`
+            threshold: Relative increase of a metric above which it is a regression
+
+        Returns:
+            Dictionary with the ``threshold``, the ``steps`` with the baseline and
+            current value and ratio of every metric, and the ``regressions``
+            (``step.metric``).
+        """
+        steps = {}
+        regressions = []
+        for name, record in self.steps.items():
+            base = baseline.get("steps", {}).get(name)
+            if record["status"] != "ok" or not base or base["status"] != "ok":
+                continue
+            metrics = steps[name] = {}
+            for metric, noise in REPORT_METRICS.items():
+                value, base_value = record[metric], base.get(metric)
+                if value is None or base_value is None:
+                    continue
+                metrics[metric] = {
+                    "baseline": base_value,
+                    "current": value,
+                    "ratio": value / base_value if base_value else None,
+                }
+                if value > base_value * (1 + threshold) and value - base_value > noise:
+                    regressions.append(f"{name}.{metric}")
+        return {"threshold": threshold, "steps": steps, "regressions": regressions}
+
+    def to_dict(self):
+        return {
+            "DD_GIT_DESCRIBE": DD_GIT_DESCRIBE,
+            "wall_time": time.perf_counter() - self._start,
+            "steps": self.steps,
+        }
+
+    def write(self, path=BUILD_REPORT_FILE, baseline_file=None, threshold=0.2):
+        """Write the report as JSON, with a comparison to a baseline report.
+
+        Args:
+            path: Path of the report
+            baseline_file: Path of a previous report to compare with
+            threshold: See :meth:`compare`
+
+        Returns:
+            The regressions compared to the baseline (``step.metric``)
+        """
+        report = self.to_dict()
+        regressions = []
+        if baseline_file:
+            with open(baseline_file) as file:
+                comparison = self.compare(json.load(file), threshold)
+            report["comparison"] = {"baseline": str(baseline_file), **comparison}
+            regressions = comparison["regressions"]
+            for regression in regressions:
+                name, metric = regression.split(".")
+                values = comparison["steps"][name][metric]
+                print(
+                    f"Build regression in {name}: {metric} {values['baseline']:.6g} "
+                    f"-> {values['current']:.6g}",
+                    file=sys.stderr,
+                )
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as report_file:
+            json.dump(report, report_file, indent=1)
+        os.replace(tmp_path, path)
+        return regressions
+
+
+def run_build(names=None, jobs=1, verbose=True, force=False, report=None):
+    """Run build steps, running independent steps concurrently.
+
+    Args:
+        names: Names of the steps to run, all steps when not provided. Only the
+            selected steps are run: their inputs produced by other steps must
+            already exist.
+        jobs: Number of worker processes. Every worker runs its steps with its own
+            Saxon processor. With one job, all steps run in this process and share
+            a single :class:`SaxonSession`. The worker processes of parallel steps
+            count as well: the jobs which are not used by other running steps are
+            divided among the parallel steps when they start.
+        verbose: Print the output of each step and a summary of the build.
+        force: Run all steps, also those which are up to date according to the
+            :class:`BuildManifest`.
+        report: :class:`BuildReport` to which the results of the steps are added
+
+    Returns:
+        List of :data:`StepResult`, in the order of :data:`BUILD_STEPS`. The status
+        of a step is ``ok``, ``unchanged`` (up to date, so not run), ``failed`` or
+        ``skipped`` (because a dependency failed).
+
+    Raises:
+        BuildError: When a step failed. Steps depending on it are skipped, other
+            steps still run.
+    """
+    steps = _select_steps(names)
+    step_by_name = {step.name: step for step in steps}
+    producers = {output: step.name for step in steps for output in step.outputs}
+    dependencies = {
+        step.name: {producers[path] for path in step.inputs if path in producers}
+        for step in steps
+    }
+
+    manifest = BuildManifest()
+    inputs = {}
+    results = {}
+    running = {}
+    budgets = {}
+
+    def finish(result):
+        results[result.name] = result
+        if result.status == "ok":
+            manifest.record(step_by_name[result.name], inputs[result.name])
+        if verbose:
+            print(result.log, end="")
+            if result.error:
+                print(f"{result.name} failed:\n{result.error}", file=sys.stderr)
+
+    def ready_steps():
+        """Return the steps whose dependencies succeeded, skip those where one didn't."""
+        ready = []
+        for step in steps:
+            if step.name in results or step.name in running:
+                continue
+            states = [results.get(name) for name in dependencies[step.name]]
+            if None in states:
+                continue
+            if any(state.status not in ("ok", "unchanged") for state in states):
+                finish(StepResult(step.name, "skipped", 0.0, "", ""))
+                continue
+            inputs[step.name] = _hash_inputs(step)
+            if not force and manifest.is_up_to_date(step, inputs[step.name]):
+                finish(StepResult(step.name, "unchanged", 0.0, "", ""))
+            else:
+                ready.append(step)
+        return ready
+
+    if jobs <= 1:
+        with SaxonSession() as saxon:
+            while len(results) < len(steps):
+                for step in ready_steps():
+                    finish(_run_step(step, saxon, jobs=1))
+    else:
+        # Saxon C is best isolated per process: use fresh (spawned) interpreters
+        context = multiprocessing.get_context("spawn")
+        workers = min(jobs, len(steps))
+        with concurrent.futures.ProcessPoolExecutor(
+            workers, mp_context=context
+        ) as pool:
+            while len(results) < len(steps):
+                ready = ready_steps()
+                for i, step in enumerate(ready):
+                    # Divide the jobs left among the steps starting now
+                    free = jobs - sum(budgets[name] for name in running)
+                    budgets[step.name] = max(1, free // (len(ready) - i))
+                    running[step.name] = pool.submit(
+                        _run_step, step, jobs=budgets[step.name]
+                    )
+                if not running:
+                    continue
+                done, _ = concurrent.futures.wait(
+                    running.values(), return_when=concurrent.futures.FIRST_COMPLETED
+                )
+                for name in [name for name, job in running.items() if job in done]:
+                    try:
+                        result = running.pop(name).result()
+                    except Exception:  # e.g. the worker process crashed
+                        error = traceback.format_exc()
+                        result = StepResult(name, "failed", 0.0, "", error)
+                    finish(result)
+
+    ordered = [results[step.name] for step in steps]
+    if report is not None:
+        for result in ordered:
+            report.add(result)
+    if verbose:
+        _print_summary(ordered)
+    if any(result.status == "failed" for result in ordered):
+        raise BuildError(ordered)
+    return ordered
+
+
+def _select_steps(names):
+    """Return the selected build steps in the order of BUILD_STEPS."""
+    if names is None:
+        return list(BUILD_STEPS)
+    known = {step.name for step in BUILD_STEPS}
+    unknown = set(names) - known
+    if unknown:
+        raise ValueError(
+            f"Unknown build step(s): {', '.join(sorted(unknown))}. "
+            f"Available steps: {', '.join(sorted(known))}"
         )
+    return [step for step in BUILD_STEPS if step.name in names]
 
 
-if __name__ == "__main__":
+def _run_step(step, session=None, jobs=1):
+    """Run a single build step, capturing its output and errors.
+
+    Args:
+        step: The :class:`BuildStep` to run
+        session: Saxon session, defaults to the session of this worker process
+        jobs: Number of worker processes a parallel step may use
+    """
+    global _worker_session
+
+    if session is None:
+        if _worker_session is None:
+            _worker_session = SaxonSession()
+        session = _worker_session
+    log = io.StringIO()
+    status, error = "ok", ""
+    try:
+        with StepMeter() as meter, contextlib.redirect_stdout(log):
+            if step.parallel:
+                step.function(session=session, jobs=jobs)
+            else:
+                step.function(session=session)
+    except Exception:
+        status, error = "failed", traceback.format_exc()
+    return StepResult(
+        step.name,
+        status,
+        meter.wall_time,
+        log.getvalue(),
+        error,
+        meter.cpu_time,
+        meter.peak_rss,
+        _output_size(step.outputs),
+    )
+
+
+def _print_summary(results):
+    print("Build summary:")
+    for result in results:
+        line = f"  {result.name:<20} {result.status:<9} {result.duration:6.2f} s"
+        if result.cpu_time is not None:
+            line += f" {result.cpu_time:6.2f} s CPU"
+        if result.peak_rss is not None:
+            line += f" {result.peak_rss / 2**20:7.1f} MB"
+        print(line)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate the Data Dictionary files")
+    parser.add_argument(
+        "steps",
+        nargs="*",
+        metavar="step",
+        help="Build steps to run (default: all steps). Available steps: "
+        + ", ".join(step.name for step in BUILD_STEPS),
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=default_jobs(),
+        help="Number of processes running in parallel (default=%(default)s)",
+    )
+    parser.add_argument(
+        "-f",
+        "--force",
+        action="store_true",
+        help=f"Run all steps, also those whose inputs didn't change since the "
+        f"last build (as recorded in {MANIFEST_FILE})",
+    )
+    parser.add_argument(
+        "--baseline",
+        help=f"Build report of a previous build to compare {BUILD_REPORT_FILE} "
+        "with. Exits with an error when a step regressed.",
+    )
+    parser.add_argument(
+        "--regression-threshold",
+        type=float,
+        default=0.2,
+        help="Relative increase of the time, memory or output size of a step "
+        "compared to the baseline considered a regression (default=%(default)s)",
+    )
+    parser.add_argument(
+        "--dd-compiler",
+        choices=DD_COMPILERS,
+        help="How to compile the schemas into dd_data_dictionary.xml "
+        "(default: IMAS_DD_COMPILER or xslt)",
+    )
+    parser.add_argument(
+        "--html-doc-mode",
+        choices=HTML_DOC_MODES,
+        help="How to generate the HTML documentation "
+        "(default: IMAS_HTML_DOC_MODE or single)",
+    )
+    args = parser.parse_args(argv)
+    if args.dd_compiler:
+        os.environ["IMAS_DD_COMPILER"] = args.dd_compiler
+    if args.html_doc_mode:
+        os.environ["IMAS_HTML_DOC_MODE"] = args.html_doc_mode
+    report = BuildReport()
+    try:
+        run_build(args.steps or None, jobs=args.jobs, force=args.force, report=report)
+    except BuildError:
+        return 1
+    finally:
+        regressions = report.write(
+            baseline_file=args.baseline, threshold=args.regression_threshold
+        )
+    return 1 if regressions else 0
 
-    generate_dd_data_dictionary()
-    generate_html_documentation()
-    generate_ids_cocos_transformations_symbolic_table()
-    generate_idsnames()
-    generate_dd_data_dictionary_validation()
-    generate_idsdef_js()
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,21 +5,71 @@ This package provides access to the ITER IMAS Data Dictionary, which describes
 the structure and format of ITER's Interface Data Structures (IDSs).
 """
 
+import functools
+import gzip
+import hashlib
 from importlib import resources
+import os
 from pathlib import Path
 import sys
+import tempfile
+from typing import BinaryIO
 
-from . import idsinfo
+from . import idsinfo, profiling
 
-__all__ = ["idsinfo", "get_resource_path", "get_schema"]
+__all__ = ["idsinfo", "profiling", "get_resource_path", "get_schema", "open_schema"]
 
 from ._version import version as __version__  # noqa: F401
 from ._version import version_tuple  # noqa: F401
 
 
+def _get_cache_dir() -> Path:
+    """Return the directory where resources of non-filesystem installs are extracted.
+
+    Can be overridden with the ``IMAS_DD_CACHE_DIR`` environment variable, otherwise
+    ``$XDG_CACHE_HOME/imas_data_dictionary`` (default ``~/.cache``) is used.
+    """
+    cache_dir = os.environ.get("IMAS_DD_CACHE_DIR")
+    if cache_dir:
+        return Path(cache_dir)
+    cache_home = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(cache_home) / "imas_data_dictionary"
+
+
+def _extract_resource(resource_name: str, data: bytes) -> Path:
+    """Extract resource contents to the versioned, content-hashed cache directory.
+
+    The file is written to a temporary file and atomically moved in place, so
+    concurrent processes extracting the same resource never see a partial file.
+    """
+    digest = hashlib.sha256(data).hexdigest()[:16]
+    target = _get_cache_dir() / __version__ / digest / resource_name
+    if target.is_file():
+        # Already extracted (by this or another process)
+        return target
+
+    target.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=target.parent, prefix=f".{target.name}.")
+    try:
+        with os.fdopen(fd, "wb") as tmp_file:
+            tmp_file.write(data)
+        os.replace(tmp_name, target)
+    except BaseException:
+        if os.path.exists(tmp_name):
+            os.unlink(tmp_name)
+        raise
+    return target
+
+
+@functools.lru_cache(maxsize=None)
 def get_resource_path(resource_name: str) -> Path:
     """Return the path to a resource file in the package.
 
+    Resolved paths are cached, so repeated calls are cheap. When the package is not
+    installed on a regular filesystem (e.g. zip or zipapp installs), the resource is
+    extracted once to a cache directory (see ``IMAS_DD_CACHE_DIR``). The returned
+    path stays valid for the lifetime of the process.
+
     Parameters
     ----------
     resource_name : str
@@ -31,21 +81,26 @@ def get_resource_path(resource_name: str) -> Path:
     Path
         Path object to the resource file.
     """
-    if sys.version_info >= (3, 9):
-        with resources.as_file(
-            resources.files("imas_data_dictionary").joinpath(resource_name)
-        ) as path:
-            # Return a copy of the path to ensure it remains valid after the context manager exits
-            return Path(str(path))
-    else:
-        # For Python < 3.9
-        package_parts = resource_name.split("/")
-        resource_file = package_parts.pop()
-        package_path = "imas_data_dictionary"
-        if package_parts:
-            package_path = f"{package_path}.{'.'.join(package_parts)}"
-        with resources.path(package_path, resource_file) as path:
-            return Path(str(path))
+    with profiling.span("resources.lookup", resource=resource_name):
+        if sys.version_info >= (3, 9):
+            package_files = resources.files("imas_data_dictionary")
+            resource = package_files.joinpath(resource_name)
+            if isinstance(resource, Path):
+                # Regular filesystem install: the resource can be used in place
+                return resource
+            return _extract_resource(resource_name, resource.read_bytes())
+        else:
+            # For Python < 3.9
+            path = Path(__file__).parent.joinpath(resource_name)
+            if path.is_file():
+                return path
+            package_parts = resource_name.split("/")
+            resource_file = package_parts.pop()
+            package_path = "imas_data_dictionary"
+            if package_parts:
+                package_path = f"{package_path}.{'.'.join(package_parts)}"
+            data = resources.read_binary(package_path, resource_file)
+            return _extract_resource(resource_name, data)
 
 
 def get_schema(schema_path: str) -> Path:
@@ -63,3 +118,30 @@ def get_schema(schema_path: str) -> Path:
         Path object to the schema file.
     """
     return get_resource_path(f"resources/schemas/{schema_path}")
+
+
+def open_schema(schema_path: str) -> BinaryIO:
+    """Open a schema resource file for binary reading.
+
+    When a gzip-compressed variant (``<schema_path>.gz``) is installed, it is opened
+    instead and decompressed on the fly while reading, so the result can be passed
+    straight to an XML parser without a temporary file.
+
+    Parameters
+    ----------
+    schema_path : str
+        Name of the schema file in the resources/schemas directory, e.g.,
+        "data_dictionary.xml"
+
+    Returns
+    -------
+    BinaryIO
+        File object with the (decompressed) contents of the schema file.
+    """
+    try:
+        compressed_path = get_schema(f"{schema_path}.gz")
+    except FileNotFoundError:
+        compressed_path = None
+    if compressed_path is not None and compressed_path.is_file():
+        return gzip.open(compressed_path, "rb")
+    return open(get_schema(schema_path), "rb")
@@ -43,43 +43,191 @@ edge_profiles/grid_ggd
 edge_sources/grid_ggd
         source/ggd
 ...
+
+$ idsinfo search ggd --strict --format jsonl
+{"ids": "distribution_sources", "path": "source/ggd", "units": null, "documentation": ...}
+...
 """
 
+import collections
+import csv
+import functools
 import importlib.resources
+import itertools
+import json
+import multiprocessing
 import os
 import re
 import sys
-import xml.etree.ElementTree as ET
+import threading
+import weakref
 from pathlib import Path
 
 from packaging.version import Version
 
+from imas_data_dictionary import profiling
+from imas_data_dictionary.xml_backend import get_backend
+
+CacheInfo = collections.namedtuple(
+    "CacheInfo", ["hits", "misses", "maxsize", "currsize"]
+)
+
+
+class FrozenDict(dict):
+    """Read-only dictionary, used for results shared through the IDSInfo cache."""
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError(f"'{type(self).__name__}' object is read-only")
+
+    __setitem__ = __delitem__ = __ior__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+
+    def __reduce__(self):
+        return type(self), (dict(self),)
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+
+def _freeze(value):
+    """Recursively convert dictionaries to :class:`FrozenDict`."""
+    if isinstance(value, dict):
+        return FrozenDict((key, _freeze(item)) for key, item in value.items())
+    return value
+
+
+_MISSING = object()
+
+
+class _ResultCache:
+    """Bounded least-recently-used cache with hit and miss counters.
+
+    The cache can be used by several threads at the same time.
+    """
+
+    def __init__(self, maxsize):
+        if maxsize < 0:
+            raise ValueError("cache_size must be zero or positive")
+        self.maxsize = maxsize
+        self.hits = self.misses = 0
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return the cached value for key, or :data:`_MISSING`."""
+        with self._lock:
+            try:
+                value = self._entries[key]
+            except KeyError:
+                self.misses += 1
+                return _MISSING
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        """Store a value, evicting the least recently used entry when full."""
+        with self._lock:
+            self._entries[key] = value
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+    def info(self):
+        with self._lock:
+            return CacheInfo(self.hits, self.misses, self.maxsize, len(self._entries))
+
+
+def _cached(normalise):
+    """Decorator caching the results of an IDSInfo method in its result cache.
+
+    Args:
+        normalise: Called with the (non-self) arguments of the method, returns the
+            hashable part of the cache key. Arguments which don't change the result
+            should be left out.
+    """
+
+    def decorator(method):
+        name = method.__name__
+
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            cache = self._result_cache
+            if cache.maxsize == 0:
+                return method(self, *args, **kwargs)
+            key = (name, normalise(*args, **kwargs), self.fingerprint)
+            result = cache.get(key)
+            if result is _MISSING:
+                result = _freeze(method(self, *args, **kwargs))
+                cache.put(key, result)
+            return result
+
+        return wrapper
+
+    return decorator
+
 
 class IDSInfo:
-    """Simple class which allows to query meta-data from the definition of IDSs as expressed in data_dictionary.xml."""
+    """Simple class which allows to query meta-data from the definition of IDSs as expressed in data_dictionary.xml.
+
+    An IDSInfo can be shared by several threads. However, :meth:`close`, or a
+    parallel search with another number of jobs, stops the worker processes of the
+    parallel searches which are running (see :meth:`find_in_ids`).
+    """
 
     root = None
     version = None
     cocos = None
-
-    def __init__(self):
+    _pool = None
+
+    def __init__(self, backend=None, cache_size=128):
+        """Load the Data Dictionary definitions.
+
+        Args:
+            backend: Name of the XML backend to use (``"lxml"`` or ``"etree"``), see
+                :func:`imas_data_dictionary.xml_backend.get_backend`.
+            cache_size: Maximum number of results of :meth:`query`,
+                :meth:`find_in_ids` and :meth:`list_ids_fields` kept in the result
+                cache. Cached results are read-only. Set to 0 to disable caching.
+        """
         # Find and parse XML definitions
-        from imas_data_dictionary import get_schema
+        from imas_data_dictionary import get_schema, open_schema
 
         self.idsdef_path = ""
         self.root = None
         self.version = ""
         self.cocos = ""
+        self.backend = get_backend(backend)
         schema_path = get_schema("data_dictionary.xml")
         self.idsdef_path = schema_path
 
         if not self.idsdef_path:
             raise Exception(f"Error accessing data_dictionary.xml.  {self.idsdef_path}")
 
-        tree = ET.parse(self.idsdef_path)
-        self.root = tree.getroot()
+        with profiling.span("idsinfo.parse"):
+            with open_schema("data_dictionary.xml") as schema_file:
+                self.root = self.backend.parse(schema_file)
         self.version = self.root.findtext("./version", default="N/A")
         self.cocos = self.root.findtext("./cocos", default="N/A")
+        stat = os.stat(self.idsdef_path)
+        self.fingerprint = (self.version, stat.st_size, stat.st_mtime_ns)
+        self._result_cache = _ResultCache(cache_size)
+        self._pool_lock = threading.Lock()
+
+    def cache_info(self):
+        """Return the hits, misses, maximum size and current size of the result cache."""
+        return self._result_cache.info()
+
+    def clear_cache(self):
+        """Remove all entries from the result cache and reset its statistics."""
+        self._result_cache.clear()
 
     def get_idsdef_path(self):
         "Get selected data_dictionary.xml path"
@@ -91,7 +239,7 @@ class IDSInfo:
 
     def __get_field(self, struct, field):  # sourcery skip: raise-specific-error
         """Recursive function which returns the node corresponding to a given field which is a descendant of struct."""
-        elt = struct.find(f'./field[@name="{field[0]}"]')
+        elt = self.backend.find_field(struct, field[0])
         if elt is None:
             raise Exception(f"Element '{field[0]}' not found")
         if len(field) > 1:
@@ -100,10 +248,12 @@ class IDSInfo:
             # specific generic node for which the useful doc is from the parent
             return elt if field[0] != "value" else struct
 
+    @profiling.profiled("idsinfo.query")
+    @_cached(lambda ids, path=None: (ids, path))
     def query(self, ids, path=None):
         """Returns attributes of the selected ids/path node as a dictionary."""
-        ids = self.root.find(f"./IDS[@name='{ids}']")
-        if ids is None:
+        ids_element = self.backend.find_ids(self.root, ids)
+        if ids_element is None:
             raise ValueError(
                 f"Error getting the IDS, please check that '{ids}' corresponds to a valid IDS name"
             )
@@ -112,97 +262,228 @@ class IDSInfo:
             fields = path.split("/")
 
             try:
-                f = self.__get_field(ids, fields)
+                f = self.__get_field(ids_element, fields)
             except Exception as exc:
-                raise ValueError("Error while accessing {path}: {str(exc)}") from exc
+                raise ValueError(f"Error while accessing {path}: {str(exc)}") from exc
         else:
-            f = ids
+            f = ids_element
 
-        return f.attrib
+        return dict(f.attrib)
 
+    @profiling.profiled("idsinfo.get_ids_names")
     def get_ids_names(self):
         return [ids.attrib["name"] for ids in self.root.findall("IDS")]
 
-    def find_in_ids(self, text_to_search="", strict=False):
-        search_result = {}
-        regex_to_search = text_to_search
-        if strict:
-            regex_to_search = f"^{text_to_search}$"
-        for ids in self.root.findall("IDS"):
-            is_top_node = False
-            top_node_name = ""
-            search_result_for_ids = {}
-            for field in ids.iter("field"):
-                if re.match(regex_to_search, field.attrib["name"]):
-                    attributes = {}
-
-                    if "units" in field.attrib.keys():
-                        attributes["units"] = field.attrib["units"]
-                    if "documentation" in field.attrib.keys():
-                        attributes["documentation"] = field.attrib["documentation"]
-
-                    search_result_for_ids[field.attrib["path"]] = attributes
-                    if not is_top_node:
-                        is_top_node = True
-                        top_node_name = ids.attrib["name"]
-            if top_node_name:  # add to dict only if something is found
-                search_result[top_node_name] = search_result_for_ids
-        return search_result
+    def iter_fields(self, idsname=None):
+        """Iterate over the fields of all IDSs, or of a single IDS, in document order.
 
-    def list_ids_fields(self, idsname=""):
-        search_result = {}
-        for ids in self.root.findall("IDS"):
-            if ids.attrib["name"] == idsname.lower():
-                is_top_node = False
-                top_node_name = ""
-                search_result_for_ids = {}
-                fieldlist = []
+        Yields:
+            Tuples (IDS name, attributes of the field element)
+        """
+        for ids in self.root.iterfind("IDS"):
+            ids_name = ids.get("name")
+            if idsname is None or ids_name == idsname:
                 for field in ids.iter("field"):
-                    fieldlist.append(field)
-                    attributes = {}
-
-                    if "units" in field.attrib.keys():
-                        attributes["units"] = field.attrib["units"]
-                        if "as_parent" in attributes["units"]:
-                            for sfield in reversed(fieldlist):
-                                if "units" in sfield.attrib.keys():
-                                    if "as_parent" not in sfield.attrib["units"]:
-                                        attributes["units"] = sfield.attrib["units"]
-                                        break
-                    if "documentation" in field.attrib.keys():
-                        attributes["documentation"] = field.attrib["documentation"]
-                    field_path = re.sub(
-                        r"\(([^:][^itime]*?)\)", "(:)", field.attrib["path_doc"]
-                    )
-                    if "timebasepath" in field.attrib.keys():
-                        field_path = re.sub(r"\(([:]*?)\)$", "(itime)", field_path)
-                    search_result_for_ids[field_path] = attributes
-                    if not is_top_node:
-                        is_top_node = True
-                        top_node_name = ids.attrib["name"]
-                if top_node_name:  # add to dict only if something is found
-                    search_result[top_node_name] = search_result_for_ids
-        return search_result
-
-
-def main():
+                    yield ids_name, field.attrib
+
+    @profiling.profiled("idsinfo.find_in_ids")
+    @_cached(lambda text_to_search="", strict=False, jobs=1: (text_to_search, strict))
+    def find_in_ids(self, text_to_search="", strict=False, jobs=1):
+        """Find all fields whose name matches a regular expression.
+
+        Args:
+            text_to_search: Regular expression matched against the start of the
+                field names.
+            strict: Match the full field name instead.
+            jobs: Number of worker processes searching the IDSs in parallel. The
+                worker processes are started by the first parallel search, and
+                reused by the next searches with the same number of jobs, until
+                :meth:`close` is called. They are started with the default start
+                method of the platform: forked workers share the loaded DD, other
+                workers (e.g. on macOS and Windows) load the DD themselves, once.
+
+        Returns:
+            Dictionary mapping IDS names to a dictionary of matching field paths
+            and their units and documentation. The order is the same as in the DD,
+            regardless of the number of jobs.
+        """
+        if jobs > 1:
+            results = self._search_in_parallel(text_to_search, strict, jobs)
+        else:
+            results = _iter_search_results(self.iter_fields(), text_to_search, strict)
+        return _group_by_ids(results)
+
+    def _search_in_parallel(self, text_to_search, strict, jobs):
+        """Search per IDS in the pool of worker processes."""
+        pool = self._get_pool(jobs)
+        ids_count = len(self.root.findall("IDS"))
+        tasks = [(i, text_to_search, strict) for i in range(ids_count)]
+        # map preserves the task order, keeping the result deterministic
+        results = pool.map(_search_ids_element, tasks, chunksize=1)
+        return itertools.chain.from_iterable(results)
+
+    def _get_pool(self, jobs):
+        """Return the pool of worker processes, (re)starting it when needed."""
+        with self._pool_lock:
+            if self._pool is None or self._pool_jobs != jobs:
+                self.close()
+                self._start_pool(jobs)
+            return self._pool
+
+    def _start_pool(self, jobs):
+        global _shared_ids_elements
+
+        context = multiprocessing.get_context()
+        if context.get_start_method() == "fork":
+            _shared_ids_elements = self.root.findall("IDS")
+        try:
+            pool = context.Pool(
+                jobs, initializer=_init_search_worker, initargs=(self.backend.name,)
+            )
+        finally:
+            _shared_ids_elements = None
+        self._pool, self._pool_jobs = pool, jobs
+        # Stops the workers when this object is garbage collected, or at exit
+        self._pool_finalizer = weakref.finalize(self, pool.terminate)
+
+    def close(self):
+        """Stop the worker processes of parallel searches, if they are running."""
+        if self._pool is not None:
+            self._pool_finalizer()
+            self._pool = None
+
+    @profiling.profiled("idsinfo.list_ids_fields")
+    @_cached(lambda idsname="": idsname.lower())
+    def list_ids_fields(self, idsname=""):
+        return _group_by_ids(_iter_listed_fields(self.iter_fields(idsname.lower())))
+
+
+# IDS elements searched by the worker processes of a parallel search
+_shared_ids_elements = None
+
+
+def _init_search_worker(backend_name):
+    """Load the IDSs in a worker process, unless it inherited them (fork)."""
+    global _shared_ids_elements
+
+    if _shared_ids_elements is None:
+        from imas_data_dictionary import open_schema
+
+        with open_schema("data_dictionary.xml") as schema_file:
+            root = get_backend(backend_name).parse(schema_file)
+        _shared_ids_elements = root.findall("IDS")
+
+
+def _search_ids_element(task):
+    """Search a single IDS of :data:`_shared_ids_elements` in a worker process."""
+    index, text_to_search, strict = task
+    ids = _shared_ids_elements[index]
+    ids_name = ids.get("name")
+    fields = ((ids_name, field.attrib) for field in ids.iter("field"))
+    return list(_iter_search_results(fields, text_to_search, strict))
+
+
+def _field_attributes(attrib):
+    """Return the units and documentation of a field."""
+    attributes = {}
+    if "units" in attrib:
+        attributes["units"] = attrib["units"]
+    if "documentation" in attrib:
+        attributes["documentation"] = attrib["documentation"]
+    return attributes
+
+
+def _iter_search_results(fields, text_to_search, strict):
+    """Filter fields on their name.
+
+    Args:
+        fields: Iterable of (IDS name, field attributes) tuples
+        text_to_search: Regular expression matched against the start of field names
+        strict: Match the full field name instead
+
+    Yields:
+        Tuples (IDS name, field path, field units and documentation)
+    """
+    regex = re.compile(f"^{text_to_search}$" if strict else text_to_search)
+    for ids_name, attrib in fields:
+        if regex.match(attrib["name"]):
+            yield ids_name, attrib["path"], _field_attributes(attrib)
+
+
+def _iter_listed_fields(fields):
+    """Describe fields as listed by ``idsinfo idsfields``.
+
+    Paths are shown with ``(:)`` or ``(itime)`` for array indices, and ``as_parent``
+    units are replaced by the units of the most recent field (in document order)
+    with explicit units.
+
+    Args:
+        fields: Iterable of (IDS name, field attributes) tuples in document order
+
+    Yields:
+        Tuples (IDS name, field path, field units and documentation)
+    """
+    current_ids = None
+    explicit_units = None
+    for ids_name, attrib in fields:
+        if ids_name != current_ids:
+            current_ids = ids_name
+            explicit_units = None
+        attributes = _field_attributes(attrib)
+        units = attrib.get("units")
+        if units is not None:
+            if "as_parent" not in units:
+                explicit_units = units
+            elif explicit_units is not None:
+                attributes["units"] = explicit_units
+        field_path = re.sub(r"\(([^:][^itime]*?)\)", "(:)", attrib["path_doc"])
+        if "timebasepath" in attrib:
+            field_path = re.sub(r"\(([:]*?)\)$", "(itime)", field_path)
+        yield ids_name, field_path, attributes
+
+
+def _group_by_ids(results):
+    """Collect (IDS name, path, attributes) tuples in a dictionary per IDS."""
+    grouped = {}
+    for ids_name, path, attributes in results:
+        grouped.setdefault(ids_name, {})[path] = attributes
+    return grouped
+
+
+def main(argv=None):
     import argparse
 
     idsinfo_parser = argparse.ArgumentParser(description="IDS Info Utilities")
     subparsers = idsinfo_parser.add_subparsers(help="sub-commands help")
 
+    # Output format option shared by all sub-commands
+    format_parser = argparse.ArgumentParser(add_help=False)
+    format_parser.add_argument(
+        "-f",
+        "--format",
+        choices=["text", *OUTPUT_FORMATS],
+        default="text",
+        help="Output format (default=%(default)s)",
+    )
+
     idspath_command_parser = subparsers.add_parser(
-        "idspath", help="print ids definition path"
+        "idspath", help="print ids definition path", parents=[format_parser]
     )
     idspath_command_parser.set_defaults(cmd="idspath")
 
-    metadata_command_parser = subparsers.add_parser("metadata", help="print metadata")
+    metadata_command_parser = subparsers.add_parser(
+        "metadata", help="print metadata", parents=[format_parser]
+    )
     metadata_command_parser.set_defaults(cmd="metadata")
 
-    idsnames_command_parser = subparsers.add_parser("idsnames", help="print ids names")
+    idsnames_command_parser = subparsers.add_parser(
+        "idsnames", help="print ids names", parents=[format_parser]
+    )
     idsnames_command_parser.set_defaults(cmd="idsnames")
 
-    search_command_parser = subparsers.add_parser("search", help="Search in ids")
+    search_command_parser = subparsers.add_parser(
+        "search", help="Search in ids", parents=[format_parser]
+    )
     search_command_parser.set_defaults(cmd="search")
     search_command_parser.add_argument(
         "text",
@@ -224,9 +505,16 @@ def main():
         action="store_true",
         help="Shows description along with unit",
     )
+    search_command_parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="Number of processes searching in parallel (default=%(default)s)",
+    )
 
     idsfields_command_parser = subparsers.add_parser(
-        "idsfields", help="shows all fields from ids"
+        "idsfields", help="shows all fields from ids", parents=[format_parser]
     )
     idsfields_command_parser.set_defaults(cmd="idsfields")
     idsfields_command_parser.add_argument(
@@ -242,7 +530,9 @@ def main():
         help="Shows description along with unit",
     )
     info_command_parser = subparsers.add_parser(
-        "info", help="Query the IDS XML Definition for documentation"
+        "info",
+        help="Query the IDS XML Definition for documentation",
+        parents=[format_parser],
     )
     info_command_parser.set_defaults(cmd="info")
 
@@ -263,7 +553,7 @@ def main():
         default="documentation",
         help="Select attribute to be printed \t(default=%(default)s)",
     )
-    args = idsinfo_parser.parse_args()
+    args = idsinfo_parser.parse_args(argv)
     try:
         if args.cmd is None:
             idsinfo_parser.print_help()
@@ -272,8 +562,35 @@ def main():
         idsinfo_parser.print_help()
         return
 
-    # Create IDSDef Object
-    idsinfoObj = IDSInfo()
+    with profiling.span("idsinfo.cli", command=args.cmd):
+        return _run_command(args, search_command_parser, idsfields_command_parser)
+
+
+def _run_command(args, search_command_parser, idsfields_command_parser):
+    """Execute the idsinfo sub-command selected in the parsed arguments."""
+    if args.format != "text":
+        if args.cmd == "search" and args.text in ["", None]:
+            search_command_parser.print_help()
+            print("Please provide text to search in IDSes")
+            return
+        fieldnames, records = _iter_command_records(args)
+        if args.cmd == "idsfields":
+            # Every IDS has fields: no records means the IDS does not exist
+            first = next(records, None)
+            if first is None:
+                print(f"Unknown IDS name: '{args.idsname}'", file=sys.stderr)
+                return 1
+            records = itertools.chain([first], records)
+        write_records(records, args.format, fieldnames, sys.stdout)
+        return
+
+    parallel_search = args.cmd == "search" and args.jobs > 1
+    if args.cmd in ("search", "idsfields") and not parallel_search:
+        # One-off scans: stream through the DD instead of building the full tree
+        from imas_data_dictionary import streaming
+    else:
+        # Create IDSDef Object
+        idsinfoObj = IDSInfo()
     if args.cmd == "metadata":
         mstr = f"This is Data Dictionary version = {idsinfoObj.version}, following COCOS = {idsinfoObj.cocos}"
         print(mstr)
@@ -294,7 +611,11 @@ def main():
     elif args.cmd == "search":
         if args.text not in ["", None]:
             print(f"Searching for '{args.text}'.")
-            result = idsinfoObj.find_in_ids(args.text.strip(), strict=args.strict)
+            text = args.text.strip()
+            if parallel_search:
+                result = idsinfoObj.find_in_ids(text, args.strict, jobs=args.jobs)
+            else:
+                result = streaming.find_in_ids(text, strict=args.strict)
             for ids_name, fields in result.items():
                 print(f"{ids_name}:")
                 for field, attributes in fields.items():
@@ -312,7 +633,7 @@ def main():
             return
     elif args.cmd == "idsfields":
         if args.idsname not in ["", None]:
-            result = idsinfoObj.list_ids_fields(args.idsname.strip())
+            result = streaming.list_ids_fields(args.idsname.strip())
             if bool(result):
                 print(f"Listing all fields from ids :'{args.idsname}'")
                 for ids_name, fields in result.items():
@@ -336,5 +657,115 @@ def main():
             return
 
 
+def _iter_command_records(args):
+    """Return the field names and an iterator over the records of a sub-command."""
+    if args.cmd in ("search", "idsfields"):
+        from imas_data_dictionary import streaming
+
+        if args.cmd == "idsfields":
+            results = streaming.iter_ids_fields(args.idsname.strip())
+        elif args.jobs > 1:
+            grouped = IDSInfo(cache_size=0).find_in_ids(
+                args.text.strip(), args.strict, jobs=args.jobs
+            )
+            results = (
+                (ids_name, path, attributes)
+                for ids_name, fields in grouped.items()
+                for path, attributes in fields.items()
+            )
+        else:
+            results = streaming.iter_find_in_ids(args.text.strip(), args.strict)
+        records = (
+            {
+                "ids": ids_name,
+                "path": path,
+                "units": attributes.get("units"),
+                "documentation": attributes.get("documentation"),
+            }
+            for ids_name, path, attributes in results
+        )
+        return ["ids", "path", "units", "documentation"], records
+
+    idsinfo = IDSInfo(cache_size=0)
+    if args.cmd == "idspath":
+        return ["path"], iter([{"path": str(idsinfo.get_idsdef_path())}])
+    if args.cmd == "metadata":
+        record = {"version": idsinfo.version, "cocos": idsinfo.cocos}
+        return list(record), iter([record])
+    if args.cmd == "idsnames":
+        return ["name"], ({"name": name} for name in idsinfo.get_ids_names())
+    # info
+    attributes = idsinfo.query(args.ids, args.path)
+    if not args.all:
+        attributes = {args.select: attributes[args.select]}
+    return list(attributes), iter([attributes])
+
+
+#: Structured output formats of the idsinfo command line interface
+OUTPUT_FORMATS = ("json", "jsonl", "csv")
+
+
+def write_records(records, output_format, fieldnames, stream, buffer_size=1 << 16):
+    """Write records to a text stream in a structured format.
+
+    Records are consumed one by one, so arbitrarily large outputs can be written
+    from generators. The output is collected in a buffer which is written to the
+    stream when it exceeds ``buffer_size`` characters.
+
+    Args:
+        records: Iterable of dictionaries
+        output_format: One of :data:`OUTPUT_FORMATS`: a JSON array (``json``), one
+            JSON object per line (``jsonl``) or CSV with a header line (``csv``)
+        fieldnames: Columns of the CSV output, ignored for the JSON formats
+        stream: Text stream to write to
+        buffer_size: Approximate number of characters to buffer between writes
+    """
+    writer = _BufferedWriter(stream, buffer_size)
+    if output_format == "json":
+        writer.write("[")
+        separator = "\n"
+        for record in records:
+            writer.write(separator)
+            writer.write(json.dumps(record))
+            separator = ",\n"
+        writer.write("\n]\n" if separator != "\n" else "]\n")
+    elif output_format == "jsonl":
+        for record in records:
+            writer.write(json.dumps(record))
+            writer.write("\n")
+    elif output_format == "csv":
+        csv_writer = csv.DictWriter(writer, fieldnames, lineterminator="\n")
+        csv_writer.writeheader()
+        csv_writer.writerows(records)
+    else:
+        raise ValueError(
+            f"Unknown output format {output_format!r}, expected one of {OUTPUT_FORMATS}"
+        )
+    writer.flush()
+
+
+class _BufferedWriter:
+    """Collect written strings and pass them to a stream in large chunks."""
+
+    def __init__(self, stream, buffer_size):
+        self.stream = stream
+        self.buffer_size = buffer_size
+        self._chunks = []
+        self._size = 0
+
+    def write(self, text):
+        self._chunks.append(text)
+        self._size += len(text)
+        if self._size >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        if self._chunks:
+            self.stream.write("".join(self._chunks))
+            self._chunks = []
+            self._size = 0
+        self.stream.flush()
+
+
 if __name__ == "__main__":
     sys.exit(main())
@@ -0,0 +1,222 @@
+"""
+Lightweight timing and memory instrumentation.
+
+Phases of interest (resource lookup, XML parsing, query execution, ...) are wrapped
+in :func:`span` blocks. Instrumentation is disabled by default, in which case a span
+costs a single global lookup. Enable it with the ``IMAS_DD_PROFILE`` environment
+variable or with :func:`enable_profiling`.
+
+``IMAS_DD_PROFILE`` accepts the following values:
+
+- ``1``, ``true``, ``yes`` or ``stderr``: write one JSON record per line to stderr.
+- Any other non-empty value: path of a file to which JSON records are appended.
+
+Each record is a dictionary with the span ``name``, its ``wall_time`` and
+``cpu_time`` in seconds, the process ``peak_rss`` in bytes (when available on this
+platform), any attributes passed to :func:`span` and, when :mod:`tracemalloc` is
+tracing, the ``peak_memory`` in bytes allocated during the span.
+
+Example:
+
+.. code-block:: python
+
+    from imas_data_dictionary import profiling
+    from imas_data_dictionary.idsinfo import IDSInfo
+
+    records = []
+    profiling.enable_profiling(records.append)
+    IDSInfo().find_in_ids("ggd")
+    profiling.disable_profiling()
+"""
+
+import functools
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+__all__ = ["enable_profiling", "disable_profiling", "is_enabled", "span", "profiled"]
+
+# Callback receiving span records, None when profiling is disabled
+_callback: Optional[Callable[[Dict[str, Any]], None]] = None
+# Stacks of currently active spans, per thread
+_local = threading.local()
+
+
+def _active_spans() -> List["_Span"]:
+    """Return the stack of active spans of the current thread."""
+    try:
+        return _local.active_spans
+    except AttributeError:
+        _local.active_spans = []
+        return _local.active_spans
+
+
+def enable_profiling(
+    callback: Optional[Callable[[Dict[str, Any]], None]] = None,
+    trace_memory: bool = False,
+) -> None:
+    """Enable instrumentation.
+
+    Args:
+        callback: Called with the record of every finished span. JSON records are
+            written to stderr when not provided.
+        trace_memory: Start :mod:`tracemalloc` to record the peak memory allocated in
+            every span. This gives detailed information, but slows down execution.
+    """
+    global _callback
+    _callback = callback if callback is not None else _JSONWriter(sys.stderr)
+    if trace_memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+
+def disable_profiling() -> None:
+    """Disable instrumentation."""
+    global _callback
+    _callback = None
+
+
+def is_enabled() -> bool:
+    """Return whether instrumentation is enabled."""
+    return _callback is not None
+
+
+def span(name: str, **attributes: Any):
+    """Context manager measuring the enclosed block of code.
+
+    Args:
+        name: Name of the instrumented phase, e.g. ``"idsinfo.parse"``.
+        attributes: Additional (JSON serializable) information added to the record.
+    """
+    if _callback is None:
+        return _NULL_SPAN
+    return _Span(name, attributes)
+
+
+def profiled(name: str):
+    """Decorator wrapping every call of the decorated method in a :func:`span`.
+
+    The (non-self) arguments of the call are added to the record. When profiling
+    is disabled, the only overhead is one global lookup.
+
+    Args:
+        name: Name of the instrumented phase, e.g. ``"idsinfo.query"``.
+    """
+
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            if _callback is None:
+                return method(self, *args, **kwargs)
+            with _Span(name, {"args": args, **kwargs}):
+                return method(self, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+class _NullSpan:
+    """Span that does nothing, used when profiling is disabled."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    """Span recording timing and memory usage of the enclosed block."""
+
+    __slots__ = ("record", "_wall_start", "_cpu_start", "_peak_before", "_peak")
+
+    def __init__(self, name: str, attributes: Dict[str, Any]):
+        self.record = {"name": name, **attributes}
+        self._peak_before = self._peak = 0
+
+    def __enter__(self):
+        if tracemalloc.is_tracing():
+            # Remember the peak of the enclosing span before measuring our own
+            self._peak_before = tracemalloc.get_traced_memory()[1]
+            if hasattr(tracemalloc, "reset_peak"):  # Python 3.9+
+                tracemalloc.reset_peak()
+        _active_spans().append(self)
+        self._wall_start = time.perf_counter()
+        self._cpu_start = time.process_time()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.record["wall_time"] = time.perf_counter() - self._wall_start
+        self.record["cpu_time"] = time.process_time() - self._cpu_start
+        active_spans = _active_spans()
+        active_spans.pop()
+        if tracemalloc.is_tracing():
+            peak = max(tracemalloc.get_traced_memory()[1], self._peak)
+            self.record["peak_memory"] = peak
+            if active_spans:
+                parent = active_spans[-1]
+                parent._peak = max(parent._peak, self._peak_before, peak)
+        peak_rss = _get_peak_rss()
+        if peak_rss is not None:
+            self.record["peak_rss"] = peak_rss
+        if exc_type is not None:
+            self.record["error"] = exc_type.__name__
+
+        callback = _callback
+        if callback is not None:
+            callback(self.record)
+        return False
+
+
+def _get_peak_rss() -> Optional[int]:
+    """Return the peak resident set size of this process in bytes."""
+    if resource is None:
+        return None
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes on other platforms
+    return peak_rss if sys.platform == "darwin" else peak_rss * 1024
+
+
+class _JSONWriter:
+    """Callback writing span records as JSON lines to a text stream or file."""
+
+    def __init__(self, stream=None, path=None):
+        self.stream = stream
+        self.path = path
+
+    def __call__(self, record: Dict[str, Any]) -> None:
+        line = json.dumps(record, default=str) + "\n"
+        if self.path is not None:
+            with open(self.path, "a") as file:
+                file.write(line)
+        else:
+            self.stream.write(line)
+            self.stream.flush()
+
+
+def _enable_from_environment() -> None:
+    """Enable profiling when requested through the IMAS_DD_PROFILE variable."""
+    value = os.environ.get("IMAS_DD_PROFILE", "").strip()
+    if value.lower() in ("", "0", "false", "no"):
+        return
+    if value.lower() in ("1", "true", "yes", "stderr"):
+        enable_profiling()
+    else:
+        enable_profiling(_JSONWriter(path=value))
+
+
+_enable_from_environment()
@@ -0,0 +1,131 @@
+"""
+Constant-memory scans over the Data Dictionary.
+
+:class:`~imas_data_dictionary.idsinfo.IDSInfo` builds the full element tree of the
+Data Dictionary, which is wasteful for one-off scans in short-lived processes. The
+functions in this module parse the DD incrementally instead, and discard every
+element once it has been processed. Only the chain of ancestors of the current
+element is kept in memory, so peak memory is bounded by the depth of the DD tree
+rather than its size.
+
+Results are identical to the corresponding :class:`~imas_data_dictionary.idsinfo.IDSInfo`
+methods.
+"""
+
+from typing import Any, Dict, Iterator, Mapping, Optional, Tuple
+
+from imas_data_dictionary import profiling
+from imas_data_dictionary.idsinfo import (
+    _group_by_ids,
+    _iter_listed_fields,
+    _iter_search_results,
+)
+from imas_data_dictionary.xml_backend import get_backend
+
+__all__ = [
+    "iter_fields",
+    "iter_find_in_ids",
+    "find_in_ids",
+    "iter_ids_fields",
+    "list_ids_fields",
+]
+
+
+def iter_fields(
+    idsname: Optional[str] = None, source=None, backend: Optional[str] = None
+) -> Iterator[Tuple[str, Mapping[str, str]]]:
+    """Iterate over the fields of all IDSs, or of a single IDS, in document order.
+
+    Args:
+        idsname: Only yield fields of the IDS with this name.
+        source: File name or binary file object of the DD XML. Defaults to the
+            data_dictionary.xml bundled with this package.
+        backend: Name of the XML backend, see
+            :func:`imas_data_dictionary.xml_backend.get_backend`.
+
+    Yields:
+        Tuples (IDS name, attributes of the field element). The attributes are only
+        guaranteed to be valid until the next item is requested.
+    """
+    if source is None:
+        from imas_data_dictionary import open_schema
+
+        with open_schema("data_dictionary.xml") as schema_file:
+            yield from _iter_fields(schema_file, idsname, get_backend(backend))
+    else:
+        yield from _iter_fields(source, idsname, get_backend(backend))
+
+
+def _iter_fields(source, idsname, backend):
+    # Ancestors of the current element, starting at the root element
+    ancestors = []
+    current_ids = None
+    events = backend.iterparse(source, events=("start", "end"))
+    for event, element in events:
+        if event == "start":
+            if len(ancestors) == 1 and element.tag == "IDS":
+                current_ids = element.get("name")
+            elif element.tag == "field" and current_ids is not None:
+                if idsname is None or current_ids == idsname:
+                    yield current_ids, element.attrib
+            ancestors.append(element)
+
+        else:  # end
+            ancestors.pop()
+            if ancestors:
+                # The element is fully processed: detach it from its parent so it
+                # can be freed. This is not necessarily the last child: the parser
+                # may already have attached following siblings.
+                ancestors[-1].remove(element)
+            if len(ancestors) == 1 and element.tag == "IDS":
+                if current_ids == idsname:
+                    return  # No need to parse the remainder of the DD
+                current_ids = None
+
+
+def iter_find_in_ids(
+    text_to_search: str = "", strict: bool = False, source=None, backend=None
+) -> Iterator[Tuple[str, str, Dict[str, Any]]]:
+    """Iterate over all fields whose name matches ``text_to_search``.
+
+    See :meth:`imas_data_dictionary.idsinfo.IDSInfo.find_in_ids` for the meaning of
+    the arguments, and :func:`iter_fields` for ``source`` and ``backend``.
+
+    Yields:
+        Tuples (IDS name, field path, field units and documentation)
+    """
+    fields = iter_fields(source=source, backend=backend)
+    return _iter_search_results(fields, text_to_search, strict)
+
+
+def find_in_ids(
+    text_to_search: str = "", strict: bool = False, source=None, backend=None
+) -> Dict[str, Dict[str, Dict[str, Any]]]:
+    """Streaming equivalent of :meth:`~imas_data_dictionary.idsinfo.IDSInfo.find_in_ids`."""
+    with profiling.span("streaming.find_in_ids", text=text_to_search, strict=strict):
+        return _group_by_ids(
+            iter_find_in_ids(text_to_search, strict, source=source, backend=backend)
+        )
+
+
+def iter_ids_fields(
+    idsname: str = "", source=None, backend=None
+) -> Iterator[Tuple[str, str, Dict[str, Any]]]:
+    """Iterate over all fields of an IDS, as listed by ``idsinfo idsfields``.
+
+    See :meth:`imas_data_dictionary.idsinfo.IDSInfo.list_ids_fields` for the meaning
+    of the arguments, and :func:`iter_fields` for ``source`` and ``backend``.
+
+    Yields:
+        Tuples (IDS name, field path, field units and documentation)
+    """
+    fields = iter_fields(idsname.lower(), source=source, backend=backend)
+    return _iter_listed_fields(fields)
+
+
+def list_ids_fields(
+    idsname: str = "", source=None, backend=None
+) -> Dict[str, Dict[str, Dict[str, Any]]]:
+    """Streaming equivalent of :meth:`~imas_data_dictionary.idsinfo.IDSInfo.list_ids_fields`."""
+    with profiling.span("streaming.list_ids_fields", ids=idsname):
+        return _group_by_ids(iter_ids_fields(idsname, source=source, backend=backend))
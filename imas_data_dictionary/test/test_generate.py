@@ -0,0 +1,508 @@
+"""Tests of the Data Dictionary build scripts, only run in a source checkout."""
+
+import importlib
+import os
+import re
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[2]
+
+pytestmark = pytest.mark.skipif(
+    not (ROOT / "generate.py").is_file(), reason="requires a source checkout"
+)
+
+
+@pytest.fixture(scope="module")
+def generate():
+    pytest.importorskip("saxonche")
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.chdir(ROOT)
+        monkeypatch.syspath_prepend(str(ROOT))
+        yield importlib.import_module("generate")
+
+
+@pytest.fixture(scope="module")
+def install():
+    """The install script, which (unlike generate.py) doesn't require saxonche."""
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.chdir(ROOT)
+        monkeypatch.syspath_prepend(str(ROOT))
+        yield pytest.importorskip("install")
+
+
+@pytest.fixture(scope="module")
+def xslt_output(generate, tmp_path_factory):
+    """dd_data_dictionary.xml compiled by dd_data_dictionary.xml.xsl."""
+    output = tmp_path_factory.mktemp("xslt") / "dd_data_dictionary.xml"
+    with generate.SaxonSession() as saxon:
+        saxon.transform(
+            generate.dd_xsd,
+            generate.dd_xsl,
+            str(output),
+            DD_GIT_DESCRIBE=generate.DD_GIT_DESCRIBE,
+        )
+    return output.read_bytes()
+
+
+def test_compile_dd_per_ids_parity(generate, xslt_output, tmp_path, capsys):
+    per_ids_output = tmp_path / "per_ids.xml"
+    cache_dir = tmp_path / "fragments"
+    with generate.SaxonSession() as saxon:
+        generate.compile_dd_per_ids(
+            per_ids_output, jobs=1, session=saxon, cache_dir=cache_dir
+        )
+        assert per_ids_output.read_bytes() == xslt_output
+
+        # All fragments are reused from the cache, fragments of removed IDSs are
+        # deleted
+        for suffix in (".xml", ".key"):
+            (cache_dir / f"removed_ids{suffix}").write_text("")
+        capsys.readouterr()
+        per_ids_output.unlink()
+        generate.compile_dd_per_ids(
+            per_ids_output, jobs=1, session=saxon, cache_dir=cache_dir
+        )
+        assert "compiling" not in capsys.readouterr().out
+        assert per_ids_output.read_bytes() == xslt_output
+        assert not list(cache_dir.glob("removed_ids.*"))
+
+
+def test_dd_fragment_key(generate):
+    root_xsd = Path(generate.dd_xsd).read_text(encoding="utf-8")
+    driver = generate._dd_fragment_driver("amns_data", root_xsd)
+    key = generate._dd_fragment_key(driver)
+    # Changes of dd_data_dictionary.xml.xsd outside of the IDS declaration
+    changed_xsd = root_xsd.replace("</xs:schema>", "<!-- changed -->\n</xs:schema>")
+    changed_driver = generate._dd_fragment_driver("amns_data", changed_xsd)
+    assert generate._dd_fragment_key(changed_driver) != key
+    # Other IDSs are not included
+    assert "dd_barometry.xsd" not in driver
+
+
+def test_python_compiler_parity(generate, xslt_output, tmp_path):
+    import dd_compiler
+
+    output = tmp_path / "python.xml"
+    dd_compiler.compile_dd(generate.dd_xsd, output, generate.DD_GIT_DESCRIBE)
+    assert output.read_bytes() == xslt_output
+
+
+def _validate_with_xslt(generate, dd_file, output):
+    with generate.SaxonSession() as saxon:
+        saxon.transform(str(dd_file), generate.valid_xsl, str(output))
+    return output.read_text(encoding="utf-8")
+
+
+@pytest.fixture(scope="module")
+def invalid_dd(generate, tmp_path_factory):
+    """A DD with a few IDSs and one violation of every validation rule."""
+    import xml.etree.ElementTree as ET
+
+    tree = ET.parse(ROOT / generate.dd_xml)
+    root = tree.getroot()
+    for ids in root.findall("IDS"):
+        if ids.get("name") not in ("amns_data", "barometry", "core_profiles"):
+            root.remove(ids)
+
+    def field(path):
+        return root.find(f"IDS[@name='core_profiles']//field[@path='{path}']")
+
+    del field("ids_properties/comment").attrib["type"]
+    del field("profiles_1d/grid/rho_tor_norm").attrib["coordinate1"]
+    field("profiles_1d/grid/psi").set("coordinate2", "1...N")
+    del field("profiles_1d/electrons/temperature").attrib["units"]
+    field("profiles_1d/electrons/density").set("units", "m/s")
+    field("profiles_1d/ion/element/z_n").set("units", "s")
+    field("profiles_1d/ion").set("type", "dynamic")
+    field("profiles_1d/ion/element/a").set("type", "static")
+    field("profiles_1d/grid").set("type", "static")
+    field("ids_properties/homogeneous_time").set("type", "dynamic")
+    field("global_quantities/ip").set("timebasepath", "")
+    field("code/library").set("maxoccur", "unbounded")
+    field("profiles_1d/ion/name").set("name", "class")
+    field("profiles_1d/electrons/density").set("coordinate1", "unknown OR 1...0")
+    field("profiles_1d/electrons/temperature").set("coordinate1", "IDS:unknown/time")
+    field("profiles_1d/grid/psi").set("coordinate1", "profiles_1d/ion/z_ion")
+    field("profiles_1d/t_i_average").set("coordinate1", "profiles_1d(i1)/grid")
+    field("profiles_1d/zeff").set("alternative_coordinate1", "profiles_1d;;x")
+    field("profiles_1d/ion/element").set("coordinate1", "profiles_1d(i1)/grid")
+    root.find("IDS[@name='barometry']//field[@data_type='FLT_1D']").set(
+        "doc_identifier", "utilities/../utilities/coordinate_identifier.xml"
+    )
+
+    dd_file = tmp_path_factory.mktemp("invalid") / "dd_data_dictionary.xml"
+    tree.write(dd_file, encoding="utf-8")
+    return dd_file
+
+
+def test_python_validation_parity(generate, tmp_path):
+    import dd_validation
+
+    dd_file = ROOT / generate.dd_xml
+    xslt_report = _validate_with_xslt(generate, dd_file, tmp_path / "xslt.txt")
+    assert dd_validation.validate(dd_file).to_text() == xslt_report
+
+
+def test_python_validation_errors_parity(generate, invalid_dd, tmp_path):
+    import dd_validation
+
+    xslt_report = _validate_with_xslt(generate, invalid_dd, tmp_path / "xslt.txt")
+    report = dd_validation.validate(invalid_dd)
+    assert not report.valid
+    assert report.to_text() == xslt_report
+    rules = {item.rule for item in report.violations}
+    assert rules == set(dd_validation.RULES) - {
+        *dd_validation.IDENTIFIER_RULES,
+        *(f"R5.4-coordinate{n}" for n in range(2, 7)),
+        *(f"coordinate{n}-dimension" for n in (1, 3, 4, 5, 6)),
+    }
+
+
+def test_validation_report_formats(generate, invalid_dd):
+    import json
+    import xml.etree.ElementTree as ET
+
+    import dd_validation
+
+    report = dd_validation.validate(invalid_dd)
+    result = json.loads(report.to_json())
+    assert result["valid"] is False
+    assert result["ids"] == ["amns_data", "barometry", "core_profiles"]
+    assert result["violations"][1] == {
+        "rule": "R5.2-type",
+        "ids": "core_profiles",
+        "path": "ids_properties/comment",
+        "message": dd_validation.RULES["R5.2-type"],
+    }
+    assert len(result["violations"]) == len(report.violations)
+
+    suites = ET.fromstring(report.to_junit())
+    assert int(suites.get("failures")) == len(report.violations)
+    suite = suites.find("testsuite[@name='core_profiles']")
+    failure = suite.find("testcase[@name='reserved-name']/failure")
+    assert "profiles_1d(itime)/ion(i1)/name" in failure.text
+    assert suites.find("testsuite[@name='barometry']").get("failures") == "1"
+
+
+def test_validate_identifiers(tmp_path):
+    import dd_validation
+
+    (tmp_path / "ids").mkdir()
+    (tmp_path / "ids/valid_identifier.xml").write_text(
+        '<constants><int name="a" alias="b,c">1</int><int name="d">2</int></constants>'
+    )
+    (tmp_path / "ids/invalid_identifier.xml").write_text(
+        '<constants><int name="a">1</int><int name="b" alias="a">1</int></constants>'
+    )
+    violations = dd_validation.validate_identifiers(
+        ["ids/valid_identifier.xml", "ids/invalid_identifier.xml"], tmp_path
+    )
+    assert violations == [
+        dd_validation.Violation(
+            rule, None, "ids/invalid_identifier.xml", dd_validation.RULES[rule]
+        )
+        for rule in dd_validation.IDENTIFIER_RULES
+    ]
+
+
+def test_incremental_validation(generate, tmp_path):
+    import json
+    import xml.etree.ElementTree as ET
+
+    import dd_validation
+
+    tree = ET.parse(ROOT / generate.dd_xml)
+    root = tree.getroot()
+    for ids in root.findall("IDS"):
+        if ids.get("name") not in ("barometry", "equilibrium", "magnetics"):
+            root.remove(ids)
+    dd_file = tmp_path / "dd_data_dictionary.xml"
+    cache_file = tmp_path / "cache" / "validation.json"
+
+    def validate():
+        tree.write(dd_file, encoding="utf-8")
+        report = dd_validation.validate(dd_file, cache_file=cache_file)
+        assert report.to_text() == dd_validation.validate(dd_file).to_text()
+        return report
+
+    assert validate().validated == ["barometry", "equilibrium", "magnetics"]
+    assert validate().validated == []
+
+    # Only the modified IDS is validated again
+    field = root.find("IDS[@name='barometry']//field[@data_type='FLT_1D']")
+    field.set("units", "m/s")
+    report = validate()
+    assert report.validated == ["barometry"]
+    assert report.ids["barometry"][0].rule == "R5.3-units-format"
+
+    # equilibrium refers to IDS:magnetics/flux_loop, and is validated again too
+    root.find("IDS[@name='magnetics']/field[@name='flux_loop']").set("name", "loop")
+    report = validate()
+    assert report.validated == ["equilibrium", "magnetics"]
+    messages = [item.message for item in report.ids["equilibrium"]]
+    assert (
+        "Invalid coordinate1: `IDS:magnetics/flux_loop`. Unknown element `flux_loop`"
+        in messages
+    )
+
+    # Results of removed IDSs are dropped from the cache
+    root.remove(root.find("IDS[@name='barometry']"))
+    assert validate().validated == []
+    with open(cache_file) as file:
+        assert sorted(json.load(file)["ids"]) == ["equilibrium", "magnetics"]
+
+
+def _stub_step(output, inputs, fail=False, session=None, jobs=None):
+    """Build step writing its output and the content of its inputs."""
+    if fail:
+        raise RuntimeError(f"cannot write {output}")
+    print(f"writing {output}")
+    if jobs is not None:
+        print(f"with {jobs} jobs")
+    text = "".join(Path(path).read_text() for path in inputs)
+    Path(output).write_text(f"{text}{Path(output).name}\n")
+
+
+@pytest.fixture
+def stub_steps(generate, tmp_path, monkeypatch):
+    """Replace the build steps by a -> b -> c and an independent d."""
+    import functools
+
+    def step(name, inputs=(), fail=False, parallel=False):
+        output = str(tmp_path / f"{name}.txt")
+        inputs = [str(tmp_path / f"{path}.txt") for path in inputs]
+        function = functools.partial(_stub_step, output, inputs, fail)
+        return generate.BuildStep(
+            name, function, tuple(inputs), (output,), parallel=parallel
+        )
+
+    def set_steps(*steps):
+        monkeypatch.setattr(generate, "BUILD_STEPS", list(steps))
+
+    monkeypatch.setattr(generate, "MANIFEST_FILE", str(tmp_path / "manifest.json"))
+    set_steps(step("c", ["b"]), step("b", ["a"]), step("a"), step("d"))
+    return step, set_steps
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_run_build_order(generate, stub_steps, tmp_path, jobs):
+    results = generate.run_build(jobs=jobs, verbose=False)
+
+    # Steps run after the steps producing their inputs
+    assert [(result.name, result.status) for result in results] == [
+        ("c", "ok"),
+        ("b", "ok"),
+        ("a", "ok"),
+        ("d", "ok"),
+    ]
+    assert (tmp_path / "c.txt").read_text() == "a.txt\nb.txt\nc.txt\n"
+    assert results[0].log == f"writing {tmp_path / 'c.txt'}\n"
+    assert results[0].output_size == len("a.txt\nb.txt\nc.txt\n")
+
+
+@pytest.mark.parametrize(
+    "jobs, steps, expected",
+    [
+        (1, ["p", "q"], [1, 1]),
+        (3, ["p"], [3]),
+        # The jobs are divided among the steps starting together
+        (4, ["a", "p"], [None, 2]),
+        (5, ["p", "q"], [2, 3]),
+        (2, ["a", "b", "p"], [None, None, 1]),
+    ],
+)
+def test_run_build_jobs(generate, stub_steps, jobs, steps, expected):
+    step, set_steps = stub_steps
+    set_steps(*(step(name, parallel=name in "pq") for name in steps))
+    results = generate.run_build(jobs=jobs, verbose=False)
+    for result, step_jobs in zip(results, expected):
+        assert ("with" in result.log) == (step_jobs is not None)
+        if step_jobs is not None:
+            assert result.log.endswith(f"with {step_jobs} jobs\n")
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_run_build_failure(generate, stub_steps, tmp_path, capsys, jobs):
+    step, set_steps = stub_steps
+    set_steps(step("a", fail=True), step("b", ["a"]), step("c", ["b"]), step("d"))
+
+    with pytest.raises(generate.BuildError) as excinfo:
+        generate.run_build(jobs=jobs)
+
+    # Dependents of the failed step are skipped, other steps still run
+    results = excinfo.value.results
+    assert [(result.name, result.status) for result in results] == [
+        ("a", "failed"),
+        ("b", "skipped"),
+        ("c", "skipped"),
+        ("d", "ok"),
+    ]
+    assert "RuntimeError: cannot write" in results[0].error
+    assert str(excinfo.value) == "Build step(s) failed: a"
+    assert not (tmp_path / "b.txt").exists()
+    out, err = capsys.readouterr()
+    assert "a failed:" in err
+    summary = out[out.index("Build summary:") :].splitlines()[1:]
+    assert [line.split()[:2] for line in summary] == [
+        ["a", "failed"],
+        ["b", "skipped"],
+        ["c", "skipped"],
+        ["d", "ok"],
+    ]
+
+
+def test_build_manifest(generate, stub_steps, tmp_path, monkeypatch):
+    def statuses(**kwargs):
+        results = generate.run_build(jobs=1, verbose=False, **kwargs)
+        return {result.name: result.status for result in results}
+
+    step, set_steps = stub_steps
+    # Step writing pages, listed with a glob pattern, which depends on a setting
+    pages = step("pages")._replace(
+        outputs=(str(tmp_path / "pages.txt"), str(tmp_path / "page_*.txt")),
+        options=("IMAS_TEST_PAGES",),
+    )
+    set_steps(step("a", ["source"]), step("b", ["a"]), pages)
+    (tmp_path / "source.txt").write_text("source\n")
+    (tmp_path / "page_1.txt").write_text("1")
+    (tmp_path / "page_2.txt").write_text("2")
+
+    assert statuses() == {"a": "ok", "b": "ok", "pages": "ok"}
+    assert statuses() == {"a": "unchanged", "b": "unchanged", "pages": "unchanged"}
+    assert "generate.py" in generate._hash_inputs(pages)["files"]
+
+    # Changed outputs run the step again, changed inputs also the steps after it
+    (tmp_path / "b.txt").write_text("modified")
+    assert statuses() == {"a": "unchanged", "b": "ok", "pages": "unchanged"}
+    (tmp_path / "source.txt").write_text("modified\n")
+    assert statuses() == {"a": "ok", "b": "ok", "pages": "unchanged"}
+    assert (tmp_path / "b.txt").read_text() == "modified\na.txt\nb.txt\n"
+
+    # Deleted outputs and changed settings
+    (tmp_path / "page_2.txt").unlink()
+    assert statuses()["pages"] == "ok"
+    assert statuses()["pages"] == "unchanged"
+    monkeypatch.setenv("IMAS_TEST_PAGES", "other")
+    assert statuses()["pages"] == "ok"
+    assert statuses()["pages"] == "unchanged"
+
+    assert statuses(force=True) == {"a": "ok", "b": "ok", "pages": "ok"}
+
+
+def test_build_report(generate, tmp_path):
+    import json
+
+    output = tmp_path / "output.txt"
+    report = generate.BuildReport()
+    with report.measure("write", [str(output)]):
+        output.write_text("x" * 1000)
+    with pytest.raises(ValueError):
+        with report.measure("fail"):
+            raise ValueError
+    report.add(generate.StepResult("cached", "unchanged", 0.0, "", ""))
+
+    baseline_file = tmp_path / "baseline.json"
+    report.write(baseline_file)
+    baseline = json.loads(baseline_file.read_text())
+    record = baseline["steps"]["write"]
+    assert record["status"] == "ok"
+    assert record["output_size"] == 1000
+    assert record["wall_time"] >= 0 and record["cpu_time"] >= 0
+    assert baseline["steps"]["fail"]["status"] == "failed"
+    assert baseline["steps"]["cached"]["wall_time"] is None
+
+    # Compare with a baseline in which the step was faster and smaller
+    baseline["steps"]["write"].update(wall_time=0.0, output_size=100)
+    baseline_file.write_text(json.dumps(baseline))
+    report_file = tmp_path / "report.json"
+    regressions = report.write(report_file, baseline_file=baseline_file)
+    assert regressions == ["write.output_size"]
+    comparison = json.loads(report_file.read_text())["comparison"]
+    assert list(comparison["steps"]) == ["write"]
+    assert comparison["steps"]["write"]["output_size"]["ratio"] == 10
+    assert comparison["regressions"] == regressions
+
+
+def test_html_documentation_per_page(generate, tmp_path, monkeypatch):
+    import xml.etree.ElementTree as ET
+
+    tree = ET.parse(ROOT / generate.dd_xml)
+    root = tree.getroot()
+    for ids in root.findall("IDS"):
+        if ids.get("name") not in ("amns_data", "barometry"):
+            root.remove(ids)
+    dd_file = tmp_path / "dd_data_dictionary.xml"
+    tree.write(dd_file, encoding="utf-8")
+    monkeypatch.setattr(generate, "dd_xml", str(dd_file))
+
+    pages = {}
+    for mode in generate.HTML_DOC_MODES:
+        output = tmp_path / mode / "html_documentation.html"
+        monkeypatch.setattr(generate, "doc_html", str(output))
+        generate.generate_html_documentation(mode=mode, jobs=1)
+        # Only the (empty) principal output is written next to the pages
+        assert sorted(path.name for path in output.parent.iterdir()) == [
+            "html_documentation",
+            "html_documentation.html",
+        ]
+        assert output.read_bytes() == b""
+        pages[mode] = {
+            path.name: path.read_bytes()
+            for path in (output.parent / "html_documentation").iterdir()
+        }
+
+    ids_pages = [
+        "amns_data.html",
+        "amns_data_flat.html",
+        "barometry.html",
+        "barometry_flat.html",
+    ]
+    assert sorted(pages["single"]) == sorted(["html_documentation.html", *ids_pages])
+    utilities = [field.get("name") for field in root.find("utilities")]
+    assert sorted(pages["per-page"]) == sorted(
+        [*pages["single"], *(f"utility_{name}.html" for name in utilities)]
+    )
+    for name in ids_pages:
+        assert pages["per-page"][name] == pages["single"][name]
+    assert "gauge(i1)" in pages["single"]["barometry.html"].decode()
+
+    # The per-page index also links to the pages of the generic structures
+    index = pages["single"]["html_documentation.html"].decode()
+    assert '<a href="barometry.html">barometry</a>' in index
+    assert "utility_" not in index
+    page_index = pages["per-page"]["html_documentation.html"].decode()
+    assert '<a href="utility_identifier.html">identifier</a>' in page_index
+    assert re.sub(r'<a href="utility_\w+\.html">(\w+)</a>', r"\1", page_index) == index
+    with pytest.raises(ValueError):
+        generate.generate_html_documentation(mode="unknown")
+
+
+def test_sync_files(install, tmp_path):
+    source, destination = tmp_path / "source", tmp_path / "destination"
+    (source / "sub").mkdir(parents=True)
+    (source / "a.xml").write_text("a")
+    (source / "sub" / "b.xml").write_text("b")
+    files = {
+        destination / "a.xml": source / "a.xml",
+        destination / "sub" / "b.xml": source / "sub" / "b.xml",
+    }
+    assert install.sync_files(files) == sorted(str(path) for path in files)
+    assert (destination / "sub" / "b.xml").read_text() == "b"
+    assert install.sync_files(files) == []
+
+    # Only changed files are copied, files with the same content are not
+    (source / "a.xml").write_text("A")
+    os.utime(source / "sub" / "b.xml", ns=(0, 0))
+    assert install.sync_files(files) == [str(destination / "a.xml")]
+    assert (destination / "a.xml").read_text() == "A"
+    assert (destination / "sub" / "b.xml").stat().st_mtime_ns == 0
+
+    (destination / "stale.xml").write_text("stale")
+    del files[destination / "a.xml"]
+    assert install.remove_stale_files(destination, "**/*", files) == [
+        str(destination / "a.xml"),
+        str(destination / "stale.xml"),
+    ]
+    assert [path.name for path in destination.rglob("*.xml")] == ["b.xml"]
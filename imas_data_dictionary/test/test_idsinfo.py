@@ -0,0 +1,200 @@
+import copy
+import csv
+import io
+import json
+import multiprocessing
+import pickle
+
+import pytest
+
+from imas_data_dictionary.idsinfo import FrozenDict, IDSInfo, main, write_records
+
+
+@pytest.fixture(scope="module")
+def idsinfo():
+    # Results are not cached, so every call does the actual work
+    return IDSInfo(cache_size=0)
+
+
+@pytest.fixture(scope="module")
+def cached_idsinfo():
+    return IDSInfo(cache_size=2)
+
+
+@pytest.fixture
+def cached(cached_idsinfo):
+    cached_idsinfo.clear_cache()
+    return cached_idsinfo
+
+
+@pytest.mark.parametrize("text, strict", [("ggd", False), (".*_error_upper", False)])
+def test_find_in_ids_parallel(idsinfo, text, strict):
+    serial = idsinfo.find_in_ids(text, strict)
+    parallel = idsinfo.find_in_ids(text, strict, jobs=3)
+    assert parallel == serial
+    # Results are merged in the same (deterministic) order
+    assert list(parallel) == list(serial)
+    for ids_name in serial:
+        assert list(parallel[ids_name]) == list(serial[ids_name])
+
+
+def test_find_in_ids_pool(idsinfo):
+    idsinfo.find_in_ids("ggd", jobs=2)
+    pool = idsinfo._pool
+    # The worker processes are reused, until the number of jobs changes
+    idsinfo.find_in_ids("time", jobs=2)
+    assert idsinfo._pool is pool
+    idsinfo.find_in_ids("time", jobs=3)
+    assert idsinfo._pool is not pool
+    idsinfo.close()
+    assert idsinfo._pool is None
+    idsinfo.close()
+
+
+@pytest.mark.skipif(
+    "spawn" not in multiprocessing.get_all_start_methods(),
+    reason="requires the spawn start method",
+)
+def test_find_in_ids_spawn(monkeypatch):
+    # Spawned worker processes (the default on macOS and Windows) load the DD
+    get_context = multiprocessing.get_context
+    monkeypatch.setattr(
+        multiprocessing, "get_context", lambda method=None: get_context("spawn")
+    )
+    idsinfo = IDSInfo(cache_size=0)
+    try:
+        parallel = idsinfo.find_in_ids("ggd", jobs=2)
+    finally:
+        idsinfo.close()
+    assert parallel == idsinfo.find_in_ids("ggd")
+
+
+def test_cache_hits_and_misses(idsinfo, cached):
+    result = cached.find_in_ids("ggd")
+    assert cached.cache_info() == (0, 1, 2, 1)
+    assert cached.find_in_ids("ggd") is result
+    # The number of jobs doesn't affect the result, and is not part of the key
+    assert cached.find_in_ids("ggd", jobs=2) is result
+    assert cached.cache_info() == (2, 1, 2, 1)
+    assert result == idsinfo.find_in_ids("ggd")
+
+    cached.clear_cache()
+    assert cached.cache_info() == (0, 0, 2, 0)
+    assert cached.find_in_ids("ggd") is not result
+
+
+def test_cache_eviction(cached):
+    first = cached.query("equilibrium")
+    cached.query("magnetics")
+    cached.query("equilibrium")  # Now the most recently used entry
+    cached.list_ids_fields("summary")  # Evicts magnetics
+    assert cached.cache_info().currsize == 2
+    assert cached.query("equilibrium") is first
+    cached.query("magnetics")
+    assert cached.cache_info()[:2] == (2, 4)
+
+
+def test_cache_results_are_read_only(idsinfo, cached):
+    result = cached.list_ids_fields("magnetics")
+    attributes = next(iter(result["magnetics"].values()))
+    assert isinstance(result, FrozenDict)
+    with pytest.raises(TypeError):
+        result["magnetics"] = {}
+    with pytest.raises(TypeError):
+        attributes.pop("units")
+    with pytest.raises(TypeError):
+        cached.query("magnetics").update(name="other")
+    assert result == idsinfo.list_ids_fields("magnetics")
+    # Copies are mutable, and frozen results can be pickled
+    copied = dict(result)
+    copied["magnetics"] = {}
+    assert pickle.loads(pickle.dumps(result)) == result
+    assert copy.deepcopy(result) is result
+
+
+def test_cache_threads(cached):
+    import concurrent.futures
+
+    names = ["equilibrium", "magnetics", "summary", "wall"] * 50
+    with concurrent.futures.ThreadPoolExecutor(8) as pool:
+        results = list(pool.map(cached.query, names))
+    for name, result in zip(names, results):
+        assert result["name"] == name
+    info = cached.cache_info()
+    assert info.hits + info.misses == len(names)
+    assert info.currsize == 2
+
+
+def test_cache_errors_not_cached(cached):
+    with pytest.raises(ValueError):
+        cached.query("not_an_ids")
+    assert cached.cache_info().currsize == 0
+
+
+def _parse_output(text, output_format):
+    if output_format == "json":
+        return json.loads(text)
+    if output_format == "jsonl":
+        return [json.loads(line) for line in text.splitlines()]
+    rows = list(csv.DictReader(io.StringIO(text)))
+    # CSV has no null values
+    return [{key: value or None for key, value in row.items()} for row in rows]
+
+
+@pytest.mark.parametrize("output_format", ["json", "jsonl", "csv"])
+@pytest.mark.parametrize(
+    "command", [["search", "ggd"], ["search", "ggd", "-j", "2"], ["idsfields", "wall"]]
+)
+def test_cli_format_fields(idsinfo, capsys, output_format, command):
+    main([*command, "--format", output_format])
+    records = _parse_output(capsys.readouterr().out, output_format)
+
+    if command[0] == "search":
+        expected = idsinfo.find_in_ids("ggd")
+    else:
+        expected = idsinfo.list_ids_fields("wall")
+    assert len(records) == sum(len(fields) for fields in expected.values())
+    for record in records:
+        attributes = expected[record["ids"]][record["path"]]
+        assert record["units"] == attributes.get("units")
+        assert record["documentation"] == attributes.get("documentation")
+
+
+@pytest.mark.parametrize("output_format", ["json", "jsonl", "csv"])
+def test_cli_format_unknown_ids(capsys, output_format):
+    assert main(["idsfields", "nonexist", "-f", output_format]) == 1
+    captured = capsys.readouterr()
+    assert captured.out == ""
+    assert "nonexist" in captured.err
+
+
+@pytest.mark.parametrize("output_format", ["json", "jsonl", "csv"])
+def test_cli_format_info(idsinfo, capsys, output_format):
+    main(["info", "magnetics", "ids_properties/comment", "-a", "-f", output_format])
+    records = _parse_output(capsys.readouterr().out, output_format)
+    assert records == [idsinfo.query("magnetics", "ids_properties/comment")]
+
+    main(["idsnames", "-f", output_format])
+    records = _parse_output(capsys.readouterr().out, output_format)
+    assert [record["name"] for record in records] == idsinfo.get_ids_names()
+
+
+@pytest.mark.parametrize(
+    "output_format, expected",
+    [("json", "[]\n"), ("jsonl", ""), ("csv", "a,b\n")],
+)
+def test_write_records_empty(output_format, expected):
+    stream = io.StringIO()
+    write_records(iter([]), output_format, ["a", "b"], stream)
+    assert stream.getvalue() == expected
+
+
+def test_write_records_buffering():
+    records = [{"a": i, "b": str(i)} for i in range(1000)]
+    small, large = io.StringIO(), io.StringIO()
+    write_records(records, "json", ["a", "b"], small, buffer_size=10)
+    write_records(records, "json", ["a", "b"], large)
+    assert small.getvalue() == large.getvalue()
+    assert json.loads(small.getvalue()) == records
+    with pytest.raises(ValueError):
+        write_records(records, "xml", ["a", "b"], small)
@@ -0,0 +1,107 @@
+import json
+
+import pytest
+
+from imas_data_dictionary import profiling
+from imas_data_dictionary.idsinfo import IDSInfo
+
+
+@pytest.fixture
+def records():
+    """Enable profiling for the duration of a test and collect all records."""
+    records = []
+    profiling.enable_profiling(records.append)
+    yield records
+    profiling.disable_profiling()
+
+
+@pytest.fixture
+def disabled(monkeypatch):
+    """Disable profiling for the duration of a test, regardless of IMAS_DD_PROFILE."""
+    monkeypatch.delenv("IMAS_DD_PROFILE", raising=False)
+    monkeypatch.setattr(profiling, "_callback", None)
+
+
+def test_disabled_span_is_noop(disabled):
+    assert not profiling.is_enabled()
+    with profiling.span("test") as span:
+        pass
+    assert span is profiling._NULL_SPAN
+
+
+def test_span_records(records):
+    with profiling.span("outer", answer=42):
+        with profiling.span("inner"):
+            pass
+    assert [record["name"] for record in records] == ["inner", "outer"]
+    assert records[1]["answer"] == 42
+    for record in records:
+        assert record["wall_time"] >= 0
+        assert record["cpu_time"] >= 0
+
+
+def test_span_records_error(records):
+    with pytest.raises(KeyError):
+        with profiling.span("failing"):
+            raise KeyError()
+    assert records[0]["error"] == "KeyError"
+
+
+def test_span_trace_memory(records):
+    import tracemalloc
+
+    profiling.enable_profiling(records.append, trace_memory=True)
+    try:
+        with profiling.span("outer"):
+            with profiling.span("inner"):
+                data = bytearray(1_000_000)
+            del data
+    finally:
+        tracemalloc.stop()
+    inner, outer = records
+    assert inner["peak_memory"] >= 1_000_000
+    assert outer["peak_memory"] >= inner["peak_memory"]
+
+
+def test_span_stack_per_thread(records):
+    import threading
+
+    barrier = threading.Barrier(2)
+    stacks = {}
+
+    def run(name):
+        with profiling.span(name) as span:
+            barrier.wait()  # Both threads have an active span
+            stacks[name] = (span, list(profiling._active_spans()))
+            barrier.wait()
+
+    threads = [threading.Thread(target=run, args=(name,)) for name in "ab"]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(stacks) == 2
+    for span, stack in stacks.values():
+        assert stack == [span]
+    assert sorted(record["name"] for record in records) == ["a", "b"]
+
+
+def test_idsinfo_spans(records):
+    idsinfo = IDSInfo()
+    idsinfo.query("equilibrium", "time_slice")
+    names = [record["name"] for record in records]
+    assert "idsinfo.parse" in names
+    assert records[-1]["name"] == "idsinfo.query"
+    assert records[-1]["args"] == ("equilibrium", "time_slice")
+
+
+def test_json_writer(tmp_path):
+    path = tmp_path / "profile.jsonl"
+    profiling.enable_profiling(profiling._JSONWriter(path=path))
+    try:
+        with profiling.span("test"):
+            pass
+    finally:
+        profiling.disable_profiling()
+    record = json.loads(path.read_text())
+    assert record["name"] == "test"
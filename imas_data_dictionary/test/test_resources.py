@@ -1,4 +1,6 @@
+import gzip
 from pathlib import Path
+import xml.etree.ElementTree as ET
 
 import pytest
 
@@ -22,3 +24,54 @@ def test_get_schema_returns_valid_path():
     assert path.exists()
     assert path.is_file()
     assert path.name == "data_dictionary.xml"
+
+
+def test_get_resource_path_is_cached():
+    """Test that repeated lookups return the cached path."""
+    path = get_schema("data_dictionary.xml")
+    assert get_schema("data_dictionary.xml") is path
+    assert get_resource_path.cache_info().hits > 0
+
+
+def test_extract_resource(tmp_path, monkeypatch):
+    """Test one-time extraction of resources for non-filesystem installs."""
+    from imas_data_dictionary import __version__, _extract_resource
+
+    monkeypatch.setenv("IMAS_DD_CACHE_DIR", str(tmp_path))
+    path = _extract_resource("resources/schemas/test.xml", b"<test/>")
+    assert path.read_bytes() == b"<test/>"
+    assert tmp_path / __version__ in path.parents
+    # Extracting again reuses the existing file
+    mtime = path.stat().st_mtime_ns
+    assert _extract_resource("resources/schemas/test.xml", b"<test/>") == path
+    assert path.stat().st_mtime_ns == mtime
+    # Different contents end up in a different location
+    other = _extract_resource("resources/schemas/test.xml", b"<other/>")
+    assert other != path
+    assert other.read_bytes() == b"<other/>"
+
+
+def test_open_schema_compressed():
+    """Test that open_schema transparently decompresses the data dictionary."""
+    from imas_data_dictionary import open_schema
+
+    with open_schema("data_dictionary.xml") as schema_file:
+        assert isinstance(schema_file, gzip.GzipFile)
+        assert schema_file.name == str(get_schema("data_dictionary.xml.gz"))
+        root = ET.parse(schema_file).getroot()
+    # The compressed copy is minified, but has the same content
+    plain_root = ET.parse(get_schema("data_dictionary.xml")).getroot()
+    assert root.findtext("version") == plain_root.findtext("version")
+    ids_names = [ids.get("name") for ids in root.iterfind("IDS")]
+    assert ids_names == [ids.get("name") for ids in plain_root.iterfind("IDS")]
+    assert ids_names
+
+
+def test_open_schema_uncompressed():
+    """Test that open_schema falls back to the plain resource file."""
+    from imas_data_dictionary import open_schema
+
+    with open_schema("utilities/coordinate_identifier.xml") as schema_file:
+        assert not isinstance(schema_file, gzip.GzipFile)
+        root = ET.parse(schema_file).getroot()
+    assert root.tag == "constants"
@@ -0,0 +1,84 @@
+import pytest
+
+from imas_data_dictionary import streaming
+from imas_data_dictionary.idsinfo import IDSInfo
+
+SMALL_DD = b"""<?xml version="1.0" encoding="UTF-8"?>
+<IDSs>
+  <version>1.0</version>
+  <utilities>
+    <field name="b0" path="b0" path_doc="b0" units="T"/>
+  </utilities>
+  <IDS name="test">
+    <field name="profiles_1d" path="profiles_1d" path_doc="profiles_1d(itime)"
+           timebasepath="profiles_1d/time">
+      <field name="b0" path="profiles_1d/b0" path_doc="profiles_1d(itime)/b0"
+             units="T" documentation="Field"/>
+      <field name="b0_error_upper" path="profiles_1d/b0_error_upper"
+             path_doc="profiles_1d(itime)/b0_error_upper" units="as_parent"/>
+    </field>
+  </IDS>
+  <IDS name="other">
+    <field name="b0" path="b0" path_doc="b0" units="T"/>
+  </IDS>
+</IDSs>
+"""
+
+
+@pytest.fixture(scope="module")
+def idsinfo():
+    return IDSInfo()
+
+
+@pytest.fixture
+def small_dd(tmp_path):
+    path = tmp_path / "dd.xml"
+    path.write_bytes(SMALL_DD)
+    return path
+
+
+@pytest.mark.parametrize("text, strict", [("ggd", False), ("psi", True)])
+def test_find_in_ids_identical(idsinfo, text, strict):
+    result = streaming.find_in_ids(text, strict=strict)
+    assert result
+    assert result == idsinfo.find_in_ids(text, strict=strict)
+
+
+@pytest.mark.parametrize("ids", ["equilibrium", "summary"])
+def test_list_ids_fields_identical(idsinfo, ids):
+    assert streaming.list_ids_fields(ids) == idsinfo.list_ids_fields(ids)
+
+
+def test_list_ids_fields_unknown_ids():
+    assert streaming.list_ids_fields("does_not_exist") == {}
+
+
+def test_find_in_ids_source(small_dd):
+    result = streaming.find_in_ids("b0", strict=True, source=small_dd)
+    assert result == {
+        "test": {"profiles_1d/b0": {"units": "T", "documentation": "Field"}},
+        "other": {"b0": {"units": "T"}},
+    }
+
+
+def test_list_ids_fields_source(small_dd):
+    result = streaming.list_ids_fields("test", source=small_dd)
+    assert list(result["test"]) == [
+        "profiles_1d(itime)",
+        "profiles_1d(itime)/b0",
+        "profiles_1d(itime)/b0_error_upper",
+    ]
+    # as_parent units are resolved
+    assert result["test"]["profiles_1d(itime)/b0_error_upper"] == {"units": "T"}
+
+
+def test_iter_fields_document_order(small_dd):
+    seen = []
+    for ids_name, attrib in streaming.iter_fields(source=small_dd):
+        seen.append((ids_name, attrib["path"]))
+    assert seen == [
+        ("test", "profiles_1d"),
+        ("test", "profiles_1d/b0"),
+        ("test", "profiles_1d/b0_error_upper"),
+        ("other", "b0"),
+    ]
@@ -0,0 +1,34 @@
+import pytest
+
+from imas_data_dictionary.idsinfo import IDSInfo
+from imas_data_dictionary.xml_backend import get_backend
+
+
+def test_get_backend():
+    assert get_backend("etree").name == "etree"
+    assert get_backend().name == "etree"
+    with pytest.raises(ValueError):
+        get_backend("unknown")
+
+
+def test_find():
+    backend = get_backend("etree")
+    root = IDSInfo(backend="etree").root
+    equilibrium = backend.find_ids(root, "equilibrium")
+    assert equilibrium.get("name") == "equilibrium"
+    assert backend.find_field(equilibrium, "time_slice").get("name") == "time_slice"
+    assert backend.find_ids(root, "does_not_exist") is None
+    assert backend.find_field(equilibrium, "does_not_exist") is None
+
+
+def test_lxml_backend_identical_results():
+    pytest.importorskip("lxml")
+    etree_info = IDSInfo(backend="etree")
+    lxml_info = IDSInfo(backend="lxml")
+
+    assert etree_info.version == lxml_info.version
+    assert etree_info.get_ids_names() == lxml_info.get_ids_names()
+    path = "time_slice/profiles_1d/psi"
+    assert etree_info.query("equilibrium", path) == lxml_info.query("equilibrium", path)
+    assert etree_info.find_in_ids("ggd") == lxml_info.find_in_ids("ggd")
+    assert etree_info.list_ids_fields("summary") == lxml_info.list_ids_fields("summary")
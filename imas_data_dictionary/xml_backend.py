@@ -0,0 +1,110 @@
+"""
+XML parser backends for reading the Data Dictionary.
+
+Two backends are available, both returning ElementTree-compatible elements:
+
+- ``etree``: uses :mod:`xml.etree.ElementTree` from the standard library.
+- ``lxml``: uses `lxml <https://lxml.de>`_ when it is installed. XPath expressions
+  are compiled once, and parsing supports very large documents (``huge_tree``).
+
+By default ``etree`` is used: searching and querying the parsed DD are 2-3 times
+faster than with ``lxml``, which only parses slightly faster. Set the
+``IMAS_DD_XML_BACKEND`` environment variable to select a backend explicitly.
+
+Both backends give identical results for the lookups defined here, which avoid
+building XPath strings for every query.
+"""
+
+import functools
+import os
+import xml.etree.ElementTree as ET
+from typing import Any, Iterator, Optional, Sequence, Tuple
+
+__all__ = ["get_backend", "ElementTreeBackend", "LxmlBackend"]
+
+
+class ElementTreeBackend:
+    """XML backend using :mod:`xml.etree.ElementTree`."""
+
+    name = "etree"
+
+    def parse(self, source) -> ET.Element:
+        """Parse a file name or file object and return the root element."""
+        return ET.parse(source).getroot()
+
+    def iterparse(
+        self, source, events: Sequence[str] = ("end",)
+    ) -> Iterator[Tuple[str, Any]]:
+        """Incrementally parse a file name or file object."""
+        return ET.iterparse(source, events)
+
+    def find_ids(self, root: ET.Element, name: str) -> Optional[ET.Element]:
+        """Return the IDS element with the given name, or None if it doesn't exist."""
+        return self._find_named(root, "IDS", name)
+
+    def find_field(self, element: ET.Element, name: str) -> Optional[ET.Element]:
+        """Return the child field with the given name, or None if it doesn't exist."""
+        return self._find_named(element, "field", name)
+
+    @staticmethod
+    def _find_named(element, tag, name):
+        for child in element.iterfind(tag):
+            if child.get("name") == name:
+                return child
+        return None
+
+
+class LxmlBackend:
+    """XML backend using lxml, with compiled XPath expressions."""
+
+    name = "lxml"
+
+    def __init__(self):
+        from lxml import etree
+
+        self._etree = etree
+        self._parser = etree.XMLParser(huge_tree=True)
+        self._find_ids = etree.XPath("IDS[@name=$name]")
+        self._find_field = etree.XPath("field[@name=$name]")
+
+    def parse(self, source):
+        """Parse a file name or file object and return the root element."""
+        return self._etree.parse(source, self._parser).getroot()
+
+    def iterparse(
+        self, source, events: Sequence[str] = ("end",)
+    ) -> Iterator[Tuple[str, Any]]:
+        """Incrementally parse a file name or file object."""
+        return self._etree.iterparse(source, events=events, huge_tree=True)
+
+    def find_ids(self, root, name: str):
+        """Return the IDS element with the given name, or None if it doesn't exist."""
+        result = self._find_ids(root, name=name)
+        return result[0] if result else None
+
+    def find_field(self, element, name: str):
+        """Return the child field with the given name, or None if it doesn't exist."""
+        result = self._find_field(element, name=name)
+        return result[0] if result else None
+
+
+@functools.lru_cache(maxsize=None)
+def get_backend(name: Optional[str] = None):
+    """Return an XML backend.
+
+    Args:
+        name: Name of the backend (``"lxml"`` or ``"etree"``). When not provided,
+            the ``IMAS_DD_XML_BACKEND`` environment variable is used. If that is not
+            set either, ``etree`` is used.
+
+    Raises:
+        ValueError: When an unknown backend is requested.
+        ImportError: When the ``lxml`` backend is requested, but not installed.
+    """
+    if name is None:
+        name = os.environ.get("IMAS_DD_XML_BACKEND", "").strip().lower() or "etree"
+    if name == "lxml":
+        return LxmlBackend()
+    if name == "etree":
+        return ElementTreeBackend()
+    raise ValueError(f"Unknown XML backend {name!r}, expected 'lxml' or 'etree'")
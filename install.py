@@ -1,9 +1,21 @@
+import argparse
+import concurrent.futures
+import gzip
+import hashlib
 import logging
 import os
 import pathlib
 import shutil
+import sys
+import tempfile
+import xml.etree.ElementTree as ET
 from pathlib import Path
 
+try:
+    import fcntl
+except ImportError:  # Not available on Windows
+    fcntl = None
+
 from setuptools_scm import get_version
 
 # Configure logging
@@ -17,10 +29,6 @@ logger = logging.getLogger(__name__)
 DD_BUILD = pathlib.Path(__file__).parent.resolve()
 IMAS_INSTALL_DIR = os.path.join(DD_BUILD, "imas_data_dictionary/resources")
 
-# Delete directory contents if it exists
-if os.path.exists(IMAS_INSTALL_DIR) and os.path.isdir(IMAS_INSTALL_DIR):
-    shutil.rmtree(IMAS_INSTALL_DIR)
-
 DD_GIT_DESCRIBE = get_version()
 UAL_GIT_DESCRIBE = DD_GIT_DESCRIBE
 
@@ -47,6 +55,106 @@ htmldoc = [
 ]
 
 
+def clean_resources():
+    """Remove all installed resources, so that the next installation copies them."""
+    if os.path.isdir(IMAS_INSTALL_DIR):
+        logger.info(f"[IMAS-DD] Removing {IMAS_INSTALL_DIR}")
+        shutil.rmtree(IMAS_INSTALL_DIR)
+
+
+def sync_files(files, jobs=None):
+    """Copy files to their destination, unless the destination is up to date.
+
+    A destination is up to date when it has the size and modification time of its
+    source (copies keep the modification time of their source), or else the same
+    content. Files are copied in parallel threads, and cloned (reflinks) when the
+    filesystem supports it.
+
+    Args:
+        files: Dictionary of destination paths to source paths
+        jobs: Number of threads, see :class:`concurrent.futures.ThreadPoolExecutor`
+
+    Returns:
+        Sorted list of the destinations which were copied
+    """
+    with concurrent.futures.ThreadPoolExecutor(jobs) as pool:
+        copied = pool.map(lambda item: _sync_file(*item), files.items())
+        return sorted(
+            str(destination) for destination, done in zip(files, copied) if done
+        )
+
+
+def _sync_file(destination, source):
+    source_stat = os.stat(source)
+    try:
+        destination_stat = os.stat(destination)
+    except FileNotFoundError:
+        destination_stat = None
+    if destination_stat is not None and destination_stat.st_size == source_stat.st_size:
+        if destination_stat.st_mtime_ns == source_stat.st_mtime_ns:
+            return False
+        if _hash_file(destination) == _hash_file(source):
+            # Same content: only record the modification time for the next sync
+            os.utime(destination, ns=(source_stat.st_atime_ns, source_stat.st_mtime_ns))
+            return False
+    destination = Path(destination)
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    # Replace the destination at once, readers never see a partial file. The
+    # temporary file is unique, so concurrent installs into the same prefix don't
+    # overwrite each other's copies.
+    fd, tmp_path = tempfile.mkstemp(
+        dir=destination.parent, prefix=f".{destination.name}."
+    )
+    os.close(fd)
+    try:
+        if not _reflink(source, tmp_path):
+            shutil.copyfile(source, tmp_path)
+        shutil.copystat(source, tmp_path)
+        os.replace(tmp_path, destination)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+    return True
+
+
+def _reflink(source, destination):
+    """Clone a file sharing its data blocks (btrfs, XFS), return whether it worked."""
+    if fcntl is None or not sys.platform.startswith("linux"):
+        return False
+    try:
+        with open(source, "rb") as src, open(destination, "wb") as dst:
+            fcntl.ioctl(
+                dst.fileno(), getattr(fcntl, "FICLONE", 0x40049409), src.fileno()
+            )
+        return True
+    except OSError:
+        return False
+
+
+def _hash_file(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.digest()
+
+
+def remove_stale_files(directory, pattern, keep):
+    """Remove the files matching a glob pattern in a directory, except ``keep``.
+
+    Returns:
+        Sorted list of the removed files
+    """
+    keep = {Path(path) for path in keep}
+    removed = []
+    for path in sorted(Path(directory).glob(pattern)):
+        if path.is_file() and path not in keep:
+            path.unlink()
+            removed.append(str(path))
+    return removed
+
+
 def install_html_docs():
     """
     Install HTML documentation to the package resources directory.
@@ -84,41 +192,24 @@ def install_html_docs():
             logger.error(f"[IMAS-DD] Source path is not a directory: {html_docs_dir}")
             raise NotADirectoryError(f"Expected directory, got file: {html_docs_dir}")
 
-        # Remove existing destination if present
-        if legacy_dir.exists():
-            logger.info(f"[IMAS-DD] Removing existing destination: {legacy_dir}")
-            shutil.rmtree(legacy_dir)
-
-        # Ensure parent directory exists
-        legacy_dir.parent.mkdir(parents=True, exist_ok=True)
-
-        # Copy documentation
-        logger.info(f"[IMAS-DD] Copying HTML docs from {html_docs_dir} to {legacy_dir}")
-        shutil.copytree(html_docs_dir, legacy_dir)
-
-        # Check if there's a nested html_documentation directory and flatten it
-        nested_dir = legacy_dir / "html_documentation"
-        if nested_dir.exists() and nested_dir.is_dir():
-            logger.info(
-                "[IMAS-DD] Found nested html_documentation directory, flattening structure"
-            )
-            # Move files from nested directory to parent
-            for item in nested_dir.iterdir():
-                dest_path = legacy_dir / item.name
-                # If item already exists at destination, remove it first
-                if dest_path.exists():
-                    if dest_path.is_dir():
-                        shutil.rmtree(dest_path)
-                    else:
-                        dest_path.unlink()
-                # Move the item
-                shutil.move(str(item), str(dest_path))
-                logger.debug(
-                    f"[IMAS-DD] Moved {item.name} from nested to legacy directory"
-                )
-            # Remove the now-empty nested directory
-            shutil.rmtree(nested_dir)
-            logger.info("[IMAS-DD] Removed nested html_documentation directory")
+        # The pages are generated in a nested html_documentation directory, which
+        # is flattened: its files take precedence over those of the parent
+        files = {}
+        nested_dir = html_docs_dir / "html_documentation"
+        for path in sorted(html_docs_dir.rglob("*")):
+            if path.is_file() and nested_dir not in path.parents:
+                files[legacy_dir / path.relative_to(html_docs_dir)] = path
+        for path in sorted(nested_dir.rglob("*")):
+            if path.is_file():
+                files[legacy_dir / path.relative_to(nested_dir)] = path
+
+        logger.info(f"[IMAS-DD] Syncing HTML docs from {html_docs_dir} to {legacy_dir}")
+        copied = sync_files(files)
+        removed = remove_stale_files(legacy_dir, "**/*", files)
+        logger.info(
+            f"[IMAS-DD] {len(copied)} of {len(files)} files copied, "
+            f"{len(removed)} removed"
+        )
 
         logger.info("[IMAS-DD] HTML documentation installation completed successfully")
 
@@ -130,6 +221,17 @@ def install_html_docs():
         raise
 
 
+def remove_html_docs():
+    """Remove the HTML documentation installed by an earlier build with docs.
+
+    Otherwise the package data of a build without docs would still include it.
+    """
+    docs_dir = Path(srcdir) / "imas_data_dictionary" / "resources" / "docs"
+    if docs_dir.is_dir():
+        logger.info(f"[IMAS-DD] Removing {docs_dir}")
+        shutil.rmtree(docs_dir)
+
+
 def install_dd_files():
     print("installing dd files")
     dd_files = [
@@ -149,19 +251,58 @@ def install_dd_files():
     # Exclude the IDSDef.xml file. This file is a copy of data_dictionary.xml
     # shutil.copy("IDSDef.xml", schemas_dir / "IDSDef.xml")
 
-    # Copy schema files to the schemas subfolder
-    for dd_file in dd_files:
-        shutil.copy(dd_file, schemas_dir / dd_file)
-
-    # rename schemas/dd_data_dictionary.xml to schemas/data_dictionary.xml
-    data_dictionary_path = schemas_dir / "dd_data_dictionary.xml"
-    if data_dictionary_path.exists():
-        new_data_dictionary_path = schemas_dir / "data_dictionary.xml"
-        # Remove target file if it exists to avoid rename error
-        if new_data_dictionary_path.exists():
-            new_data_dictionary_path.unlink()
-        data_dictionary_path.rename(new_data_dictionary_path)
-        logger.info(f"Renamed {data_dictionary_path} to {new_data_dictionary_path}")
+    # Copy schema files to the schemas subfolder, dd_data_dictionary.xml is
+    # installed as data_dictionary.xml
+    files = {
+        schemas_dir / dd_file.replace("dd_data_dictionary", "data_dictionary"): dd_file
+        for dd_file in dd_files
+    }
+    copied = sync_files(files)
+
+    xml_path = schemas_dir / "data_dictionary.xml"
+    gz_path = xml_path.with_name(xml_path.name + ".gz")
+    if (
+        str(xml_path) in copied
+        or not gz_path.exists()
+        or gz_path.stat().st_mtime_ns < xml_path.stat().st_mtime_ns
+    ):
+        install_compressed_dd(xml_path)
+    else:
+        logger.info(f"{gz_path} is up to date")
+
+
+def install_compressed_dd(xml_path):
+    """Write a minified, gzip-compressed copy of the DD XML next to ``xml_path``.
+
+    Indentation whitespace is stripped before compressing. The plain XML file is
+    kept for legacy consumers; :func:`imas_data_dictionary.open_schema` prefers the
+    compressed variant when it is available.
+    """
+    xml_path = Path(xml_path)
+    gz_path = xml_path.with_name(xml_path.name + ".gz")
+    logger.info(f"Writing minified and compressed {gz_path}")
+
+    tree = ET.parse(xml_path)
+    for element in tree.iter():
+        if element.text is not None and not element.text.strip():
+            element.text = None
+        if element.tail is not None and not element.tail.strip():
+            element.tail = None
+
+    # Unique temporary file, see _sync_file, and fixed mtime for reproducible output
+    fd, tmp_path = tempfile.mkstemp(dir=gz_path.parent, prefix=f".{gz_path.name}.")
+    try:
+        # mkstemp creates the file only readable by the owner
+        shutil.copymode(xml_path, tmp_path)
+        with os.fdopen(fd, "wb") as tmp_file, gzip.GzipFile(
+            fileobj=tmp_file, mode="wb", compresslevel=9, mtime=0
+        ) as gz_file:
+            tree.write(gz_file, encoding="UTF-8", xml_declaration=True)
+        os.replace(tmp_path, gz_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
 
 
 def ignored_files(adir, filenames):
@@ -192,22 +333,33 @@ def install_identifiers_files():
     resources_dir = Path(srcdir) / "imas_data_dictionary" / "resources"
     schemas_dir = resources_dir / "schemas"
 
+    # Keep the folder structure: schemas/<directory>/<file>
+    files = {}
     for file_path in ID_IDENT:
-        directory_path = os.path.dirname(file_path)
-        directory_name = os.path.basename(directory_path)
-
-        # Create subdirectory in schemas_dir to maintain folder structure
-        schemas_subdir = schemas_dir / directory_name
-        schemas_subdir.mkdir(parents=True, exist_ok=True)
-
-        # Copy the identifier file to the schemas subdirectory
+        directory_name = os.path.basename(os.path.dirname(file_path))
         filename = os.path.basename(file_path)
-        target_path = schemas_subdir / filename
-        shutil.copy(file_path, target_path)
-        logger.debug(f"Copied {file_path} to {target_path}")
+        files[schemas_dir / directory_name / filename] = file_path
+    copied = sync_files(files)
+    for target_path in copied:
+        logger.debug(f"Copied {files[Path(target_path)]} to {target_path}")
+    removed = remove_stale_files(schemas_dir, "*/*_identifier.xml", files)
+    logger.info(
+        f"{len(copied)} of {len(files)} identifier files copied, {len(removed)} removed"
+    )
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Install the Data Dictionary files in the package resources"
+    )
+    parser.add_argument(
+        "--clean",
+        action="store_true",
+        help=f"Remove {IMAS_INSTALL_DIR} and copy all files again",
+    )
+    args = parser.parse_args()
+    if args.clean:
+        clean_resources()
     install_html_docs()
     install_dd_files()
     install_identifiers_files()
@@ -31,38 +31,57 @@ class ResourceGeneratorMixin:
 
     def generate_resources(self, include_docs=False):
         """Generate all necessary resources for the data dictionary package."""
-        from generate import (
-            generate_dd_data_dictionary,
-            generate_dd_data_dictionary_validation,
-            generate_idsnames,
+        from generate import DOC_STEPS, BuildReport, default_jobs, run_build
+        from install import (
+            clean_resources,
+            install_dd_files,
+            install_identifiers_files,
+            remove_html_docs,
         )
-        from install import install_dd_files, install_identifiers_files
-
-        # Generate the data dictionary files
-        generate_dd_data_dictionary()
-        generate_idsnames()
-        generate_dd_data_dictionary_validation()
-
-        # Generate documentation if requested
-        if include_docs:
-            from generate import (
-                generate_html_documentation,
-                generate_ids_cocos_transformations_symbolic_table,
-                generate_idsdef_js,
-            )
-            from install import (
-                install_html_docs,
-            )
-
-            generate_html_documentation()
-            generate_ids_cocos_transformations_symbolic_table()
-            generate_idsdef_js()
-
-            install_html_docs()
-
-        # Create the resources directory in the package
-        install_dd_files()
-        install_identifiers_files()
+
+        # Time, CPU time, peak memory and output size of every step are written to
+        # build_report.json, and compared with IMAS_BUILD_BASELINE when it is set
+        report = BuildReport()
+        baseline = os.getenv("IMAS_BUILD_BASELINE", "").strip() or None
+        try:
+            # Generate the data dictionary files, and the documentation if
+            # requested. Independent steps run in parallel.
+            steps = ["dd_data_dictionary", "idsnames", "validation"]
+            if include_docs:
+                steps += DOC_STEPS
+            # Steps whose inputs didn't change since the last build are skipped,
+            # unless IMAS_BUILD_FORCE is set
+            force_flag = os.getenv("IMAS_BUILD_FORCE", "").strip().lower()
+            force = force_flag in ("1", "true", "yes")
+            run_build(steps, jobs=default_jobs(), force=force, report=report)
+
+            # Installed files are synced: only files which changed are copied,
+            # unless IMAS_BUILD_FORCE is set
+            if force:
+                clean_resources()
+            resources = "imas_data_dictionary/resources"
+            if include_docs:
+                from install import (
+                    install_html_docs,
+                )
+
+                with report.measure("install_html_docs", [f"{resources}/docs"]):
+                    install_html_docs()
+            else:
+                remove_html_docs()
+
+            # Create the resources directory in the package
+            with report.measure(
+                "install_dd_files", [f"{resources}/schemas/data_dictionary.xml*"]
+            ):
+                install_dd_files()
+            with report.measure(
+                "install_identifiers_files",
+                [f"{resources}/schemas/*/*_identifier.xml"],
+            ):
+                install_identifiers_files()
+        finally:
+            report.write(baseline_file=baseline)
 
 
 class CustomInstallCommand(install, ResourceGeneratorMixin):